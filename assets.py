@@ -0,0 +1,105 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pygame
+
+# Sprite and sound loading for the pygame front end.
+#
+# Images are read from disk once and every scaled variant is cached by
+# (path, size), so restarts and per-frame lookups cost a dict hit. Sounds are
+# decoded on first use, or ahead of time on a background thread where
+# threads exist (not under pygbag). Every load is timed for report().
+
+
+class Assets:
+    def __init__(self, root="."):
+        self.root = root
+        # (path, size) -> Surface; size None is the image as stored
+        self.images = {}
+        # path -> Sound, or None if it couldn't be loaded
+        self.sounds = {}
+        # Asset label -> seconds spent loading it
+        self.load_times = {}
+        self.preloader = None
+
+    def _timed(self, label, start):
+        self.load_times[label] = time.perf_counter() - start
+
+    def image(self, path, size=None):
+        key = (path, size)
+        surf = self.images.get(key)
+        if surf is not None:
+            return surf
+        if size is None:
+            start = time.perf_counter()
+            surf = pygame.image.load(os.path.join(self.root, path)).convert_alpha()
+            self._timed(path, start)
+        else:
+            base = self.image(path)
+            start = time.perf_counter()
+            surf = pygame.transform.smoothscale(base, size)
+            self._timed(f"{path} @ {size[0]}x{size[1]}", start)
+        self.images[key] = surf
+        return surf
+
+    def load_atlas(self, index_path):
+        # Register every sprite in a packed atlas (see tools/build_atlas.py)
+        # as a subsurface of the one atlas image, so image(path, size) never
+        # touches the individual files. Returns False if there is no atlas.
+        start = time.perf_counter()
+        try:
+            with open(os.path.join(self.root, index_path)) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return False
+        atlas = self.image(index["image"])
+        for entry in index["sprites"]:
+            key = (entry["path"], tuple(entry["size"]))
+            self.images.setdefault(key, atlas.subsurface(pygame.Rect(entry["rect"])))
+        self._timed(index_path, start)
+        return True
+
+    def image_fit(self, path, max_w, max_h):
+        # Scaled down (never up) to fit max_w x max_h, keeping aspect ratio
+        w, h = self.image(path).get_size()
+        scale = min(max_w / w, max_h / h, 1.0)
+        return self.image(path, (int(w * scale), int(h * scale)))
+
+    def sound(self, path, volume=1.0):
+        # None when the file or the mixer isn't available
+        if path in self.sounds:
+            return self.sounds[path]
+        start = time.perf_counter()
+        try:
+            sound = pygame.mixer.Sound(os.path.join(self.root, path))
+            sound.set_volume(volume)
+        except (pygame.error, FileNotFoundError):
+            sound = None
+        self._timed(path, start)
+        # The preloader may have finished the same file meanwhile; keep one
+        return self.sounds.setdefault(path, sound)
+
+    def preload_sounds(self, sounds):
+        # Decode (path, volume) pairs in the background so the first play
+        # doesn't stall a frame. Without threads they stay lazy.
+        if sys.platform == "emscripten" or self.preloader is not None:
+            return
+
+        def load_all():
+            for path, volume in sounds:
+                self.sound(path, volume)
+
+        self.preloader = threading.Thread(target=load_all, daemon=True)
+        self.preloader.start()
+
+    def report(self):
+        if not self.load_times:
+            return
+        total_ms = sum(self.load_times.values()) * 1000
+        print(f"assets: {len(self.load_times)} loads, {total_ms:.1f} ms total")
+        slowest = sorted(self.load_times.items(), key=lambda item: -item[1])
+        for label, seconds in slowest:
+            print(f"  {seconds * 1000:8.2f} ms  {label}")
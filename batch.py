@@ -0,0 +1,225 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from levelfile import load_level
+from policies import POLICIES
+from simulation import (
+    HUMAN_START_TILES,
+    LEVEL,
+    TILE_SIZE,
+    Game,
+    minotaur_start_tiles,
+)
+
+# Headless batch runs for balance testing.
+#
+# Plays N seeded games with a scripted Theseus (see policies.py) across a
+# process pool, streams one result per game to a JSONL or CSV file as games
+# finish, and prints aggregate outcome rates at the end. Games share
+# nothing, so throughput scales with the number of worker processes.
+#
+#   python batch.py --games 1000 --policy greedy --out results.jsonl
+#   python batch.py --games 500 --minotaur-speed 4 --out fast.csv
+#   python batch.py --games 100 --level big.mlvl   # a level file (levelfile.py)
+#   python batch.py --games 100 --minotaurs 8 --cooperative
+
+RESULT_FIELDS = [
+    "seed",
+    "outcome",
+    "ticks",
+    "survivors",
+    "humans_left",
+    "pellets_left",
+    "score",
+]
+
+
+def check_speed(speed):
+    # Entities only turn at tile centers, so a speed must land on them
+    if speed <= 0 or not (TILE_SIZE / speed).is_integer():
+        raise ValueError(f"speed {speed} does not divide TILE_SIZE ({TILE_SIZE})")
+    return speed
+
+
+def make_game(seed, config):
+    # Workers map level files themselves; the pages are shared between them
+    path = config.get("level")
+    level = load_level(path) if path else LEVEL
+    minotaurs = config.get("minotaurs", 1)
+    minotaur_tiles = None
+    if minotaurs > 1:
+        minotaur_tiles = minotaur_start_tiles(level, minotaurs)
+    game = Game(
+        human_start_tiles=config["human_start_tiles"],
+        level=level,
+        seed=seed,
+        minotaur_tiles=minotaur_tiles,
+        cooperative=config.get("cooperative", False),
+    )
+    for minotaur in game.minotaurs:
+        minotaur.speed = config["minotaur_speed"]
+    game.tributes.speed[:] = config["tribute_speed"]
+    return game
+
+
+def play_game(job):
+    # One headless game; runs in a worker process
+    seed, config = job
+    game = make_game(seed, config)
+    policy = POLICIES[config["policy"]](seed)
+    max_ticks = config["max_ticks"]
+    while not game.over and game.ticks < max_ticks:
+        game.step(policy(game))
+        if policy.centers_only:
+            game.skip_idle(max_ticks - game.ticks)
+
+    if game.won:
+        outcome = "won"
+    elif game.dead:
+        outcome = "dead"
+    else:
+        outcome = "timeout"
+    return {
+        "seed": seed,
+        "outcome": outcome,
+        "ticks": game.ticks,
+        "survivors": game.survivors_count,
+        "humans_left": len(game.tributes),
+        "pellets_left": len(game.pellets),
+        "score": game.score,
+    }
+
+
+class ResultWriter:
+    # Appends results to .jsonl (default) or .csv as they come in
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.csv = None
+        if path.endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv is not None:
+            self.csv.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Summary:
+    def __init__(self):
+        self.games = 0
+        self.outcomes = {"won": 0, "dead": 0, "timeout": 0}
+        self.ticks = 0
+        self.survivors = 0
+
+    def add(self, result):
+        self.games += 1
+        self.outcomes[result["outcome"]] += 1
+        self.ticks += result["ticks"]
+        self.survivors += result["survivors"]
+
+    def report(self, seconds):
+        games = max(self.games, 1)
+        rates = ", ".join(
+            f"{outcome} {count / games:.1%}" for outcome, count in self.outcomes.items()
+        )
+        print(f"{self.games} games in {seconds:.1f} s ({self.games / seconds:.1f}/s)")
+        print(f"  {rates}")
+        print(
+            f"  mean ticks {self.ticks / games:.0f}, "
+            f"mean survivors {self.survivors / games:.2f}"
+        )
+
+
+def run_batch(games, config, workers=None, seed=0, on_result=None):
+    # Play seeds seed..seed+games-1 and return a Summary; on_result is
+    # called with each result, in completion order
+    workers = workers or os.cpu_count() or 1
+    jobs = [(seed + i, config) for i in range(games)]
+    # A few chunks per worker keeps them all busy without much IPC
+    chunksize = max(1, games // (workers * 4))
+    summary = Summary()
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(play_game, jobs, chunksize):
+            summary.add(result)
+            if on_result is not None:
+                on_result(result)
+    return summary
+
+
+def parse_tiles(text):
+    # "1,1;26,1;..." -> [(1, 1), (26, 1), ...]
+    return [tuple(int(v) for v in pair.split(",")) for pair in text.split(";") if pair]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless games.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--minotaur-speed", type=float, default=3)
+    parser.add_argument("--minotaurs", type=int, default=1)
+    parser.add_argument(
+        "--cooperative", action="store_true", help="minotaurs split up the targets"
+    )
+    parser.add_argument("--tribute-speed", type=float, default=1.5)
+    parser.add_argument("--level", help="level file to play instead of the built-in")
+    parser.add_argument(
+        "--human-tiles",
+        type=parse_tiles,
+        default=None,
+        help='tribute start tiles as "x,y;x,y;..." (default: the level\'s own)',
+    )
+    parser.add_argument("--out", help="results file (.jsonl or .csv)")
+    args = parser.parse_args(argv)
+
+    human_tiles = args.human_tiles
+    if human_tiles is None:
+        human_tiles = HUMAN_START_TILES
+        if args.level:
+            human_tiles = load_level(args.level).human_start_tiles
+
+    try:
+        config = {
+            "policy": args.policy,
+            "max_ticks": args.max_ticks,
+            "minotaur_speed": check_speed(args.minotaur_speed),
+            "tribute_speed": check_speed(args.tribute_speed),
+            "human_start_tiles": human_tiles,
+            "level": args.level,
+            "minotaurs": args.minotaurs,
+            "cooperative": args.cooperative,
+        }
+    except ValueError as e:
+        parser.error(str(e))
+
+    writer = ResultWriter(args.out) if args.out else None
+    start = time.perf_counter()
+    try:
+        summary = run_batch(
+            args.games,
+            config,
+            workers=args.workers,
+            seed=args.seed,
+            on_result=writer.write if writer is not None else None,
+        )
+    finally:
+        if writer is not None:
+            writer.close()
+    summary.report(time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
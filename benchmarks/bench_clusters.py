@@ -0,0 +1,104 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Compare path queries on a big generated maze:
+#   bfs      - bfs_next_step, a flat BFS from the start (what a level too
+#              big for a PathTable would otherwise need)
+#   clusters - ClusterMap.next_step, A* over the cluster entrances, warm
+#
+# Queries are grouped by how far apart start and goal may be; the first
+# pass over each group builds the clusters it touches (and the first far
+# query sets up the landmarks). Also times making
+# the open-gates map from the closed one.
+#
+#   python benchmarks/bench_clusters.py [size] [queries]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clusters import ClusterMap  # noqa: E402
+from level import WALL  # noqa: E402
+from levelfile import MappedLevel, write_level  # noqa: E402
+from mazegen import generate  # noqa: E402
+from pathfinding import bfs_next_step  # noqa: E402
+
+RANGES = (16, 64, 256, 1024)
+BFS_QUERIES = 10
+
+
+def make_level(size, path):
+    maze = generate(size, size, seed=0)
+    write_level(path, maze.layout, maze.human_start_tiles)
+    return MappedLevel(path)
+
+
+def random_queries(level, reach, count, rng):
+    flags = np.frombuffer(level.cells, dtype=np.uint8)
+    open_cells = np.flatnonzero((flags & WALL) == 0)
+    queries = []
+    while len(queries) < count:
+        n = int(open_cells[rng.integers(len(open_cells))])
+        x, y = n % level.width, n // level.width
+        gx = x + int(rng.integers(-reach, reach + 1))
+        gy = y + int(rng.integers(-reach, reach + 1))
+        if level.walkable(gx, gy, False):
+            queries.append(((x, y), [(gx, gy)]))
+    return queries
+
+
+def times_ms(fn, queries):
+    times = []
+    for start, goals in queries:
+        t = time.perf_counter()
+        fn(start, goals)
+        times.append((time.perf_counter() - t) * 1000)
+    return times
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1001
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        level = make_level(size, os.path.join(tmp, "maze.mlvl"))
+        start = time.perf_counter()
+        cmap = ClusterMap(level, False)
+        setup = time.perf_counter() - start
+        print(
+            f"{level.width}x{level.height} maze, "
+            f"map set up in {setup * 1000:.1f} ms"
+        )
+
+        def bfs(start, goals):
+            return bfs_next_step(level, False, start, set(goals))
+
+        for reach in RANGES:
+            queries = random_queries(level, reach, count, rng)
+            cold = times_ms(cmap.next_step, queries)
+            warm = times_ms(cmap.next_step, queries)
+            flat = times_ms(bfs, queries[:BFS_QUERIES])
+            steps = statistics.median(cmap.distance(s, g) for s, g in queries)
+            print(
+                f"within {reach:>4} tiles (median {steps:5.0f} steps): "
+                f"clusters {statistics.median(warm):7.3f} ms median, "
+                f"{np.percentile(warm, 90):7.3f} ms p90 "
+                f"(first pass {statistics.mean(cold):6.2f} ms); "
+                f"bfs {statistics.median(flat):7.3f} ms median"
+            )
+
+        start = time.perf_counter()
+        opened = ClusterMap(level, True, base=cmap)
+        print(
+            f"gates opened in {(time.perf_counter() - start) * 1000:.1f} ms: "
+            f"{len(opened.changed)} of {len(cmap.entrances)} built clusters "
+            f"to rebuild"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+import time
+
+# Compare Minotaur pathfinding strategies:
+#   bfs   - a full BFS at every tile center (the original behaviour)
+#   table - PathTable lookup, minimum over all goals
+#   field - shared DistanceField patched as targets move (the default)
+#
+#   python benchmarks/bench_pathfinding.py [ticks]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pathfinding import (  # noqa: E402
+    DistanceField,
+    bfs_next_step,
+    path_table,
+    walk_graph,
+)
+from simulation import DOWN, LEFT, LEVEL, RIGHT, UP, Game, Minotaur  # noqa: E402
+
+
+class TableMinotaur(Minotaur):
+    # Ignore the planner Game hands out, so every hunt decision is a lookup
+    planner = property(lambda self: None, lambda self, value: None)
+
+
+class BfsMinotaur(TableMinotaur):
+    def next_step(self, start, goals):
+        return bfs_next_step(self.level, self.gates_open, start, goals)
+
+
+MINOTAURS = {"bfs": BfsMinotaur, "table": TableMinotaur, "field": Minotaur}
+
+
+def make_game(mode):
+    game = Game()
+    m = game.minotaur
+    game.minotaur = MINOTAURS[mode](m.tx, m.ty)
+    return game
+
+
+def ticks_per_second(mode, ticks, seed=0):
+    random.seed(seed)
+    moves = [LEFT, RIGHT, UP, DOWN]
+    game = make_game(mode)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if game.over:
+            game = make_game(mode)
+        game.step(moves[(tick // 30) % 4])
+    return ticks / (time.perf_counter() - start)
+
+
+def crowd_decisions_per_second(mode, targets, minotaurs, rounds, seed=0):
+    # Several minotaurs deciding against a crowd of targets, about a quarter
+    # of which step to a neighbouring tile between decision rounds
+    rng = random.Random(seed)
+    graph = walk_graph(LEVEL, False)
+    table = path_table(LEVEL, False)
+    field = DistanceField(graph)
+    cells = graph.tiles()
+    tiles = [rng.choice(cells) for _ in range(targets)]
+    moves = []
+    for _ in range(rounds):
+        for i, tile in enumerate(tiles):
+            if rng.random() < 0.25:
+                n = rng.choice(graph.neighbours(graph.node(tile)))[1]
+                tiles[i] = graph.tile(n)
+        starts = [rng.choice(cells) for _ in range(minotaurs)]
+        moves.append((list(tiles), starts))
+
+    start = time.perf_counter()
+    for tiles, starts in moves:
+        if mode == "field":
+            field.set_targets(tiles)
+            for s in starts:
+                field.next_step(s)
+            continue
+        goals = set(tiles)
+        for s in starts:
+            if mode == "bfs":
+                bfs_next_step(LEVEL, False, s, goals)
+            else:
+                table.next_step(s, goals)
+    return rounds * minotaurs / (time.perf_counter() - start)
+
+
+def report(label, rates):
+    base = rates["bfs"]
+    cells = "  ".join(
+        f"{mode}: {rate:9.0f} ({rate / base:4.1f}x)" for mode, rate in rates.items()
+    )
+    print(f"{label:<24}{cells}")
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # Build cost is paid once per layout and gate state
+    start = time.perf_counter()
+    table = path_table(LEVEL, False)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"PathTable build: {build_ms:.1f} ms ({len(table.dist)} cells)")
+
+    report("ticks/s", {mode: ticks_per_second(mode, ticks) for mode in MINOTAURS})
+    for targets, minotaurs in ((10, 1), (10, 5), (100, 5), (300, 10)):
+        report(
+            f"decisions/s {targets:>3}t {minotaurs:>2}m",
+            {
+                mode: crowd_decisions_per_second(mode, targets, minotaurs, 300)
+                for mode in MINOTAURS
+            },
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+# Compare headless game loops:
+#   step - Game.step on every tick
+#   skip - Game.step, then Game.skip_idle over the ticks where nobody
+#          reaches a tile center and nothing can collide
+#
+# Both play the same games tick for tick; only the time differs. Games and
+# policies are set up before the clock starts, and every policy makes its
+# first decision then too, so one-off work (walk graphs, Greedy's distance
+# field) doesn't count as loop time.
+#
+#   python benchmarks/bench_schedule.py [games]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from level import compile_level  # noqa: E402
+from mazegen import generate  # noqa: E402
+from policies import Greedy, Idle  # noqa: E402
+from simulation import LEVEL, Game  # noqa: E402
+
+MAX_TICKS = 6000
+
+
+def ticks_per_second(make_game, policy, games, skip):
+    runs = []
+    for seed in range(games):
+        game = make_game(seed)
+        choose = policy(seed)
+        choose(game)
+        runs.append((game, choose))
+
+    ticks = 0
+    start = time.perf_counter()
+    for game, choose in runs:
+        while not game.over and game.ticks < MAX_TICKS:
+            game.step(choose(game))
+            if skip:
+                game.skip_idle(MAX_TICKS - game.ticks)
+        ticks += game.ticks
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    maze = generate(201, 201, seed=0)
+    maze_level = compile_level(maze.layout)
+    levels = {
+        "default": lambda seed: Game(level=LEVEL, seed=seed),
+        "201x201": lambda seed: Game(
+            human_start_tiles=maze.human_start_tiles, level=maze_level, seed=seed
+        ),
+    }
+    for name, make_game in levels.items():
+        for policy in (Idle, Greedy):
+            step = ticks_per_second(make_game, policy, games, False)
+            skip = ticks_per_second(make_game, policy, games, True)
+            print(
+                f"{name:>8} {policy.__name__:<7} "
+                f"step: {step:8.0f} ticks/s  "
+                f"skip: {skip:8.0f} ticks/s ({skip / step:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import copy
+import os
+import sys
+import time
+
+# Compare ways to fork a game mid-run, as a lookahead search does before
+# every rollout:
+#   deepcopy - copy.deepcopy(game)
+#   new game - Game(...) from scratch (what a restart used to cost)
+#   restore  - game.restore(state) from one game.save()
+#
+# Each is timed on its own and with a short rollout after it.
+#
+#   python benchmarks/bench_state.py [rollout ticks]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policies import Greedy  # noqa: E402
+from simulation import Game  # noqa: E402
+
+WARMUP_TICKS = 600
+
+
+def per_call(fn, seconds=1.0):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    rollout = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    game = Game(seed=0)
+    policy = Greedy(0)
+    for _ in range(WARMUP_TICKS):
+        game.step(policy(game))
+    state = game.save()
+
+    def play(fork):
+        branch = fork()
+        for _ in range(rollout):
+            branch.step()
+
+    def restore():
+        game.restore(state)
+        return game
+
+    forks = {
+        "deepcopy": lambda: copy.deepcopy(game),
+        "new game": lambda: Game(seed=0),
+        "restore": restore,
+    }
+    print(f"save: {per_call(game.save) * 1e6:8.1f} us")
+    for name, fork in forks.items():
+        alone = per_call(fork)
+        with_rollout = per_call(lambda: play(fork))
+        print(
+            f"{name:>8}: {alone * 1e6:8.1f} us, "
+            f"{with_rollout * 1e6:8.1f} us with a {rollout}-tick rollout"
+        )
+
+
+if __name__ == "__main__":
+    main()
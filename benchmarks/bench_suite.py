@@ -0,0 +1,442 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# Benchmark suite for the simulation and rendering hot paths.
+#
+# Each benchmark is a setup function returning a zero-argument callable.
+# The callable is looped until one run takes at least --min-time, the run is
+# repeated --runs times and per-call times are reported (pyperf style).
+# Results go to JSON so they can be compared across commits:
+#
+#   python benchmarks/bench_suite.py -o before.json
+#   python benchmarks/bench_suite.py -o after.json --compare before.json
+#   python benchmarks/bench_suite.py -k tick        # only names containing "tick"
+#
+# Rendering benchmarks use the SDL dummy video driver and are skipped when
+# pygame isn't installed.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from level import compile_level  # noqa: E402
+from mazegen import generate  # noqa: E402
+from pathfinding import HuntPlanner, walk_graph  # noqa: E402
+from simulation import (  # noqa: E402
+    LEVEL,
+    MAP_LAYOUT,
+    PELLET_SIZE,
+    RIGHT,
+    TILE_SIZE,
+    Box,
+    Game,
+    Human,
+    Minotaur,
+    Player,
+    build_level,
+    minotaur_start_tiles,
+)
+from spatial import PelletGrid  # noqa: E402
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def center(tile):
+    return tile[0] * TILE_SIZE + TILE_SIZE // 2, tile[1] * TILE_SIZE + TILE_SIZE // 2
+
+
+def random_cells(count, level=LEVEL, seed=0):
+    rng = random.Random(seed)
+    cells = walk_graph(level, False).tiles()
+    return [rng.choice(cells) for _ in range(count)]
+
+
+def tiled_layout(times):
+    # MAP_LAYOUT repeated times x times, for scaled-up maze sizes
+    rows = [row * times for row in MAP_LAYOUT]
+    return rows * times
+
+
+# --- Entity updates ---
+
+
+def minotaur_decisions(flee=False, planner=False):
+    # One Minotaur decision per call: put it back on a tile center and let
+    # it choose against a player that wanders between calls
+    players = [Player(*tile) for tile in random_cells(64, seed=1)]
+    tributes = random_cells(9, seed=2)
+    starts = random_cells(64, seed=3)
+    minotaur = Minotaur(*starts[0])
+    minotaur.flee = flee
+    if planner:
+        minotaur.planner = HuntPlanner(walk_graph(LEVEL, False))
+    state = {"i": 0}
+
+    def run():
+        i = state["i"] = (state["i"] + 1) % 64
+        minotaur.x, minotaur.y = center(starts[i])
+        if planner:
+            # As Game does before the Minotaurs decide
+            minotaur.planner.set_targets([(players[i].tx, players[i].ty)] + tributes)
+        minotaur.update(players[i], tributes)
+
+    return run
+
+
+@benchmark("minotaur_update_hunt_table")
+def bench_minotaur_hunt_table():
+    return minotaur_decisions()
+
+
+@benchmark("minotaur_update_hunt_planner")
+def bench_minotaur_hunt_planner():
+    return minotaur_decisions(planner=True)
+
+
+@benchmark("minotaur_update_flee")
+def bench_minotaur_flee():
+    return minotaur_decisions(flee=True)
+
+
+@benchmark("human_update_x9")
+def bench_human_update():
+    random.seed(0)
+    humans = [Human(*tile) for tile in random_cells(9)]
+
+    def run():
+        for human in humans:
+            human.update()
+
+    return run
+
+
+@benchmark("player_update")
+def bench_player_update():
+    player = Player(*random_cells(1)[0])
+    player.next_dir = RIGHT
+
+    def run():
+        player.update()
+        if player.dir == (0, 0):
+            # Ran into a wall: turn around so it keeps moving
+            player.next_dir = (-player.next_dir[0], 0)
+
+    return run
+
+
+@benchmark("player_can_move_x4")
+def bench_player_can_move():
+    player = Player(*random_cells(1)[0])
+    directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+    def run():
+        for d in directions:
+            player.can_move(d)
+
+    return run
+
+
+@benchmark("pellet_collision")
+def bench_pellet_collision():
+    # Player-sized query over a full pellet grid, as in every tick
+    grid = PelletGrid(LEVEL, TILE_SIZE, PELLET_SIZE, Box)
+    rects = [
+        Box(x - TILE_SIZE // 2, y - TILE_SIZE // 2, TILE_SIZE, TILE_SIZE)
+        for x, y in map(center, random_cells(64))
+    ]
+    full = grid.save()
+    state = {"i": 0}
+
+    def run():
+        i = state["i"] = (state["i"] + 1) % 64
+        grid.eat_overlapping(rects[i])
+        # Put back whatever was eaten so every call sees a full grid
+        grid.restore(full)
+
+    return run
+
+
+@benchmark("build_level")
+def bench_build_level():
+    return build_level
+
+
+# --- Whole ticks ---
+
+
+class GameTicks:
+    # One Game.step per call with a scripted player, restarting when the
+    # game ends
+    MOVES = (RIGHT, (0, 1), (-1, 0), (0, -1))
+
+    def __init__(self, tributes=None, level=LEVEL, minotaurs=1, cooperative=False):
+        self.level = level
+        self.tiles = None if tributes is None else random_cells(tributes, level)
+        self.minotaur_tiles = (
+            minotaur_start_tiles(level, minotaurs) if minotaurs > 1 else None
+        )
+        self.cooperative = cooperative
+        self.game = self.new_game()
+        self.tick = 0
+
+    def new_game(self):
+        kwargs = {}
+        if self.tiles is not None:
+            kwargs["human_start_tiles"] = self.tiles
+        return Game(
+            level=self.level,
+            seed=0,
+            minotaur_tiles=self.minotaur_tiles,
+            cooperative=self.cooperative,
+            **kwargs,
+        )
+
+    def __call__(self):
+        if self.game.over:
+            self.game = self.new_game()
+        self.tick += 1
+        self.game.step(self.MOVES[(self.tick // 30) % 4])
+
+
+@benchmark("tick_9_tributes")
+def bench_tick():
+    return GameTicks()
+
+
+@benchmark("tick_1000_tributes")
+def bench_tick_1000():
+    return GameTicks(1000)
+
+
+@benchmark("tick_10000_tributes")
+def bench_tick_10000():
+    return GameTicks(10000)
+
+
+@benchmark("tick_maze_2x2")
+def bench_tick_maze_2x2():
+    return GameTicks(36, compile_level(tiled_layout(2)))
+
+
+@benchmark("tick_maze_4x4")
+def bench_tick_maze_4x4():
+    return GameTicks(144, compile_level(tiled_layout(4)))
+
+
+@benchmark("tick_generated_201x201")
+def bench_tick_generated():
+    maze = generate(201, 201, seed=0)
+    return GameTicks(len(maze.human_start_tiles), compile_level(maze.layout))
+
+
+@benchmark("tick_50_minotaurs_201x201")
+def bench_tick_minotaur_pack():
+    maze = generate(201, 201, seed=0)
+    level = compile_level(maze.layout)
+    return GameTicks(len(maze.human_start_tiles), level, minotaurs=50)
+
+
+@benchmark("tick_50_cooperative_minotaurs_201x201")
+def bench_tick_cooperative_pack():
+    maze = generate(201, 201, seed=0)
+    level = compile_level(maze.layout)
+    return GameTicks(
+        len(maze.human_start_tiles), level, minotaurs=50, cooperative=True
+    )
+
+
+# --- Level generation ---
+
+
+@benchmark("generate_maze_1000x1000")
+def bench_generate_maze():
+    return lambda: generate(1000, 1000, seed=0)
+
+
+# --- Rendering (off-screen, SDL dummy driver) ---
+
+
+def load_main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+@benchmark("draw_level")
+def bench_draw_level():
+    main = load_main()
+    import pygame
+
+    surf = pygame.Surface((main.WIDTH, main.HEIGHT))
+    game = Game(seed=0)
+    camera = main.make_camera(game)
+
+    def run():
+        main.draw_level(surf, game, camera)
+
+    return run
+
+
+def dirty_frames(level=LEVEL, tributes=None):
+    # A tick plus a dirty-rect redraw, as in the real frame loop
+    main = load_main()
+    import pygame
+
+    renderer = main.DirtyRectRenderer(pygame.Surface((main.WIDTH, main.HEIGHT)))
+    ticks = GameTicks(tributes, level)
+    state = {"camera": None, "game": None}
+
+    def run():
+        ticks()
+        game = ticks.game
+        if game is not state["game"]:
+            state["game"] = game
+            state["camera"] = main.make_camera(game)
+            renderer.invalidate()
+        camera = state["camera"]
+        positions = main.entity_positions(game)
+        camera.follow(*positions[0])
+        renderer.draw(game, camera, positions)
+
+    return run
+
+
+@benchmark("draw_dirty_frame")
+def bench_draw_dirty():
+    return dirty_frames()
+
+
+@benchmark("draw_dirty_frame_201x201")
+def bench_draw_dirty_generated():
+    # Frame cost should track the view size, not the maze size
+    maze = generate(201, 201, seed=0)
+    return dirty_frames(compile_level(maze.layout), len(maze.human_start_tiles))
+
+
+# --- Harness ---
+
+
+def time_benchmark(fn, min_time, runs):
+    # Calibrate loops so one run lasts at least min_time, then time runs
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        "mean": statistics.mean(samples),
+        "median": statistics.median(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "runs": runs,
+        "loops": loops,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.1f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the simulation hot paths.")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON results to compare against")
+    parser.add_argument("-k", dest="pattern", default="", help="name filter")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    skipped = []
+    for name, setup in BENCHMARKS.items():
+        if args.pattern not in name:
+            continue
+        try:
+            fn = setup()
+        except ImportError as e:
+            skipped.append(f"{name} ({e.name} not installed)")
+            continue
+        result = results[name] = time_benchmark(fn, args.min_time, args.runs)
+        line = (
+            f"{name:<28}{format_time(result['median'])} "
+            f"+- {format_time(result['stdev']).strip()}"
+        )
+        old = baseline.get(name)
+        if old is not None:
+            line += f"   {old['median'] / result['median']:5.2f}x vs baseline"
+        print(line)
+    for name in skipped:
+        print(f"{name:<28}skipped")
+
+    if args.output:
+        data = {
+            "meta": {
+                "commit": git_commit(),
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "runs": args.runs,
+                "min_time": args.min_time,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
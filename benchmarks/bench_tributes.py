@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+import time
+
+# Compare tribute stepping strategies:
+#   objects - a list of Human objects, each updated on its own
+#   swarm   - one TributeSwarm stepping every tribute with array operations
+#
+#   python benchmarks/bench_tributes.py [ticks]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pathfinding import walk_graph  # noqa: E402
+from simulation import LEVEL, TILE_SIZE, Human  # noqa: E402
+from tributes import TributeSwarm  # noqa: E402
+
+# Ticks per second the game runs at
+TARGET_RATE = 60
+
+
+def start_tiles(count, seed=0):
+    rng = random.Random(seed)
+    cells = walk_graph(LEVEL, False).tiles()
+    return [rng.choice(cells) for _ in range(count)]
+
+
+def objects_ticks_per_second(count, ticks):
+    random.seed(0)
+    humans = [Human(tx, ty) for tx, ty in start_tiles(count)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for human in humans:
+            human.update()
+    return ticks / (time.perf_counter() - start)
+
+
+def swarm_ticks_per_second(count, ticks):
+    random.seed(0)
+    swarm = TributeSwarm(LEVEL, start_tiles(count), TILE_SIZE)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        swarm.step(False)
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+
+    for count in (10, 100, 1000, 10000):
+        objects = objects_ticks_per_second(count, ticks)
+        swarm = swarm_ticks_per_second(count, ticks)
+        print(
+            f"{count:>6} tributes  "
+            f"objects: {objects:9.0f} ticks/s  "
+            f"swarm: {swarm:9.0f} ticks/s ({swarm / objects:5.1f}x)"
+            + ("" if swarm >= TARGET_RATE else f"  below {TARGET_RATE} ticks/s")
+        )
+
+
+if __name__ == "__main__":
+    main()
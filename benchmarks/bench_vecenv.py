@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Compare training throughput:
+#   game    - one Game per episode, stepped in a Python loop
+#   vecenv  - VectorEnv stepping N games at once with array operations
+#
+# Both take a random action every step, and count env-steps (one tick of
+# one game) per second.
+#
+#   python benchmarks/bench_vecenv.py [seconds]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from level import NEIGHBOURS  # noqa: E402
+from simulation import Game  # noqa: E402
+from vecenv import ACTIONS, VectorEnv  # noqa: E402
+
+SIZES = (1, 64, 256, 1024, 4096)
+
+
+def game_steps_per_second(seconds):
+    rng = np.random.default_rng(0)
+    directions = list(NEIGHBOURS) + [None]
+    steps = 0
+    seed = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game = Game(seed=seed)
+        seed += 1
+        for action in rng.integers(0, ACTIONS, size=20000).tolist():
+            if game.over:
+                break
+            game.step(directions[action])
+            steps += 1
+    return steps / (time.perf_counter() - start)
+
+
+def vecenv_steps_per_second(games, seconds):
+    env = VectorEnv(games)
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, ACTIONS, size=(50, games))
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for row in actions:
+            env.step(row)
+        steps += len(actions) * games
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+
+    base = game_steps_per_second(seconds)
+    print(f"{'game':>12}: {base:12,.0f} env-steps/s")
+    for games in SIZES:
+        rate = vecenv_steps_per_second(games, seconds)
+        print(
+            f"{f'vecenv {games}':>12}: {rate:12,.0f} env-steps/s "
+            f"({rate / base:6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
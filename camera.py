@@ -0,0 +1,54 @@
+# Viewport over mazes bigger than the window.
+#
+# The camera is a view-sized rectangle in world pixels that follows a target
+# (the player) with a dead zone: it only moves once the target comes within
+# `margin` pixels of a view edge, and it never shows past the maze edges.
+# Renderers draw only the tiles and sprites inside it, so a frame costs the
+# same on a 1000x1000 maze as on the built-in one. Positions are whole
+# pixels so a scrolled frame lines up exactly with newly drawn tiles.
+
+
+class Camera:
+    def __init__(self, view_w, view_h, world_w, world_h, margin=None):
+        self.w = view_w
+        self.h = view_h
+        # A world smaller than the view just sits in its top-left corner
+        self.max_x = max(0, world_w - view_w)
+        self.max_y = max(0, world_h - view_h)
+        # Default dead zone: the middle third of the view
+        self.margin_x = view_w // 3 if margin is None else margin
+        self.margin_y = view_h // 3 if margin is None else margin
+        self.x = 0
+        self.y = 0
+
+    def clamp(self):
+        self.x = min(max(self.x, 0), self.max_x)
+        self.y = min(max(self.y, 0), self.max_y)
+
+    def center_on(self, x, y):
+        self.x = int(x) - self.w // 2
+        self.y = int(y) - self.h // 2
+        self.clamp()
+
+    def follow(self, x, y):
+        # Move just enough to bring x, y back inside the dead zone
+        x, y = int(x), int(y)
+        if x < self.x + self.margin_x:
+            self.x = x - self.margin_x
+        elif x > self.x + self.w - self.margin_x:
+            self.x = x - self.w + self.margin_x
+        if y < self.y + self.margin_y:
+            self.y = y - self.margin_y
+        elif y > self.y + self.h - self.margin_y:
+            self.y = y - self.h + self.margin_y
+        self.clamp()
+
+    def sees(self, x, y, margin=0):
+        # Whether a point is within margin of the view. Written with & so it
+        # also works elementwise on numpy arrays of positions.
+        return (
+            (x > self.x - margin)
+            & (x < self.x + self.w + margin)
+            & (y > self.y - margin)
+            & (y < self.y + self.h + margin)
+        )
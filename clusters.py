@@ -0,0 +1,716 @@
+import heapq
+from array import array
+
+import numpy as np
+
+from level import DIRECTION_BITS, NEIGHBOURS, passable
+from pathfinding import CLAIM_SLACK, STAY
+
+# Hierarchical pathfinding for levels too big for a PathTable.
+#
+# An all-pairs table needs a row per walkable cell, and a plain BFS walks the
+# whole maze to reach a far target. A ClusterMap cuts the grid into square
+# clusters instead. Every cell on a cluster border that can step into the
+# next cluster is an entrance, and each entrance knows the walking distance
+# to the other entrances of its cluster (a BFS that stays inside the
+# cluster) plus the single step across. A query searches that small
+# abstract graph with A* from the start to the nearest goal, then only
+# refines the first leg into a step on the grid.
+#
+# The A* estimate is the walking distance to the goals' bounding box, and
+# on far searches also a landmark bound (see LANDMARKS). Far searches are
+# still not sub-millisecond: on a 999x999 maze a query across 1024 tiles
+# takes about 6 ms warm (the box estimate alone: 16 ms), and the first one
+# to reach a region builds its clusters on the way.
+#
+# Every border crossing is an entrance, so the abstract graph keeps every
+# shortest path and the answers are exact distances. Maze corridors are one
+# tile wide, so that costs a handful of entrances per cluster; wide open
+# areas cost more.
+#
+# Clusters are built the first time a search reaches them, so a map costs
+# nothing up front and a huge level only pays for the parts that are
+# actually searched. The map for the open gates is made from the closed
+# one: clusters whose neighbour masks don't change with the gates are
+# shared, and only the ones around the gates are built again.
+#
+# Game hunts and flees through a ClusterMap on levels too big for the
+# whole-level structures in pathfinding.py: a ClusterPlanner stands in for
+# the HuntPlanner, and ClusterMap.flee_step for the FleeIndex.
+
+# Cluster side in tiles
+CLUSTER_SIZE = 16
+
+# Entrance fields (BFS distances inside a cluster) kept for refining steps
+# before the cache is cleared
+FIELD_CACHE = 4096
+
+# Far searches also bound the distance left with landmarks: a few cells
+# spread over the level, with every cell's walking distance to each. A
+# search whose estimate to the goals' box is over LANDMARK_RANGE steps sets
+# them up (once per map) and uses the ACTIVE_LANDMARKS that bound its start
+# best.
+LANDMARKS = 8
+ACTIVE_LANDMARKS = 3
+LANDMARK_RANGE = 4 * CLUSTER_SIZE
+
+# A fleeing Minotaur goes by exact walking distances from a player at most
+# this many steps away (see ClusterMap.flee_step)
+FLEE_RANGE = 4 * CLUSTER_SIZE
+
+RIGHT, LEFT, DOWN, UP = (DIRECTION_BITS[d] for d in NEIGHBOURS)
+
+
+class ClusterMap:
+    def __init__(self, level, gates_open, size=CLUSTER_SIZE, base=None):
+        self.level = level
+        self.gates_open = gates_open
+        self.size = size
+        self.width = width = level.width
+        self.height = level.height
+        self.columns = -(-width // size)
+        self.steps = level.mask_steps
+        self.masks = level.masks[gates_open]
+        flags = np.frombuffer(level.cells, dtype=np.uint8)
+        self.open = passable(flags, gates_open)
+
+        # Per cell, neighbour masks split into the bits that stay inside the
+        # cluster (so a BFS over them never leaves it) and the ones that
+        # cross a border; both are 0 on cells that can't be walked
+        local, border = self.split_masks()
+        # Walking distance from each landmark to every cell, set up by the
+        # first far search (see landmark_tables)
+        self.landmarks = None
+        self.landmark_cells = []
+        # Landmark -> {cell: direction} along a shortest way to it, for
+        # landmark_flee
+        self.routes = {}
+        if base is None:
+            self.local = bytearray(local.tobytes())
+            self.border = bytearray(border.tobytes())
+            # Built clusters: cluster -> its entrance cells, and for every
+            # entrance [(node, steps), ...] to the entrances it reaches
+            # inside its cluster and the cells one step across the border
+            self.entrances = {}
+            self.edges = {}
+            self.fields = {}
+            self.changed = set()
+        else:
+            # Only clusters with cells that differ from base's gate state
+            # (changed) are built again; everything else carries over
+            before_local = np.frombuffer(base.local, dtype=np.uint8)
+            before_border = np.frombuffer(base.border, dtype=np.uint8)
+            differ = np.flatnonzero(
+                (local != before_local) | (border != before_border)
+            ).tolist()
+            self.local = bytearray(base.local)
+            self.border = bytearray(base.border)
+            for n in differ:
+                self.local[n] = local[n]
+                self.border[n] = border[n]
+            self.changed = {self.cluster_of(n) for n in differ}
+            self.entrances = dict(base.entrances)
+            self.edges = dict(base.edges)
+            for c in self.changed:
+                for n in self.entrances.pop(c, ()):
+                    del self.edges[n]
+            self.fields = {
+                n: field
+                for n, field in base.fields.items()
+                if self.cluster_of(n) not in self.changed
+            }
+
+    def split_masks(self):
+        # (inside, across) neighbour masks as flat uint8 arrays
+        size = self.size
+        xs = np.arange(self.width) % size
+        ys = np.arange(self.height) % size
+        columns = np.where(xs == size - 1, RIGHT, 0) | np.where(xs == 0, LEFT, 0)
+        rows = np.where(ys == size - 1, DOWN, 0) | np.where(ys == 0, UP, 0)
+        crossing = (rows[:, None] | columns[None, :]).astype(np.uint8).reshape(-1)
+
+        masks = np.frombuffer(self.masks, dtype=np.uint8)
+        masks = np.where(self.open, masks, 0).astype(np.uint8)
+        return masks & ~crossing, masks & crossing
+
+    def cluster_of(self, n):
+        y, x = divmod(n, self.width)
+        return (y // self.size) * self.columns + x // self.size
+
+    def build(self, c):
+        # Entrances are the cells on the cluster's edge rows and columns
+        # that have a step across the border
+        size, width = self.size, self.width
+        cy, cx = divmod(c, self.columns)
+        x0, y0 = cx * size, cy * size
+        x1, y1 = min(x0 + size, width), min(y0 + size, self.height)
+        border = self.border
+        sides = (x0, x1 - 1) if x1 - 1 > x0 else (x0,)
+        entrances = []
+        for y in range(y0, y1):
+            edge_row = y == y0 or y == y1 - 1
+            for x in range(x0, x1) if edge_row else sides:
+                n = y * width + x
+                if border[n]:
+                    entrances.append(n)
+
+        steps = self.steps
+        for e in entrances:
+            links = self.inner_links(e, entrances)
+            links.extend((e + offset, 1) for _, offset in steps[border[e]])
+            self.edges[e] = links
+        self.entrances[c] = entrances
+        return entrances
+
+    def inner_links(self, e, entrances):
+        # [(entrance, steps), ...] for the other entrances e reaches inside
+        # its cluster. One that some shortest way from e only reaches
+        # through another entrance is left out: the links of that entrance
+        # cover it at the same length, and searches relax about half as
+        # many links.
+        steps = self.steps
+        local = self.local
+        gateways = set(entrances)
+        gateways.discard(e)
+        dist = {e: 0}
+        # Cells some shortest way from e reaches through another entrance
+        through = set()
+        frontier = [e]
+        d = 0
+        while frontier:
+            d += 1
+            reached = []
+            for c in frontier:
+                passed = c in through or c in gateways
+                for _, offset in steps[local[c]]:
+                    n = c + offset
+                    seen = dist.get(n)
+                    if seen is None:
+                        dist[n] = d
+                        reached.append(n)
+                        if passed:
+                            through.add(n)
+                    elif passed and seen == d:
+                        through.add(n)
+            frontier = reached
+        return [
+            (f, dist[f]) for f in entrances if f in dist and f != e and f not in through
+        ]
+
+    def local_bfs(self, source):
+        # Steps from source to every cell of its cluster it can reach without
+        # leaving the cluster, as {cell: steps}
+        steps = self.steps
+        local = self.local
+        dist = {source: 0}
+        frontier = [source]
+        d = 0
+        while frontier:
+            d += 1
+            reached = []
+            for c in frontier:
+                for _, offset in steps[local[c]]:
+                    n = c + offset
+                    if n not in dist:
+                        dist[n] = d
+                        reached.append(n)
+            frontier = reached
+        return dist
+
+    def field(self, n):
+        # local_bfs(n), cached: searches refine towards the same entrances
+        # over and over
+        field = self.fields.get(n)
+        if field is None:
+            if len(self.fields) >= FIELD_CACHE:
+                self.fields.clear()
+            field = self.fields[n] = self.local_bfs(n)
+        return field
+
+    def wavefront(self, masks, source):
+        # Steps from source to every cell as an int32 array, -1 where it
+        # can't be reached: a BFS that moves the whole frontier per step
+        dist = np.full(len(masks), -1, dtype=np.int32)
+        dist[source] = 0
+        moves = [(DIRECTION_BITS[d], d[0] + d[1] * self.width) for d in NEIGHBOURS]
+        frontier = np.array([source], dtype=np.int64)
+        d = 0
+        while len(frontier):
+            d += 1
+            bits = masks[frontier]
+            reached = np.concatenate(
+                [frontier[(bits & bit) != 0] + offset for bit, offset in moves]
+            )
+            reached = np.unique(reached[dist[reached] < 0])
+            dist[reached] = d
+            frontier = reached
+        return dist
+
+    def landmark_tables(self):
+        # Per landmark, the steps from it to every cell (array, -1 where it
+        # can't be reached). Landmarks are picked farthest first: each is
+        # the cell farthest from the ones before it, so they end up spread
+        # around the edges of the level, where they bound best.
+        if self.landmarks is None:
+            masks = np.frombuffer(self.local, dtype=np.uint8) | np.frombuffer(
+                self.border, dtype=np.uint8
+            )
+            walkable = np.flatnonzero(masks)
+            self.landmarks = []
+            if len(walkable):
+                nearest = self.wavefront(masks, int(walkable[0]))
+                for _ in range(LANDMARKS):
+                    landmark = int(np.argmax(nearest))
+                    dist = self.wavefront(masks, landmark)
+                    self.landmark_cells.append(landmark)
+                    self.landmarks.append(array("i", dist.tobytes()))
+                    if len(self.landmarks) == 1:
+                        nearest = dist
+                    else:
+                        nearest = np.minimum(nearest, dist)
+        return self.landmarks
+
+    def landmark_bounds(self, goals):
+        # Per landmark, (table, nearest, farthest) steps from it to the
+        # goals, or None if a goal is out of its reach. Cached on goals.
+        bounds = goals.bounds.get(self)
+        if bounds is None:
+            cells = np.concatenate(
+                [np.array(c, dtype=np.int64) for c in goals.clusters.values()]
+            )
+            bounds = []
+            for table in self.landmark_tables():
+                steps = np.frombuffer(table, dtype=np.int32)[cells]
+                if steps.min() < 0:
+                    bounds.append(None)
+                else:
+                    bounds.append((table, int(steps.min()), int(steps.max())))
+            goals.bounds[self] = bounds
+        return bounds
+
+    def goals(self, tiles):
+        # Goals for searches from (x, y) tiles; ones that can't be walked
+        # are dropped
+        width, height, size = self.width, self.height, self.size
+        tiles = np.array(list(tiles), dtype=np.int64).reshape(-1, 2)
+        xs, ys = tiles[:, 0], tiles[:, 1]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        cells = ys[inside] * width + xs[inside]
+        cells = np.unique(cells[self.open[cells]])
+        if not len(cells):
+            return Goals({}, None)
+        ys, xs = np.divmod(cells, width)
+        keys = (ys // size) * self.columns + xs // size
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        cells = cells[order].tolist()
+        cuts = (np.flatnonzero(np.diff(keys)) + 1).tolist()
+        starts = [0] + cuts
+        clusters = {
+            c: cells[i:j]
+            for c, i, j in zip(keys[starts].tolist(), starts, cuts + [len(cells)])
+        }
+        box = (int(xs.min()), int(xs.max()), int(ys.min()), int(ys.max()))
+        return Goals(clusters, box)
+
+    def as_goals(self, goals):
+        return goals if isinstance(goals, Goals) else self.goals(goals)
+
+    def without(self, goals, tiles):
+        # goals minus the goals on tiles. The box stays as it was: it still
+        # holds every goal left, so the estimate is still a lower bound.
+        clusters = dict(goals.clusters)
+        width = self.width
+        for x, y in tiles:
+            n = y * width + x
+            c = self.cluster_of(n)
+            cells = clusters.get(c)
+            if cells is not None and n in cells:
+                cells = [m for m in cells if m != n]
+                if cells:
+                    clusters[c] = cells
+                else:
+                    del clusters[c]
+        return Goals(clusters, goals.box if clusters else None)
+
+    def search(self, start, goals, limit=None):
+        # (steps, nodes) for a shortest path from start to the nearest goal,
+        # where nodes are start, the entrances the path passes through and
+        # the goal (as cells); None if no goal can be reached, or none
+        # within limit steps
+        goals = self.as_goals(goals)
+        if not goals or not self.level.walkable(*start, self.gates_open):
+            return None
+        return self._search(start[1] * self.width + start[0], goals, limit)
+
+    def _search(self, s, goals, limit):
+        targets = goals.clusters
+        if s in targets.get(self.cluster_of(s), ()):
+            return 0, [s]
+        if limit is None:
+            limit = float("inf")
+
+        # A* with the walking distance to the goals' bounding box as the
+        # estimate: never more than the real distance to the nearest goal,
+        # and it costs the same for one goal or thousands
+        width = self.width
+        left, right, top, bottom = goals.box
+
+        def estimate(n):
+            y, x = divmod(n, width)
+            return max(left - x, 0, x - right) + max(top - y, 0, y - bottom)
+
+        # Far away, the box says little in a maze that winds: a goal is
+        # also at least as far as the difference of its and the cell's
+        # steps from any landmark
+        if estimate(s) > LANDMARK_RANGE:
+            active = []
+            for bound in self.landmark_bounds(goals):
+                if bound is not None and bound[0][s] >= 0:
+                    table, near, far = bound
+                    here = table[s]
+                    active.append((max(here - far, near - here), bound))
+            active.sort(key=lambda pair: pair[0], reverse=True)
+            active = [bound for _, bound in active[:ACTIVE_LANDMARKS]]
+            if active:
+                box_estimate = estimate
+
+                def estimate(n):
+                    h = box_estimate(n)
+                    for table, near, far in active:
+                        here = table[n]
+                        if here - far > h:
+                            h = here - far
+                        elif near - here > h:
+                            h = near - here
+                    return h
+
+        # Goals are pushed as ~goal (negative), so they can't be confused
+        # with cells; a goal popped off the heap is the nearest one
+        size, columns = self.size, self.columns
+        edges = self.edges
+        cost = {s: 0}
+        parent = {s: None}
+        heap = [(estimate(s), 0, s)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while heap:
+            _, g, n = heappop(heap)
+            g = -g
+            if n < 0:
+                nodes = [~n]
+                n = parent[n]
+                while n is not None:
+                    nodes.append(n)
+                    n = parent[n]
+                nodes.reverse()
+                return g, nodes
+            if g > cost[n]:
+                continue
+
+            y, x = divmod(n, width)
+            c = (y // size) * columns + x // size
+            links = edges.get(n)
+            if links is None:
+                if c not in self.entrances:
+                    self.build(c)
+                links = edges.get(n)
+                if links is None:
+                    # Only the start can be off the abstract graph: link it
+                    # to its cluster's entrances
+                    field = self.field(n)
+                    links = [(e, field[e]) for e in self.entrances[c] if e in field]
+
+            # Goals in this cluster, reached without leaving it
+            for goal in targets.get(c, ()):
+                steps = self.field(goal).get(n)
+                if steps is not None:
+                    node = ~goal
+                    total = g + steps
+                    if total <= limit and total < cost.get(node, total + 1):
+                        cost[node] = total
+                        parent[node] = n
+                        heappush(heap, (total, -total, node))
+
+            for m, steps in links:
+                total = g + steps
+                if total < cost.get(m, total + 1):
+                    guess = total + estimate(m)
+                    if guess <= limit:
+                        cost[m] = total
+                        parent[m] = n
+                        heappush(heap, (guess, -total, m))
+        return None
+
+    def step_towards(self, n, target):
+        # First direction (in NEIGHBOURS order) from cell n on a shortest
+        # path to target, which is across a border or in n's cluster
+        for direction, offset in self.steps[self.border[n]]:
+            if n + offset == target:
+                return direction
+        field = self.field(target)
+        want = field[n] - 1
+        for direction, offset in self.steps[self.local[n]]:
+            if field.get(n + offset) == want:
+                return direction
+        return STAY
+
+    def first_step(self, s, goals, found):
+        # The step bfs_next_step would take from cell s, given found, a
+        # search result from s. The path found starts with some shortest
+        # step; BFS takes the first direction (in NEIGHBOURS order) that
+        # lies on any shortest path to a nearest goal, so each direction
+        # before it is tried with a search from the neighbour it leads to,
+        # bounded one step short of found.
+        steps, nodes = found
+        direction = self.step_towards(nodes[0], nodes[1])
+        for other, offset in self.steps[self.local[s] | self.border[s]]:
+            if other == direction:
+                break
+            if self._search(s + offset, goals, steps - 1) is not None:
+                return other
+        return direction
+
+    def next_step(self, start, goals):
+        # First step from start towards the nearest of goals, or STAY if
+        # already there / nothing is reachable. Ties go the same way as
+        # bfs_next_step and the PathTable.
+        goals = self.as_goals(goals)
+        found = self.search(start, goals)
+        if found is None or found[0] == 0:
+            return STAY
+        return self.first_step(found[1][0], goals, found)
+
+    def path(self, start, goals):
+        # Tiles of a shortest path from start to the nearest of goals, start
+        # included; None if no goal is reachable
+        found = self.search(start, goals)
+        if found is None:
+            return None
+        nodes = found[1]
+        width = self.width
+        tiles = [start]
+        n = nodes[0]
+        for target in nodes[1:]:
+            while n != target:
+                dx, dy = self.step_towards(n, target)
+                n += dx + dy * width
+                tiles.append((n % width, n // width))
+        return tiles
+
+    def distance(self, start, goals):
+        # Steps to the nearest of goals, or None
+        found = self.search(start, goals)
+        return None if found is None else found[0]
+
+    def reach(self, start, limit):
+        # {entrance: steps} for the entrances within limit steps of start,
+        # by a Dijkstra over the abstract graph
+        s = start[1] * self.width + start[0]
+        if not self.level.walkable(*start, self.gates_open):
+            return {}
+        c = self.cluster_of(s)
+        if c not in self.entrances:
+            self.build(c)
+        cost = {}
+        links = self.edges.get(s)
+        if links is None:
+            field = self.local_bfs(s)
+            heap = [(field[e], e) for e in self.entrances[c] if e in field]
+            heapq.heapify(heap)
+        else:
+            heap = [(0, s)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while heap:
+            g, n = heappop(heap)
+            if n in cost or g > limit:
+                continue
+            cost[n] = g
+            links = self.edges.get(n)
+            if links is None:
+                self.build(self.cluster_of(n))
+                links = self.edges[n]
+            for m, steps in links:
+                if m not in cost and g + steps <= limit:
+                    heappush(heap, (g + steps, m))
+        return cost
+
+    def lower_bound(self, a, b):
+        # Steps from cell a to cell b are at least this many: the grid
+        # distance, or what any landmark set up so far proves
+        width = self.width
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        bound = abs(ax - bx) + abs(ay - by)
+        for table in self.landmarks or ():
+            here, there = table[a], table[b]
+            if here >= 0 and there >= 0 and abs(here - there) > bound:
+                bound = abs(here - there)
+        return bound
+
+    def landmark_flee(self, s, p):
+        # Step from cell s towards the landmark farthest from the player at
+        # cell p, of the ones nearer to s than to p. Landmarks are spread to
+        # the far ends of the level, so that is about where a FleeIndex
+        # would send the Minotaur on a smaller level, and a shortest way
+        # there never runs through p. Shortest ways are kept per landmark
+        # and followed while the Minotaur is on one. None if every landmark
+        # is nearer to p.
+        best = None
+        best_key = None
+        for k, table in enumerate(self.landmark_tables()):
+            here, there = table[s], table[p]
+            if here < 0 or there <= here:
+                continue
+            key = (there, -here, -k)
+            if best_key is None or key > best_key:
+                best, best_key = k, key
+        if best is None:
+            return None
+        table = self.landmarks[best]
+        if table[s] == 0:
+            return STAY
+        route = self.routes.get(best)
+        if route is None or s not in route:
+            width = self.width
+            landmark = self.landmark_cells[best]
+            tiles = self.path(
+                (s % width, s // width), [(landmark % width, landmark // width)]
+            )
+            route = self.routes[best] = {
+                a[1] * width + a[0]: (b[0] - a[0], b[1] - a[1])
+                for a, b in zip(tiles, tiles[1:])
+            }
+        return route[s]
+
+    def flee_step(self, start, player, limit=FLEE_RANGE):
+        # Where to step to get away from the player. A level this size has
+        # no table of farthest cells, so the Minotaur runs for the farthest
+        # landmark instead (see landmark_flee). If every landmark is nearer
+        # the player, it looks around itself: of the entrances of its own
+        # and the eight surrounding clusters, it heads for the one farthest
+        # from the player (nearest to itself on ties, then row-major). That
+        # is by walking distance within limit steps of the player, with
+        # everything past the player's range counting the same, and by
+        # lower_bound beyond.
+        s = start[1] * self.width + start[0]
+        if not self.level.walkable(*player, self.gates_open):
+            return STAY
+        p = player[1] * self.width + player[0]
+        if s == p:
+            return STAY
+        direction = self.landmark_flee(s, p)
+        if direction is not None:
+            return direction
+        near = self.search(player, [start], limit)
+        if near is None:
+            here = self.lower_bound(p, s)
+
+            def away_from_player(e):
+                return self.lower_bound(p, e)
+
+        else:
+            here = near[0]
+            far = here + 3 * self.size
+            reach = self.reach(player, far)
+
+            def away_from_player(e):
+                return reach.get(e, far + 1)
+
+        width, columns = self.width, self.columns
+        rows = -(-self.height // self.size)
+        cy, cx = divmod(self.cluster_of(s), columns)
+        best = None
+        best_key = None
+        for y in range(max(cy - 1, 0), min(cy + 2, rows)):
+            for x in range(max(cx - 1, 0), min(cx + 2, columns)):
+                c = y * columns + x
+                entrances = self.entrances.get(c)
+                if entrances is None:
+                    entrances = self.build(c)
+                for e in entrances:
+                    ey, ex = divmod(e, width)
+                    away = abs(ex - start[0]) + abs(ey - start[1])
+                    key = (away_from_player(e), -away, -e)
+                    if best_key is None or key > best_key:
+                        best, best_key = e, key
+        if best is None or best_key[0] <= here:
+            return STAY
+        return self.next_step(start, [(best % width, best // width)])
+
+
+class Goals:
+    # Goal cells for ClusterMap searches, grouped by cluster, and their
+    # bounding box for the A* estimate. Made once for a set of goals, so a
+    # planner can run every Minotaur's search in a tick against the same
+    # crowd without regrouping it.
+    def __init__(self, clusters, box):
+        # cluster -> [cell, ...]
+        self.clusters = clusters
+        # (left, right, top, bottom), None when there are no goals
+        self.box = box
+        # ClusterMap -> its landmark_bounds for these goals
+        self.bounds = {}
+
+    def __bool__(self):
+        return bool(self.clusters)
+
+
+class ClusterPlanner:
+    # HuntPlanner for levels too big for a whole-level DistanceField: each
+    # Minotaur's decision is a ClusterMap search out to the nearest target,
+    # which costs about the same however big the level and the crowd are.
+    # Without cooperation the steps are exactly HuntPlanner's. With it, a
+    # Minotaur whose nearest target is claimed by another goes for the
+    # nearest unclaimed one within CLAIM_SLACK steps further, as in
+    # HuntPlanner; ties between equally near free targets may go another
+    # way than HuntPlanner's BFS.
+    def __init__(self, cmap, cooperate=False, slack=CLAIM_SLACK):
+        self.cmap = cmap
+        self.gates_open = cmap.gates_open
+        self.cooperate = cooperate
+        self.slack = slack
+        self.goals = Goals({}, None)
+        # hunter -> tile it is going for
+        self.claims = {}
+
+    def set_targets(self, tiles):
+        self.goals = self.cmap.goals(tiles)
+
+    def release(self, hunter):
+        self.claims.pop(hunter, None)
+
+    def next_step(self, hunter, start):
+        cmap, goals = self.cmap, self.goals
+        found = cmap.search(start, goals)
+        if found is None:
+            self.release(hunter)
+            return STAY
+        if self.cooperate:
+            taken = {tile for other, tile in self.claims.items() if other is not hunter}
+            goal = found[1][-1]
+            tile = (goal % cmap.width, goal // cmap.width)
+            if tile in taken:
+                free = cmap.without(goals, taken)
+                claimed = cmap.search(start, free, found[0] + self.slack)
+                if claimed is None:
+                    self.release(hunter)
+                else:
+                    goals, found = free, claimed
+                    goal = found[1][-1]
+                    self.claims[hunter] = (goal % cmap.width, goal // cmap.width)
+            else:
+                self.claims[hunter] = tile
+        if found[0] == 0:
+            return STAY
+        return cmap.first_step(found[1][0], goals, found)
+
+
+def cluster_map(level, gates_open):
+    # One map per level and gate state, cached on the Level like the walk
+    # graphs. The open-gates map starts from the closed one.
+    key = ("clusters", gates_open)
+    cmap = level.cache.get(key)
+    if cmap is None:
+        base = cluster_map(level, False) if gates_open else None
+        cmap = level.cache[key] = ClusterMap(level, gates_open, base=base)
+    return cmap
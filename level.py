@@ -0,0 +1,163 @@
+# Compiled level grid.
+#
+# A layout (list of strings in the MAP_LAYOUT format) is compiled once into
+# flat bytearrays: one flag byte per cell plus, for each gate state, a 4-bit
+# mask of which neighbours can be walked to. Movement checks and BFS
+# expansion are then a couple of integer operations instead of string
+# indexing and character comparisons. Compiling runs over whole numpy
+# arrays of flag bytes, so it costs milliseconds even for big mazes.
+
+import numpy as np
+
+# Cell flags
+WALL = 0x01
+GATE = 0x02
+PELLET = 0x04
+POWER_PELLET = 0x08      # "o" (eaten like a normal pellet for now)
+PLAYER_SPAWN = 0x10
+MINOTAUR_SPAWN = 0x20
+DOOR = 0x40              # "-" ghost-house door, walkable
+
+CHAR_FLAGS = {
+    "#": WALL,
+    "G": GATE,
+    ".": PELLET,
+    "o": PELLET | POWER_PELLET,
+    "P": PLAYER_SPAWN,
+    "M": MINOTAUR_SPAWN,
+    "-": DOOR,
+    " ": 0,
+}
+
+# Layout character -> flag byte
+FLAG_TABLE = np.zeros(256, dtype=np.uint8)
+for _ch, _flag in CHAR_FLAGS.items():
+    FLAG_TABLE[ord(_ch)] = _flag
+
+# Neighbour bits, in the order everything iterates directions in:
+# right, left, down, up
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIRECTION_BITS = {(0, 0): 0}
+for _bit, _direction in enumerate(NEIGHBOURS):
+    DIRECTION_BITS[_direction] = 1 << _bit
+
+# mask -> directions it allows, in NEIGHBOURS order
+MASK_DIRECTIONS = tuple(
+    tuple(d for d in NEIGHBOURS if mask & DIRECTION_BITS[d]) for mask in range(16)
+)
+
+
+def mask_steps(width):
+    # mask -> ((direction, index offset), ...) for flat-index BFS on a grid
+    # of the given width
+    return tuple(
+        tuple((d, d[0] + d[1] * width) for d in MASK_DIRECTIONS[mask])
+        for mask in range(16)
+    )
+
+
+def flag_rows(rows, width):
+    # Layout rows -> (rows, width) flag array. Short rows are padded with
+    # walls and unknown characters are open floor.
+    text = "".join(row.ljust(width, "#") for row in rows)
+    codes = np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)
+    return FLAG_TABLE[codes].reshape(len(rows), width)
+
+
+def passable(flags, gates_open):
+    ok = (flags & WALL) == 0
+    if not gates_open:
+        ok &= (flags & GATE) == 0
+    return ok
+
+
+def neighbour_masks(flags, above, below, gates_open):
+    # Masks for a chunk of flag rows, given the flag rows just above and
+    # below it (None at the map edges)
+    rows, width = flags.shape
+    ok = np.zeros((rows + 2, width + 2), dtype=bool)
+    ok[1:-1, 1:-1] = passable(flags, gates_open)
+    if above is not None:
+        ok[0, 1:-1] = passable(above, gates_open)
+    if below is not None:
+        ok[-1, 1:-1] = passable(below, gates_open)
+
+    masks = np.zeros((rows, width), dtype=np.uint8)
+    for dx, dy in NEIGHBOURS:
+        neighbour = ok[1 + dy : rows + 1 + dy, 1 + dx : width + 1 + dx]
+        masks |= neighbour.astype(np.uint8) * DIRECTION_BITS[(dx, dy)]
+    return masks
+
+
+class Level:
+    def __init__(self, layout):
+        self.layout = layout
+        self.height = len(layout)
+        self.width = max(len(row) for row in layout)
+        width = self.width
+
+        # Flag byte per cell, index = y * width + x
+        flags = flag_rows(layout, width)
+        self.cells = bytearray(flags.tobytes())
+
+        # Neighbour masks with gates closed / open, indexed by gates_open
+        self.masks = tuple(
+            bytearray(neighbour_masks(flags, None, None, gates_open).tobytes())
+            for gates_open in (False, True)
+        )
+
+        self.mask_steps = mask_steps(width)
+
+        # Derived structures (walk graphs, path tables, ...) per gate state
+        self.cache = {}
+
+    def _passable(self, index, gates_open):
+        flags = self.cells[index]
+        if flags & WALL:
+            return False
+        if flags & GATE and not gates_open:
+            return False
+        return True
+
+    def walkable(self, x, y, gates_open):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self._passable(y * self.width + x, gates_open)
+
+    def moves(self, x, y, gates_open):
+        # 4-bit mask of the directions you can step in from (x, y)
+        return self.masks[gates_open][y * self.width + x]
+
+    def flags(self, x, y):
+        return self.cells[y * self.width + x]
+
+    def flagged(self, flag):
+        # Flat indices of the cells with flag set, row-major, as a numpy
+        # array. Scanned once per flag and cached; don't modify it.
+        key = ("flagged", flag)
+        cells = self.cache.get(key)
+        if cells is None:
+            flags = np.frombuffer(self.cells, dtype=np.uint8)
+            cells = self.cache[key] = np.flatnonzero(flags & flag)
+        return cells
+
+    def find(self, flag):
+        # (x, y) of every cell with flag set, row-major
+        ys, xs = np.divmod(self.flagged(flag), self.width)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def count(self, flag):
+        # Number of cells with flag set
+        return len(self.flagged(flag))
+
+
+# One compiled Level per distinct layout
+_levels = {}
+
+
+def compile_level(layout):
+    key = tuple(layout)
+    level = _levels.get(key)
+    if level is None:
+        level = _levels[key] = Level(layout)
+    return level
@@ -0,0 +1,297 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from level import (
+    CHAR_FLAGS,
+    GATE,
+    MINOTAUR_SPAWN,
+    PELLET,
+    PLAYER_SPAWN,
+    Level,
+    flag_rows,
+    mask_steps,
+    neighbour_masks,
+)
+
+# Binary level files for mazes too big to keep as text.
+#
+# A text layout is read and compiled whole, all planes in memory at once, on
+# every start, which doesn't scale to multi-million-cell maps. A level file
+# holds the compiled grids instead:
+#
+#   header   magic, version, width, height, chunk rows, pellet count,
+#            marker count and offset (padded to DATA_OFFSET)
+#   planes   cell flags, neighbour masks with gates closed, with gates
+#            open: one byte per cell, row-major, each plane page-aligned
+#   markers  (kind, x, y) for every spawn and gate, and tribute start tiles
+#
+# Files are written and read chunk_rows rows at a time, so packing and
+# unpacking never hold more than one chunk of the map. MappedLevel maps the
+# file and uses memoryviews of the planes as its cells and masks, indexed
+# y * width + x like Level's bytearrays: pathfinding, tributes and the
+# renderer run on it unchanged, and the OS pages chunks in as they are
+# touched. Nothing is decoded up front and nothing is built per cell.
+#
+# Text layouts may end with a line listing the tribute start tiles, which
+# the MAP_LAYOUT characters can't mark (mazegen.py prints one, and unpack
+# writes one back), so text -> file -> text keeps them:
+#
+#   tributes 1,3 2,1 4,9
+#
+# Packing the built-in MAP_LAYOUT without one uses HUMAN_START_TILES.
+#
+#   python levelfile.py generate 2000 2000 big.mlvl --seed 1
+#   python levelfile.py pack layout.txt level.mlvl
+#   python mazegen.py 301 301 | python levelfile.py pack - level.mlvl
+#   python levelfile.py unpack level.mlvl layout.txt
+#   python levelfile.py info level.mlvl
+
+MAGIC = b"MLLEVEL\0"
+VERSION = 1
+HEADER = struct.Struct("<8s6IQ")
+MARKER = struct.Struct("<3I")
+
+# Planes start here and are padded to multiples of it
+DATA_OFFSET = 4096
+
+CHUNK_ROWS = 64
+
+# Cell flags Game looks up by position, kept as markers so finding them
+# doesn't scan the map
+MARKER_FLAGS = (PLAYER_SPAWN, MINOTAUR_SPAWN, GATE)
+# Tribute start tiles (not a cell flag; text layouts have no character
+# for them)
+TRIBUTE_START = 0x100
+
+# Starts the tribute start tiles line of a text layout
+TRIBUTES_LINE = "tributes"
+
+# Flag byte -> layout character
+CHAR_TABLE = np.full(256, ord(" "), dtype=np.uint8)
+for _ch, _flag in CHAR_FLAGS.items():
+    CHAR_TABLE[_flag] = ord(_ch)
+
+
+def plane_stride(cells):
+    return -(-cells // DATA_OFFSET) * DATA_OFFSET
+
+
+def write_level(path, layout, human_start_tiles=(), chunk_rows=CHUNK_ROWS):
+    # Pack a layout (list of strings in the MAP_LAYOUT format) into a level
+    # file, optionally with tribute start tiles
+    height = len(layout)
+    width = max(len(row) for row in layout)
+    stride = plane_stride(width * height)
+    markers = {kind: [] for kind in MARKER_FLAGS}
+    pellets = 0
+
+    with open(path, "wb") as f:
+        for y0 in range(0, height, chunk_rows):
+            y1 = min(y0 + chunk_rows, height)
+            flags = flag_rows(layout[y0:y1], width)
+            above = flag_rows(layout[y0 - 1 : y0], width)[0] if y0 > 0 else None
+            below = flag_rows(layout[y1 : y1 + 1], width)[0] if y1 < height else None
+            planes = (
+                flags,
+                neighbour_masks(flags, above, below, False),
+                neighbour_masks(flags, above, below, True),
+            )
+            for k, plane in enumerate(planes):
+                f.seek(DATA_OFFSET + k * stride + y0 * width)
+                f.write(plane.tobytes())
+
+            pellets += int(np.count_nonzero(flags & PELLET))
+            for kind in MARKER_FLAGS:
+                ys, xs = np.nonzero(flags & kind)
+                markers[kind].extend(zip(xs.tolist(), (ys + y0).tolist()))
+        markers[TRIBUTE_START] = [tuple(tile) for tile in human_start_tiles]
+
+        # Markers after the planes, header last once the counts are known
+        markers_at = DATA_OFFSET + 3 * stride
+        f.seek(markers_at)
+        count = 0
+        for kind, tiles in markers.items():
+            for x, y in tiles:
+                f.write(MARKER.pack(kind, x, y))
+                count += 1
+        f.seek(0)
+        f.write(
+            HEADER.pack(
+                MAGIC, VERSION, width, height, chunk_rows, pellets, count, markers_at
+            )
+        )
+
+
+class MappedLevel(Level):
+    # A Level read from a level file. cells and masks are views onto the
+    # mapped file, so opening one costs the same for any map size.
+    def __init__(self, path):
+        self.path = path
+        self.layout = None
+        with open(path, "rb") as f:
+            # The mapping stays valid after the file is closed
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path}: not a level file")
+        (
+            magic,
+            version,
+            self.width,
+            self.height,
+            self.chunk_rows,
+            self.pellets,
+            count,
+            markers_at,
+        ) = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a level file")
+        if version != VERSION:
+            raise ValueError(
+                f"{path}: level file version {version}, expected {VERSION}"
+            )
+
+        cells = self.width * self.height
+        stride = plane_stride(cells)
+        view = memoryview(self.map)
+        self.cells = view[DATA_OFFSET : DATA_OFFSET + cells]
+        self.masks = tuple(
+            view[DATA_OFFSET + k * stride : DATA_OFFSET + k * stride + cells]
+            for k in (1, 2)
+        )
+        self.mask_steps = mask_steps(self.width)
+        self.cache = {}
+
+        self.markers = {}
+        for kind, x, y in MARKER.iter_unpack(
+            self.map[markers_at : markers_at + count * MARKER.size]
+        ):
+            self.markers.setdefault(kind, []).append((x, y))
+        self.human_start_tiles = self.markers.get(TRIBUTE_START, [])
+
+    def chunks(self):
+        # (first row, flag array of the chunk's rows) per chunk, as views
+        # onto the mapped file
+        grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(
+            self.height, self.width
+        )
+        for y0 in range(0, self.height, self.chunk_rows):
+            yield y0, grid[y0 : y0 + self.chunk_rows]
+
+    def find(self, flag):
+        if flag in MARKER_FLAGS:
+            return list(self.markers.get(flag, ()))
+        return super().find(flag)
+
+    def count(self, flag):
+        if flag == PELLET:
+            return self.pellets
+        return super().count(flag)
+
+
+def tributes_line(human_start_tiles):
+    return " ".join([TRIBUTES_LINE] + [f"{x},{y}" for x, y in human_start_tiles])
+
+
+def unpack_level(level, out):
+    # Write a MappedLevel back out as layout text, one chunk at a time, and
+    # its tribute start tiles after it
+    for _, flags in level.chunks():
+        for row in CHAR_TABLE[flags]:
+            out.write(row.tobytes().decode("ascii"))
+            out.write("\n")
+    if level.human_start_tiles:
+        out.write(tributes_line(level.human_start_tiles) + "\n")
+
+
+# One MappedLevel per file, so repeated games (and a batch worker's games)
+# share the mapping and its cached walk graphs
+_mapped = {}
+
+
+def load_level(path):
+    key = os.path.abspath(path)
+    level = _mapped.get(key)
+    if level is None:
+        level = _mapped[key] = MappedLevel(path)
+    return level
+
+
+def read_layout(path):
+    # (layout rows, tribute start tiles or None) from a text file ("-" for
+    # stdin); trailing blank lines are dropped, trailing spaces on rows are
+    # kept
+    if path == "-":
+        lines = sys.stdin.read().split("\n")
+    else:
+        with open(path) as f:
+            lines = f.read().split("\n")
+    lines = [line.rstrip("\r") for line in lines]
+    while lines and not lines[-1]:
+        lines.pop()
+    human_start_tiles = None
+    if lines and lines[-1].startswith(TRIBUTES_LINE):
+        human_start_tiles = [
+            tuple(int(v) for v in tile.split(","))
+            for tile in lines.pop().split()[1:]
+        ]
+    return lines, human_start_tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert level files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="layout text -> level file")
+    pack.add_argument("layout", help='layout text file, "-" for stdin')
+    pack.add_argument("out")
+    pack.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    generate = commands.add_parser("generate", help="mazegen maze -> level file")
+    generate.add_argument("width", type=int)
+    generate.add_argument("height", type=int)
+    generate.add_argument("out")
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    unpack = commands.add_parser("unpack", help="level file -> layout text")
+    unpack.add_argument("level")
+    unpack.add_argument("out", nargs="?", default="-")
+    info = commands.add_parser("info", help="describe a level file")
+    info.add_argument("level")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        from simulation import HUMAN_START_TILES, MAP_LAYOUT
+
+        layout, human_start_tiles = read_layout(args.layout)
+        if human_start_tiles is None:
+            human_start_tiles = HUMAN_START_TILES if layout == MAP_LAYOUT else ()
+        write_level(args.out, layout, human_start_tiles, chunk_rows=args.chunk_rows)
+    elif args.command == "generate":
+        from mazegen import generate
+
+        maze = generate(args.width, args.height, seed=args.seed)
+        write_level(
+            args.out, maze.layout, maze.human_start_tiles, chunk_rows=args.chunk_rows
+        )
+    elif args.command == "unpack":
+        level = MappedLevel(args.level)
+        if args.out == "-":
+            unpack_level(level, sys.stdout)
+        else:
+            with open(args.out, "w") as f:
+                unpack_level(level, f)
+    else:
+        level = MappedLevel(args.level)
+        print(
+            f"{level.width}x{level.height}, {level.chunk_rows} rows per chunk, "
+            f"{level.pellets} pellets, {len(level.find(GATE))} gates, "
+            f"{len(level.human_start_tiles)} tribute starts, "
+            f"{os.path.getsize(args.level)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,103 @@
+import asyncio
 import sys
 
+import numpy as np
 import pygame
 import random
 import os
-
-# Game constants
-TILE_SIZE = 24
-MAP_LAYOUT = [
-    "############################",
-    "#............##............#",
-    "#.####.#####.##.#####.####.#",
-    "#o####.#####.##.#####.####o#",
-    "#.####.#####.##.#####.####.#",
-    "#..........................#",
-    "#.####.##.########.##.####.#",
-    "#.####.##.########.##.####.#",
-    "#......##....##....##......#",
-    "######.#####.##.#####.######",
-    "     #.#####.##.#####.#     ",
-    "     #.##..........##.#     ",
-    "     #.##.###--###.##.#     ",
-    "######.##.#      #.##.######",
-    "G P   .   #   M  #   .     G",
-    "######.##.#      #.##.######",
-    "     #.##.########.##.#     ",
-    "     #.##..........##.#     ",
-    "     #.##.########.##.#     ",
-    "######.##.########.##.######",
-    "#............##............#",
-    "#.####.#####.##.#####.####.#",
-    "#.####.#####.##.#####.####.#",
-    "#o..##................##..o#",
-    "###.##.##.########.##.##.###",
-    "###.##.##.########.##.##.###",
-    "#......##....##....##......#",
-    "#.##########.##.##########.#",
-    "#.##########.##.##########.#",
-    "#..........................#",
-    "############################",
-]
-
-ROWS = len(MAP_LAYOUT)
-COLS = len(MAP_LAYOUT[0])
+import time
+from collections import OrderedDict
+
+from simulation import (
+    COLS,
+    DOWN,
+    EVENT_ESCAPED,
+    EVENT_HUMANS_EATEN,
+    EVENT_MINOTAUR_FLEE,
+    EVENT_MINOTAUR_SLAIN,
+    EVENT_PELLET_EATEN,
+    EVENT_PLAYER_KILLED,
+    HUMAN_SIZE,
+    LEFT,
+    MINOTAUR_SIZE,
+    PLAYER_SIZE,
+    RIGHT,
+    ROWS,
+    TICK_RATE,
+    TILE_SIZE,
+    UP,
+    Game,
+    minotaur_start_tiles,
+)
+from assets import Assets
+from camera import Camera
+from level import GATE, WALL
+from pacing import WEB, Pacer
+from profiler import Profiler
+from replay import BUILTIN, Recorder, load_source
+from spatial import tile_range
+from timestep import FixedStep
+
+# MINOTAUR_LEVEL=path plays a level file (see levelfile.py), and
+# MINOTAUR_MAZE=WxH a generated maze (see mazegen.py) seeded with
+# MINOTAUR_MAZE_SEED, instead of the built-in labyrinth. LEVEL_SOURCE names
+# it the way replays record it (see replay.load_source).
+LEVEL_FILE = os.environ.get("MINOTAUR_LEVEL")
+MAZE = os.environ.get("MINOTAUR_MAZE")
+if LEVEL_FILE:
+    LEVEL_SOURCE = f"file {os.path.abspath(LEVEL_FILE)}"
+elif MAZE:
+    MAZE_SEED = int(os.environ.get("MINOTAUR_MAZE_SEED", "0"))
+    LEVEL_SOURCE = f"maze {MAZE} {MAZE_SEED}"
+else:
+    LEVEL_SOURCE = BUILTIN
+MAZE_LEVEL, MAZE_HUMAN_TILES = load_source(LEVEL_SOURCE)
 
 # Width reserved for UI panel on the left
 UI_PANEL_WIDTH = 200
 
-# Total window size: UI panel + maze
-WIDTH = COLS * TILE_SIZE + UI_PANEL_WIDTH
-HEIGHT = ROWS * TILE_SIZE
+# Tiles shown at once; the camera scrolls over anything bigger
+VIEW_COLS = int(os.environ.get("MINOTAUR_VIEW_COLS", COLS))
+VIEW_ROWS = int(os.environ.get("MINOTAUR_VIEW_ROWS", ROWS))
+
+# Total window size: UI panel + maze view
+WIDTH = VIEW_COLS * TILE_SIZE + UI_PANEL_WIDTH
+HEIGHT = VIEW_ROWS * TILE_SIZE
+VIEW_RECT = pygame.Rect(UI_PANEL_WIDTH, 0, VIEW_COLS * TILE_SIZE, HEIGHT)
 FPS = 60
 
+# Frame rate while the window is unfocused or minimized (any event brings
+# it straight back). The game keeps running meanwhile, so below 4 fps the
+# tick backlog cap (see timestep.py) slows it down. MINOTAUR_IDLE_STATS=1
+# prints how much CPU the idle stretches used on exit.
+IDLE_FPS = float(os.environ.get("MINOTAUR_IDLE_FPS", "5"))
+IDLE_STATS = os.environ.get("MINOTAUR_IDLE_STATS") == "1"
+
+# Simulation ticks per second, independent of the frame rate above
+SIM_RATE = int(os.environ.get("MINOTAUR_TICK_RATE", TICK_RATE))
+
+# Fixed seed for every run (default: a fresh one each run), and a directory
+# to save each run's replay to (see replay.py)
+SEED = os.environ.get("MINOTAUR_SEED")
+RECORD_DIR = os.environ.get("MINOTAUR_RECORD_DIR")
+
+# Size of the Minotaur pack, and whether it splits up the targets instead
+# of all chasing the nearest (see pathfinding.HuntPlanner)
+MINOTAUR_COUNT = int(os.environ.get("MINOTAUR_COUNT", "1"))
+COOPERATIVE = os.environ.get("MINOTAUR_COOPERATIVE") == "1"
+
+# Turbo: step the simulation as fast as possible and only render every
+# 1 / TURBO_FPS seconds (MINOTAUR_TURBO_FPS=0 skips rendering entirely)
+TURBO = os.environ.get("MINOTAUR_TURBO") == "1"
+TURBO_FPS = float(os.environ.get("MINOTAUR_TURBO_FPS", "10"))
+
+# "dirty" redraws only changed rects; "full" redraws the whole frame
+RENDER_MODE = os.environ.get("MINOTAUR_RENDER", "dirty")
+
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Minotaur's Labyrinth")
-clock = pygame.time.Clock()
+pacer = Pacer(FPS, IDLE_FPS)
 font = pygame.font.SysFont(None, 28)
 
 # Colors
@@ -68,537 +111,278 @@ GATE_COLOR_CLOSED = (0, 200, 200)
 GATE_COLOR_OPEN = (150, 250, 250)
 GREEN = (0, 255, 0)            # bright green pellets
 
-# Sprite sizes
-PLAYER_SIZE = TILE_SIZE * 2        # Theseus (player) bigger than one tile
-HUMAN_SIZE = TILE_SIZE * 2         # tributes same size as player
-MINOTAUR_SIZE = TILE_SIZE * 3      # Minotaur is a big boy
-
-# Wall and gate sprites
-wall_image = pygame.image.load(("sprites/wall.png")).convert_alpha()
-wall_image = pygame.transform.smoothscale(wall_image, (TILE_SIZE, TILE_SIZE))
-
-gate_locked_image = pygame.image.load(("sprites/gate_locked.png")).convert_alpha()
-gate_locked_image = pygame.transform.smoothscale(gate_locked_image, (TILE_SIZE, TILE_SIZE))
+# Sprites and sounds are loaded through one shared Assets cache: images on
+# first draw (scaled variants kept across restarts), sounds decoded in the
+# background. MINOTAUR_ASSET_STATS=1 prints per-asset load times on exit.
+assets = Assets()
+asset_stats = os.environ.get("MINOTAUR_ASSET_STATS") == "1"
 
-gate_open_image = pygame.image.load(("sprites/gate_open.png")).convert_alpha()
-gate_open_image = pygame.transform.smoothscale(gate_open_image, (TILE_SIZE, TILE_SIZE))
+# In-game sprites come pre-scaled from one packed atlas when it has been
+# built (tools/build_atlas.py); anything missing from it loads on its own
+SPRITE_ATLAS = "sprites/atlas.json"
+assets.load_atlas(SPRITE_ATLAS)
 
-floor_image = pygame.image.load(("sprites/floor.png")).convert_alpha()
-floor_image = pygame.transform.smoothscale(floor_image, (TILE_SIZE, TILE_SIZE))
+# Wall and gate sprites
+WALL_SPRITE = "sprites/wall.png"
+GATE_LOCKED_SPRITE = "sprites/gate_locked.png"
+GATE_OPEN_SPRITE = "sprites/gate_open.png"
+FLOOR_SPRITE = "sprites/floor.png"
 
 # Player and human sprites
-theseus_image = pygame.image.load(("sprites/theseus.png")).convert_alpha()
-theseus_image = pygame.transform.smoothscale(theseus_image, (PLAYER_SIZE, PLAYER_SIZE))
-
-tribute_image = pygame.image.load(("sprites/tribute.png")).convert_alpha()
-tribute_image = pygame.transform.smoothscale(tribute_image, (HUMAN_SIZE, HUMAN_SIZE))
-
-# Sound effects
-try:
-    minotaur_eat_sound = pygame.mixer.Sound(("sounds/game-eat-sound-83240.mp3"))
-    minotaur_eat_sound.set_volume(1.0)  # louder
-except pygame.error:
-    minotaur_eat_sound = None
-
-try:
-    minotaur_scream_sound = pygame.mixer.Sound(("sounds/male-death-scream-horror-352706.mp3"))
-    minotaur_scream_sound.set_volume(1.0)  # louder
-except pygame.error:
-    minotaur_scream_sound = None
-
-pellet_sounds = []
-pellet_sounds_dir = ("sounds/pellet")
+THESEUS_SPRITE = "sprites/theseus.png"
+TRIBUTE_SPRITE = "sprites/tribute.png"
+
+# Minotaur sprites, one per visual state
+MINOTAUR_SPRITES = {
+    "normal": "sprites/minotaur_normal.png",
+    "scared": "sprites/minotaur_scared.png",
+    "dead": "sprites/minotaur_dead.png",
+}
+
+# Game over and victory sprites (scaled to fit the window)
+GAMEOVER_SPRITE = "sprites/gameover.png"
+VICTORY_SPRITE = "sprites/victory.png"
+
+TILE = (TILE_SIZE, TILE_SIZE)
+
+# Sound effects: name -> (path, volume)
+SOUNDS = {
+    "minotaur_eat": ("sounds/game-eat-sound-83240.mp3", 1.0),
+    "minotaur_scream": ("sounds/male-death-scream-horror-352706.mp3", 1.0),
+    "game_start": ("sounds/game-start-6104.mp3", 1.0),
+    "game_over": ("sounds/game-over-arcade-6435.mp3", 1.0),
+    "victory_fanfare": (
+        "sounds/brass-fanfare-with-timpani-and-winchimes-reverberated-146260.mp3",
+        1.0,
+    ),
+    # Minotaur special sounds
+    "minotaur_growl": ("sounds/monster-growl-140377.mp3", 1.0),
+    "minotaur_kill_sword": ("sounds/violent-sword-slice-2-393841.mp3", 1.0),
+    "minotaur_kill_scream": ("sounds/terrifying-scream-353210.mp3", 1.0),
+}
+
+# Pellet sounds, one picked at random per pellet (quieter)
+PELLET_SOUND_VOLUME = 0.4
+pellet_sounds_dir = "sounds/pellet"
 try:
-    for name in os.listdir(pellet_sounds_dir):
-        if name.lower().endswith((".wav", ".ogg", ".mp3")):
-            path = os.path.join(pellet_sounds_dir, name)
-            try:
-                s = pygame.mixer.Sound(path)
-                s.set_volume(0.4)  # quieter pellets
-                pellet_sounds.append(s)
-            except pygame.error:
-                pass
-except FileNotFoundError:
-    pellet_sounds = []
-
-# Game over and victory sprites
-gameover_image = pygame.image.load(("sprites/gameover.png")).convert_alpha()
-victory_image = pygame.image.load(("sprites/victory.png")).convert_alpha()
-
-# Scale them to fit within the window while preserving aspect ratio
-def scale_to_fit(img, max_w, max_h):
-    w, h = img.get_width(), img.get_height()
-    scale = min(max_w / w, max_h / h, 1.0)
-    return pygame.transform.smoothscale(img, (int(w * scale), int(h * scale)))
-
-gameover_image = scale_to_fit(gameover_image, WIDTH, HEIGHT)
-victory_image = scale_to_fit(victory_image, WIDTH, HEIGHT)
-
-# Start / game-over / victory sounds
-try:
-    game_start_sound = pygame.mixer.Sound(("sounds/game-start-6104.mp3"))
-    game_start_sound.set_volume(1.0)
-except pygame.error:
-    game_start_sound = None
-
-try:
-    game_over_sound = pygame.mixer.Sound(("sounds/game-over-arcade-6435.mp3"))
-    game_over_sound.set_volume(1.0)
-except pygame.error:
-    game_over_sound = None
-
-try:
-    victory_fanfare_sound = pygame.mixer.Sound(
-        ("sounds/brass-fanfare-with-timpani-and-winchimes-reverberated-146260.mp3")
+    pellet_sound_paths = sorted(
+        os.path.join(pellet_sounds_dir, name)
+        for name in os.listdir(pellet_sounds_dir)
+        if name.lower().endswith((".wav", ".ogg", ".mp3"))
     )
-    victory_fanfare_sound.set_volume(1.0)
-except pygame.error:
-    victory_fanfare_sound = None
-
-# Minotaur special sounds
-try:
-    minotaur_growl_sound = pygame.mixer.Sound(("sounds/monster-growl-140377.mp3"))
-    minotaur_growl_sound.set_volume(1.0)
-except pygame.error:
-    minotaur_growl_sound = None
-
-try:
-    minotaur_kill_sword_sound = pygame.mixer.Sound(("sounds/violent-sword-slice-2-393841.mp3"))
-    minotaur_kill_sword_sound.set_volume(1.0)
-except pygame.error:
-    minotaur_kill_sword_sound = None
-
-try:
-    minotaur_kill_scream_sound = pygame.mixer.Sound(("sounds/terrifying-scream-353210.mp3"))
-    minotaur_kill_scream_sound.set_volume(1.0)
-except pygame.error:
-    minotaur_kill_scream_sound = None
-
-
-class Player:
-    def __init__(self, tile_x, tile_y):
-        # Tile coordinates (force ints)
-        self.tx = int(tile_x)
-        self.ty = int(tile_y)
-
-        # Pixel position (center of tile)
-        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
-        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
-
-        # Current direction and buffered next direction
-        self.dir = pygame.Vector2(0, 0)
-        self.next_dir = pygame.Vector2(0, 0)
-
-        # Speed should divide TILE_SIZE nicely (24 % 4 == 0)
-        self.speed = 4
-
-        # Rect used for drawing / pellet collision
-        self.rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
-        self.rect.center = (self.x, self.y)
-
-        # Whether gates are open for movement
-        self.gates_open = False
-
-    def handle_input(self, keys):
-        if keys[pygame.K_LEFT]:
-            self.next_dir = pygame.Vector2(-1, 0)
-        elif keys[pygame.K_RIGHT]:
-            self.next_dir = pygame.Vector2(1, 0)
-        elif keys[pygame.K_UP]:
-            self.next_dir = pygame.Vector2(0, -1)
-        elif keys[pygame.K_DOWN]:
-            self.next_dir = pygame.Vector2(0, 1)
-
-    def at_tile_center(self):
-        return (
-            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
-            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
-        )
-
-    def can_move(self, direction):
-        if direction.length_squared() == 0:
-            return False
-
-        # Next tile (cast to int so we never index with floats)
-        nx = int(self.tx + direction.x)
-        ny = int(self.ty + direction.y)
-
-        # Bounds check
-        if not (0 <= nx < COLS and 0 <= ny < ROWS):
-            return False
-
-        tile = MAP_LAYOUT[ny][nx]
-
-        # Wall always blocks
-        if tile == "#":
-            return False
-
-        # Gates block until opened
-        if tile == "G" and not self.gates_open:
-            return False
-
-        return True
-
-    def update(self):
-        # At tile center = allowed to turn/change direction
-        if self.at_tile_center():
-            # Sync tile coords from pixel coords (cast to int)
-            self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
-            self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
-
-            # Try buffered turn first
-            if self.can_move(self.next_dir):
-                self.dir = self.next_dir
-
-            # If current direction blocked, stop
-            if not self.can_move(self.dir):
-                self.dir = pygame.Vector2(0, 0)
-
-        # Move along current direction
-        self.x += self.dir.x * self.speed
-        self.y += self.dir.y * self.speed
-
-        # Update rect position
-        self.rect.center = (int(self.x), int(self.y))
-
-    def draw(self, surf):
-        rect = theseus_image.get_rect(
-            center=(int(self.x) + UI_PANEL_WIDTH, int(self.y))
-        )
-        surf.blit(theseus_image, rect)
-
-
-class Human:
-    def __init__(self, tile_x, tile_y):
-        # Tile coordinates
-        self.tx = int(tile_x)
-        self.ty = int(tile_y)
-
-        # Pixel position (center of tile)
-        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
-        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
-
-        # Current movement direction
-        self.dir = pygame.Vector2(0, 0)
-        # Slower than player
-        self.speed = 1.5
-
-        # Rect used for collisions with Minotaur
-        self.rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
-        self.rect.center = (self.x, self.y)
-
-        # Assign a random color (not yellow or red) – color unused now but kept
-        self.color = self.random_color()
-
-        # Gates open flag for movement
-        self.gates_open = False
-
-    @staticmethod
-    def random_color():
-        forbidden = {YELLOW, RED}
-        while True:
-            r = random.randint(50, 255)
-            g = random.randint(50, 255)
-            b = random.randint(50, 255)
-            if (r, g, b) not in forbidden:
-                return (r, g, b)
-
-    def at_tile_center(self):
-        return (
-            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
-            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
-        )
-
-    def can_move(self, direction):
-        if direction.length_squared() == 0:
-            return False
-
-        nx = int(self.tx + direction.x)
-        ny = int(self.ty + direction.y)
-
-        # Bounds check
-        if not (0 <= nx < COLS and 0 <= ny < ROWS):
-            return False
-
-        tile = MAP_LAYOUT[ny][nx]
-
-        if tile == "#":
-            return False
-
-        if tile == "G" and not self.gates_open:
-            return False
-
-        return True
-
-    def update(self):
-        # Choose a direction only at tile centers
-        if self.at_tile_center():
-            # Sync tile coords
-            self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
-            self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
-
-            # Candidate directions
-            dirs = [
-                pygame.Vector2(1, 0),
-                pygame.Vector2(-1, 0),
-                pygame.Vector2(0, 1),
-                pygame.Vector2(0, -1),
-            ]
-            possible = [d for d in dirs if self.can_move(d)]
-
-            if possible:
-                # Avoid immediately reversing direction if there is another option
-                if self.dir.length_squared() != 0:
-                    opposite = pygame.Vector2(-self.dir.x, -self.dir.y)
-                    non_reverse = [d for d in possible if d != opposite]
-                    if non_reverse:
-                        possible = non_reverse
-                self.dir = random.choice(possible)
-            else:
-                self.dir = pygame.Vector2(0, 0)
-
-        # Move in current direction
-        self.x += self.dir.x * self.speed
-        self.y += self.dir.y * self.speed
-        self.rect.center = (int(self.x), int(self.y))
-
-    def draw(self, surf):
-        rect = tribute_image.get_rect(
-            center=(int(self.x) + UI_PANEL_WIDTH, int(self.y))
-        )
-        surf.blit(tribute_image, rect)
-
-
-class Minotaur:
-    def __init__(self, tile_x, tile_y):
-        self.tx = int(tile_x)
-        self.ty = int(tile_y)
-
-        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
-        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
-
-        self.dir = pygame.Vector2(0, 0)
-        self.speed = 3  # base movement speed
-
-        # Load sprites
-        self.image_normal = pygame.image.load(
-            ("sprites/minotaur_normal.png")
-        ).convert_alpha()
-        self.image_scared = pygame.image.load(
-            ("sprites/minotaur_scared.png")
-        ).convert_alpha()
-        self.image_dead = pygame.image.load(
-            ("sprites/minotaur_dead.png")
-        ).convert_alpha()
-
-        # Make the minotaur visually larger than a single tile
-        sprite_size = MINOTAUR_SIZE
-
-        # Scale sprites to the larger size
-        self.image_normal = pygame.transform.smoothscale(
-            self.image_normal, (sprite_size, sprite_size)
-        )
-        self.image_scared = pygame.transform.smoothscale(
-            self.image_scared, (sprite_size, sprite_size)
-        )
-        self.image_dead = pygame.transform.smoothscale(
-            self.image_dead, (sprite_size, sprite_size)
-        )
+except FileNotFoundError:
+    pellet_sound_paths = []
 
-        # Current visual state: "normal", "scared", or "dead"
-        self.state = "normal"
+assets.preload_sounds(
+    [SOUNDS["game_start"]]
+    + [(path, PELLET_SOUND_VOLUME) for path in pellet_sound_paths]
+    + list(SOUNDS.values())
+)
 
-        # Use a bigger rect matching the sprite size, centered on the same x/y
-        self.rect = pygame.Rect(0, 0, sprite_size, sprite_size)
-        self.rect.center = (self.x, self.y)
 
-        # Flee mode (after pellets cleared)
-        self.flee = False
+def play_sound(name):
+    sound = assets.sound(*SOUNDS[name])
+    if sound is not None:
+        sound.play()
 
-        # Gates open flag for movement
-        self.gates_open = False
 
-    def at_tile_center(self):
-        return (
-            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
-            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
-        )
+def play_pellet_sound():
+    # Play a random pellet sound if available
+    if pellet_sound_paths:
+        sound = assets.sound(random.choice(pellet_sound_paths), PELLET_SOUND_VOLUME)
+        if sound is not None:
+            sound.play()
 
-    def can_move_to(self, nx, ny):
-        if not (0 <= nx < COLS and 0 <= ny < ROWS):
-            return False
-        tile = MAP_LAYOUT[ny][nx]
-        if tile == "#":
-            return False
-        if tile == "G" and not self.gates_open:
-            return False
-        return True
-
-    def update(self, player, humans):
-        # Choose a new direction only at tile centers
-        if self.at_tile_center():
-            # sync tile coords
-            self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
-            self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
-
-            from collections import deque
-
-            start = (self.tx, self.ty)
-
-            # Build goal set
-            if self.flee:
-                # Run away: choose a tile far from the player
-                best_goal = None
-                best_dist = -1
-                for y, row in enumerate(MAP_LAYOUT):
-                    for x, ch in enumerate(row):
-                        if ch == "#":
-                            continue
-                        dx = x - player.tx
-                        dy = y - player.ty
-                        dist = dx * dx + dy * dy
-                        if dist > best_dist:
-                            best_dist = dist
-                            best_goal = (x, y)
-                if best_goal is None:
-                    goals = {(player.tx, player.ty)}
-                else:
-                    goals = {best_goal}
-            else:
-                # Hunt nearest of player or humans
-                goals = {(player.tx, player.ty)}
-                for h in humans:
-                    goals.add((h.tx, h.ty))
-
-            # BFS to nearest goal
-            queue = deque([start])
-            came_from = {start: None}
-
-            # 4-way movement: right, left, down, up
-            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-            reached = None
-
-            while queue:
-                cx, cy = queue.popleft()
-                if (cx, cy) in goals:
-                    reached = (cx, cy)
-                    break
 
-                for dx, dy in directions:
-                    nx, ny = cx + dx, cy + dy
-                    if (nx, ny) in came_from:
-                        continue
-                    if not self.can_move_to(nx, ny):
-                        continue
-                    came_from[(nx, ny)] = (cx, cy)
-                    queue.append((nx, ny))
-
-            # Reconstruct path: from reached goal back to start
-            if reached is not None and reached != start:
-                current = reached
-                while came_from[current] != start:
-                    current = came_from[current]
-                next_x, next_y = current
-
-                dx = next_x - self.tx
-                dy = next_y - self.ty
-                self.dir = pygame.Vector2(dx, dy)
-            else:
-                # Fallback: stop if no path found
-                self.dir = pygame.Vector2(0, 0)
+def make_camera(game):
+    # View-sized camera over the game's maze, starting on the player
+    level = game.level
+    camera = Camera(
+        VIEW_RECT.width, VIEW_RECT.height,
+        level.width * TILE_SIZE, level.height * TILE_SIZE,
+    )
+    camera.center_on(game.player.x, game.player.y)
+    return camera
 
-        # move along chosen direction
-        self.x += self.dir.x * self.speed
-        self.y += self.dir.y * self.speed
 
-        self.rect.center = (int(self.x), int(self.y))
+def to_screen(camera, x, y):
+    # World pixels -> window pixels (the maze view is right of the panel)
+    return int(x) - camera.x + UI_PANEL_WIDTH, int(y) - camera.y
 
-    def draw(self, surf):
-        # Choose sprite based on state
-        if self.state == "dead":
-            image = self.image_dead
-        elif self.flee:
-            image = self.image_scared
-        else:
-            image = self.image_normal
-
-        # Offset drawing by UI_PANEL_WIDTH so the maze is to the right of the panel
-        screen_center = (self.rect.centerx + UI_PANEL_WIDTH, self.rect.centery)
-        rect = image.get_rect(center=screen_center)
-        surf.blit(image, rect)
-
-
-def build_level():
-    walls = []
-    pellets = []
-    gates = []
-    player_start = (0, 0)  # tile coords
-    minotaur_start = (0, 0)
-
-    for row_idx, row in enumerate(MAP_LAYOUT):
-        for col_idx, char in enumerate(row):
-            x = col_idx * TILE_SIZE
-            y = row_idx * TILE_SIZE
-
-            if char == "#":
-                walls.append(pygame.Rect(x, y, TILE_SIZE, TILE_SIZE))
-            elif char in ".o":
-                # pellet is a rect in the middle of the tile
-                pellet_size = TILE_SIZE * 3 // 8
-                offset = (TILE_SIZE - pellet_size) // 2
-                pellets.append(
-                    pygame.Rect(
-                        x + offset,
-                        y + offset,
-                        pellet_size,
-                        pellet_size,
-                    )
-                )
-            elif char == "G":
-                gates.append(pygame.Rect(x, y, TILE_SIZE, TILE_SIZE))
-            elif char == "P":
-                # store tile coordinates, not pixels
-                player_start = (col_idx, row_idx)
-            elif char == "M":
-                minotaur_start = (col_idx, row_idx)
 
-    return walls, pellets, gates, player_start, minotaur_start
+def player_sprite(x, y, camera):
+    image = assets.image(THESEUS_SPRITE, (PLAYER_SIZE, PLAYER_SIZE))
+    return image, image.get_rect(center=to_screen(camera, x, y))
 
 
-def draw_level(surf, walls, pellets, gates, survivors_count, pellets_left, gates_open):
-    # Clear UI panel on the left
-    surf.fill(BLACK, (0, 0, UI_PANEL_WIDTH, HEIGHT))
+def human_sprite(x, y, camera):
+    image = assets.image(TRIBUTE_SPRITE, (HUMAN_SIZE, HUMAN_SIZE))
+    return image, image.get_rect(center=to_screen(camera, x, y))
 
-    # Draw floor tiles across the maze area (shifted right by UI_PANEL_WIDTH)
-    for row in range(ROWS):
-        for col in range(COLS):
-            x = UI_PANEL_WIDTH + col * TILE_SIZE
-            y = row * TILE_SIZE
-            surf.blit(floor_image, (x, y))
 
-    # Draw walls using wall sprite (offset by UI_PANEL_WIDTH)
-    for wall in walls:
-        surf.blit(wall_image, (wall.x + UI_PANEL_WIDTH, wall.y))
+def minotaur_sprite(minotaur, x, y, camera):
+    # Choose sprite based on state
+    if minotaur.state == "dead":
+        state = "dead"
+    elif minotaur.flee:
+        state = "scared"
+    else:
+        state = "normal"
+    image = assets.image(MINOTAUR_SPRITES[state], (MINOTAUR_SIZE, MINOTAUR_SIZE))
 
-    # Draw gates using locked/open sprites (offset by UI_PANEL_WIDTH)
-    for gate in gates:
-        img = gate_open_image if gates_open else gate_locked_image
-        surf.blit(img, (gate.x + UI_PANEL_WIDTH, gate.y))
+    return image, image.get_rect(center=to_screen(camera, x, y))
 
-    # Draw pellets as bright green circles (offset by UI_PANEL_WIDTH)
-    for pellet in pellets:
-        center = (pellet.centerx + UI_PANEL_WIDTH, pellet.centery)
-        pygame.draw.circle(surf, GREEN, center, pellet.width // 2)
 
-    # Optional separator line between UI panel and maze
-    pygame.draw.line(
-        surf, WHITE, (UI_PANEL_WIDTH - 1, 0), (UI_PANEL_WIDTH - 1, HEIGHT), 2
+def entity_positions(game):
+    # Pixel centers of everything that moves: player, Minotaurs, tributes
+    tributes = game.tributes
+    return (
+        (game.player.x, game.player.y),
+        np.array([(m.x, m.y) for m in game.minotaurs], dtype=float),
+        tributes.x.copy(),
+        tributes.y.copy(),
     )
 
-    # Draw HUD: survivors and guidance at the top of the UI panel
-    hud_y = 10
-    survivors_surf = font.render(f"Survivors: {survivors_count}", True, WHITE)
 
+def blend_positions(prev, cur, alpha):
+    # Positions alpha of the way from the previous tick to the current one
+    if prev is None or alpha >= 1.0:
+        return cur
+    (ppx, ppy), pm, phx, phy = prev
+    (px, py), m, hx, hy = cur
+    player = (ppx + (px - ppx) * alpha, ppy + (py - ppy) * alpha)
+    minotaurs = pm + (m - pm) * alpha
+    if len(phx) != len(hx):
+        # Tributes were eaten in between; show the rest where they are now
+        return player, minotaurs, hx, hy
+    return player, minotaurs, phx + (hx - phx) * alpha, phy + (hy - phy) * alpha
+
+
+def entity_sprites(game, camera, positions):
+    # Everything that moves and is in view, in draw order (Minotaurs on
+    # top), at positions from blend_positions
+    player, minotaurs, hx, hy = positions
+    margin = MINOTAUR_SIZE // 2
+    sprites = []
+    if not game.dead and camera.sees(*player, margin):
+        sprites.append(player_sprite(*player, camera))
+    # Cull tributes in one array test before making any sprites
+    seen = camera.sees(hx, hy, margin)
+    for x, y in zip(hx[seen].tolist(), hy[seen].tolist()):
+        sprites.append(human_sprite(x, y, camera))
+    seen = camera.sees(minotaurs[:, 0], minotaurs[:, 1], margin)
+    for i in np.flatnonzero(seen).tolist():
+        x, y = minotaurs[i].tolist()
+        sprites.append(minotaur_sprite(game.minotaurs[i], x, y, camera))
+    return sprites
+
+
+def blit_sprites(surf, sprites):
+    # Sprites half out of view must not spill over the UI panel
+    surf.set_clip(VIEW_RECT)
+    surf.blits(sprites, doreturn=False)
+    surf.set_clip(None)
+    return [rect.clip(VIEW_RECT) for _, rect in sprites]
+
+
+def tiles_over(lo, hi, count):
+    # Tiles of a row/column of count tiles under the pixel span [lo, hi)
+    span = tile_range(lo, hi, TILE_SIZE)
+    return range(max(span.start, 0), min(span.stop, count))
+
+
+def draw_tiles(surf, game, camera, x, y, w, h):
+    # Floor, walls, gates and pellets under the world-pixel rect x, y, w, h,
+    # clipped to the maze view. Returns the window rect drawn to.
+    sx, sy = to_screen(camera, x, y)
+    area = pygame.Rect(sx, sy, w, h).clip(VIEW_RECT)
+    if not area:
+        return area
+    level = game.level
+    width = level.width
+    cells = level.cells
+    floor_image = assets.image(FLOOR_SPRITE, TILE)
+    wall_image = assets.image(WALL_SPRITE, TILE)
+    gate_image = assets.image(
+        GATE_OPEN_SPRITE if game.gates_open else GATE_LOCKED_SPRITE, TILE
+    )
+    ox, oy = to_screen(camera, 0, 0)
+    cols = tiles_over(x, x + w, width)
+    rows = tiles_over(y, y + h, level.height)
+
+    # Starts black like a fresh display (the floor sprite isn't fully
+    # opaque); tiles on the view edge are cut off by the clip
+    surf.set_clip(area)
+    surf.fill((0, 0, 0), area)
+    blits = []
+    for row in rows:
+        py = oy + row * TILE_SIZE
+        base = row * width
+        for col in cols:
+            pos = (ox + col * TILE_SIZE, py)
+            blits.append((floor_image, pos))
+            flags = cells[base + col]
+            if flags & WALL:
+                blits.append((wall_image, pos))
+            elif flags & GATE:
+                blits.append((gate_image, pos))
+    surf.blits(blits, doreturn=False)
+
+    pellets = game.pellets
+    for row in rows:
+        for col in cols:
+            pellet = pellets.get((col, row))
+            if pellet is not None:
+                draw_pellet(surf, pellet, camera)
+    draw_separator(surf)
+    surf.set_clip(None)
+    return area
+
+
+def draw_maze(surf, game, camera):
+    # Just the part of the maze in view
+    return draw_tiles(surf, game, camera, camera.x, camera.y, camera.w, camera.h)
+
+
+def draw_pellet(surf, pellet, camera):
+    center = to_screen(camera, pellet.centerx, pellet.centery)
+    pygame.draw.circle(surf, GREEN, center, pellet.width // 2)
+
+
+class TextCache:
+    # Rendered text surfaces keyed by (text, color), least recently used
+    # evicted first. The HUD strings barely ever change, so nearly every
+    # frame is served from here instead of font.render.
+    def __init__(self, font, max_entries=64):
+        self.font = font
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color):
+        key = (text, color)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.surfaces[key] = self.font.render(text, True, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surf
+
+
+text_cache = TextCache(font)
+
+
+# HUD layout inside the UI panel
+HUD_Y = 10
+STATUS_AREA = pygame.Rect(0, 0, UI_PANEL_WIDTH - 2, HUD_Y + 50)
+
+
+def hud_status_text(survivors_count, pellets_left, gates_open):
     if pellets_left > 0:
         # Still collecting
         pellets_text = f"Pellets left: {pellets_left}"
@@ -608,57 +392,270 @@ def draw_level(surf, walls, pellets, gates, survivors_count, pellets_left, gates
     else:
         # All pellets eaten and Minotaur slain, gates are open
         pellets_text = "Exit the Labyrinth!"
+    return f"Survivors: {survivors_count}", pellets_text
+
+
+def draw_status(surf, status):
+    # Survivors and guidance at the top of the UI panel
+    survivors_text, pellets_text = status
+    surf.blit(text_cache.render(survivors_text, WHITE), (10, HUD_Y))
+    surf.blit(text_cache.render(pellets_text, WHITE), (10, HUD_Y + 25))
+
+
+def draw_separator(surf):
+    # Separator line between UI panel and maze. It overlaps the maze view by
+    # a pixel, so redrawn tiles and scrolls put it back.
+    pygame.draw.line(
+        surf, WHITE, (UI_PANEL_WIDTH - 1, 0), (UI_PANEL_WIDTH - 1, HEIGHT), 2
+    )
 
-    pellets_surf = font.render(pellets_text, True, WHITE)
-    surf.blit(survivors_surf, (10, hud_y))
-    surf.blit(pellets_surf, (10, hud_y + 25))
 
-    pellets_surf = font.render(pellets_text, True, WHITE)
-    surf.blit(survivors_surf, (10, hud_y))
-    surf.blit(pellets_surf, (10, hud_y + 25))
+def draw_hud(surf, status):
+    # Clear UI panel on the left
+    surf.fill(BLACK, (0, 0, UI_PANEL_WIDTH, HEIGHT))
+
+    draw_separator(surf)
+    draw_status(surf, status)
 
     # Controls / instructions below the HUD
-    controls_y = hud_y + 60
-    controls_title = font.render("Controls:", True, WHITE)
-    move_line = font.render("Arrow keys - move", True, WHITE)
-    restart_line = font.render("R - restart", True, WHITE)
-    quit_line = font.render("Q - quit", True, WHITE)
+    controls_y = HUD_Y + 60
+    controls_title = text_cache.render("Controls:", WHITE)
+    move_line = text_cache.render("Arrow keys - move", WHITE)
+    restart_line = text_cache.render("R - restart", WHITE)
+    quit_line = text_cache.render("Q - quit", WHITE)
+    profile_line = text_cache.render("P - profiler", WHITE)
     surf.blit(controls_title, (10, controls_y))
     surf.blit(move_line, (10, controls_y + 20))
     surf.blit(restart_line, (10, controls_y + 40))
     surf.blit(quit_line, (10, controls_y + 60))
+    surf.blit(profile_line, (10, controls_y + 80))
 
     # Credits under the controls
-    credits_y = controls_y + 100
-    author_line = font.render("Kuzey Ozturac", True, WHITE)
-    date_line = font.render("29 Nov 2025", True, WHITE)
+    credits_y = controls_y + 110
+    author_line = text_cache.render("Kuzey Ozturac", WHITE)
+    date_line = text_cache.render("29 Nov 2025", WHITE)
     surf.blit(author_line, (10, credits_y))
     surf.blit(date_line, (10, credits_y + 20))
 
 
-def show_game_over():
+def draw_level(surf, game, camera):
+    draw_maze(surf, game, camera)
+    draw_hud(
+        surf,
+        hud_status_text(game.survivors_count, len(game.pellets), game.gates_open),
+    )
+
+
+class DirtyRectRenderer:
+    # Redraws only what changed since the previous frame.
+    #
+    # The backdrop is the whole frame minus the moving sprites: the maze in
+    # view with its remaining pellets, and the UI panel. Each frame we erase
+    # last frame's sprite rects from the backdrop, patch eaten pellets and
+    # changed HUD text into it, draw the sprites again and return just those
+    # rects for pygame.display.update. When the camera moves, the view part
+    # of the backdrop is shifted in place and only the strips that scrolled
+    # into view are drawn.
+
+    def __init__(self, surf):
+        self.surf = surf
+        self.backdrop = None
+        self.gates_open = None
+        self.camera_pos = None
+        self.eaten_seen = 0
+        self.status = None
+        self.sprite_rects = []
+
+    def invalidate(self):
+        # Force a full redraw next frame (e.g. after an overlay was shown)
+        self.backdrop = None
+
+    def rebuild(self, game, camera):
+        self.gates_open = game.gates_open
+        self.camera_pos = (camera.x, camera.y)
+        self.backdrop = pygame.Surface((WIDTH, HEIGHT)).convert()
+        draw_maze(self.backdrop, game, camera)
+        self.eaten_seen = len(game.pellets.eaten)
+        self.status = hud_status_text(
+            game.survivors_count, len(game.pellets), game.gates_open
+        )
+        draw_hud(self.backdrop, self.status)
+
+    def scroll(self, game, camera):
+        old_x, old_y = self.camera_pos
+        dx, dy = camera.x - old_x, camera.y - old_y
+        self.camera_pos = (camera.x, camera.y)
+        if abs(dx) >= camera.w or abs(dy) >= camera.h:
+            draw_maze(self.backdrop, game, camera)
+            return
+        # Shifts the separator's overlap too; it is redrawn below
+        self.backdrop.subsurface(VIEW_RECT).scroll(-dx, -dy)
+        if dx:
+            x = camera.x + camera.w - dx if dx > 0 else camera.x
+            draw_tiles(self.backdrop, game, camera, x, camera.y, abs(dx), camera.h)
+        if dy:
+            y = camera.y + camera.h - dy if dy > 0 else camera.y
+            draw_tiles(self.backdrop, game, camera, camera.x, y, camera.w, abs(dy))
+        draw_separator(self.backdrop)
+
+    def draw(self, game, camera, positions):
+        surf = self.surf
+        sprites = entity_sprites(game, camera, positions)
+
+        if self.backdrop is None or game.gates_open != self.gates_open:
+            # Gates changed (or first frame): everything is dirty
+            self.rebuild(game, camera)
+            surf.blit(self.backdrop, (0, 0))
+            self.sprite_rects = blit_sprites(surf, sprites)
+            return [surf.get_rect()]
+
+        dirty = []
+
+        # Camera moved: the whole view changes, but most of it is a shift
+        if (camera.x, camera.y) != self.camera_pos:
+            self.scroll(game, camera)
+            dirty.append(VIEW_RECT)
+
+        # Pellets eaten since last frame: redraw their tiles without them
+        eaten = game.pellets.eaten
+        if len(eaten) != self.eaten_seen:
+            for pellet in eaten[self.eaten_seen:]:
+                x = pellet.x // TILE_SIZE * TILE_SIZE
+                y = pellet.y // TILE_SIZE * TILE_SIZE
+                area = draw_tiles(
+                    self.backdrop, game, camera, x, y, TILE_SIZE, TILE_SIZE
+                )
+                if area:
+                    dirty.append(area)
+            self.eaten_seen = len(eaten)
+
+        # HUD text only when the strings change
+        status = hud_status_text(
+            game.survivors_count, len(game.pellets), game.gates_open
+        )
+        if status != self.status:
+            self.status = status
+            self.backdrop.fill(BLACK, STATUS_AREA)
+            draw_status(self.backdrop, status)
+            dirty.append(STATUS_AREA)
+
+        # Erase sprites where they were, then draw them where they are
+        for rect in self.sprite_rects:
+            dirty.append(rect)
+        for rect in dirty:
+            surf.blit(self.backdrop, rect, rect)
+        self.sprite_rects = blit_sprites(surf, sprites)
+        dirty.extend(self.sprite_rects)
+        return dirty
+
+
+class FrameStats:
+    # Rolling render-time and pushed-pixel stats, printed every few seconds
+    # when MINOTAUR_FRAME_STATS=1 so render modes can be compared.
+    def __init__(self, enabled, report_every=300):
+        self.enabled = enabled
+        self.report_every = report_every
+        self.times = []
+        self.pixels = 0
+
+    def record(self, seconds, rects):
+        if not self.enabled:
+            return
+        self.times.append(seconds)
+        self.pixels += sum(r.width * r.height for r in rects)
+        if len(self.times) >= self.report_every:
+            self.report()
+
+    def report(self):
+        if not self.times:
+            return
+        times = sorted(self.times)
+        frames = len(times)
+        mean_ms = sum(times) / frames * 1000
+        p95_ms = times[int(frames * 0.95) - 1] * 1000
+        coverage = self.pixels / (frames * WIDTH * HEIGHT) * 100
+        print(
+            f"[{RENDER_MODE}] render {mean_ms:.2f} ms avg, {p95_ms:.2f} ms p95, "
+            f"{coverage:.1f}% of screen pushed per frame ({frames} frames), "
+            f"text cache {text_cache.hits} hits / {text_cache.misses} renders"
+        )
+        self.times = []
+        self.pixels = 0
+
+
+frame_stats = FrameStats(os.environ.get("MINOTAUR_FRAME_STATS") == "1")
+
+# Phase profiler: MINOTAUR_PROFILE=1 or the P key shows rolling p50/p95/p99
+# per frame phase in the UI panel. MINOTAUR_TRACE=path also keeps every
+# phase and writes them as a Chrome trace on exit.
+TRACE_PATH = os.environ.get("MINOTAUR_TRACE")
+profiler = Profiler(
+    enabled=os.environ.get("MINOTAUR_PROFILE") == "1" or bool(TRACE_PATH),
+    trace=bool(TRACE_PATH),
+)
+
+
+class ProfileOverlay:
+    # Per-phase percentiles under the credits in the UI panel. The text is
+    # re-rendered every `refresh` frames so it is readable and cheap.
+    AREA = pygame.Rect(0, HUD_Y + 230, UI_PANEL_WIDTH - 2, 200)
+    COLUMNS = (95, 140, 185)  # right edges of p50 / p95 / p99
+
+    def __init__(self, refresh=15):
+        self.font = pygame.font.SysFont(None, 20)
+        self.refresh = refresh
+        self.rendered_at = None
+        self.rows = []
+
+    def render_rows(self):
+        render = self.font.render
+        header = ("phase", "p50", "p95", "p99")
+        rows = [[render(text, True, WHITE) for text in header]]
+        for name, *values in profiler.stats():
+            cells = [render(name, True, WHITE)]
+            cells += [render(f"{v * 1000:.2f}", True, WHITE) for v in values]
+            rows.append(cells)
+        return rows
+
+    def draw(self, surf):
+        frames = profiler.frames
+        if self.rendered_at is None or frames - self.rendered_at >= self.refresh:
+            self.rendered_at = frames
+            self.rows = self.render_rows()
+        surf.fill(BLACK, self.AREA)
+        y = self.AREA.y
+        for name, *values in self.rows:
+            surf.blit(name, (10, y))
+            for right, value in zip(self.COLUMNS, values):
+                surf.blit(value, value.get_rect(topright=(right, y)))
+            y += 18
+        return self.AREA
+
+
+profile_overlay = ProfileOverlay()
+
+
+async def show_game_over():
+    gameover_image = assets.image_fit(GAMEOVER_SPRITE, WIDTH, HEIGHT)
     rect = gameover_image.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     screen.blit(gameover_image, rect)
     pygame.display.flip()
+    return await wait_for_choice()
 
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    return "quit"
-                elif event.key == pygame.K_r:
-                    return "restart"
 
-
-def show_win_screen():
+async def show_win_screen():
+    victory_image = assets.image_fit(VICTORY_SPRITE, WIDTH, HEIGHT)
     rect = victory_image.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     screen.blit(victory_image, rect)
     pygame.display.flip()
+    return await wait_for_choice()
+
 
+async def wait_for_choice():
+    # Nothing on an end screen moves, so sleep until the player quits or
+    # restarts instead of polling
     while True:
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 return "quit"
             elif event.type == pygame.KEYDOWN:
@@ -666,172 +663,204 @@ def show_win_screen():
                     return "quit"
                 elif event.key == pygame.K_r:
                     return "restart"
+        await pacer.wait()
+
+
+def read_input(keys):
+    # Arrow keys -> buffered direction for the player (None = keep current)
+    if keys[pygame.K_LEFT]:
+        return LEFT
+    elif keys[pygame.K_RIGHT]:
+        return RIGHT
+    elif keys[pygame.K_UP]:
+        return UP
+    elif keys[pygame.K_DOWN]:
+        return DOWN
+    return None
+
+
+def play_event_sounds(events):
+    for event in events:
+        if event == EVENT_PELLET_EATEN:
+            play_pellet_sound()
+        elif event == EVENT_MINOTAUR_FLEE:
+            play_sound("minotaur_growl")
+        elif event == EVENT_MINOTAUR_SLAIN:
+            play_sound("minotaur_kill_sword")
+            play_sound("minotaur_kill_scream")
+        elif event == EVENT_PLAYER_KILLED:
+            play_sound("game_over")
+        elif event == EVENT_HUMANS_EATEN:
+            # Play both eat and scream sounds if available
+            play_sound("minotaur_eat")
+            play_sound("minotaur_scream")
+        elif event == EVENT_ESCAPED:
+            play_sound("victory_fanfare")
+
+
+def new_game():
+    return Game(
+        human_start_tiles=MAZE_HUMAN_TILES,
+        level=MAZE_LEVEL,
+        seed=int(SEED) if SEED is not None else None,
+        minotaur_tiles=(
+            minotaur_start_tiles(MAZE_LEVEL, MINOTAUR_COUNT)
+            if MINOTAUR_COUNT > 1
+            else None
+        ),
+        cooperative=COOPERATIVE,
+    )
 
 
-def main():
+async def main(game=None):
     # Play game start sound on each new run
-    if game_start_sound is not None:
-        game_start_sound.play()
-
-    walls, pellets, gates, player_start, minotaur_start = build_level()
-    player = Player(*player_start)
-
-    minotaur = Minotaur(*minotaur_start)
-
-    # Nine additional human tributes wandering the labyrinth
-    human_start_tiles = [
-        (1, 1),
-        (26, 1),
-        (1, 20),
-        (26, 20),
-        (1, 23),
-        (26, 23),
-        (13, 5),
-        (14, 5),
-        (13, 26),
-    ]
-    humans = [Human(tx, ty) for (tx, ty) in human_start_tiles]
-
-    score = 0
-    running = True
-    dead = False
-    won = False
-
-    # New state flags
-    minotaur_alive = True
-    minotaur_flee = False
-    gates_open = False
-    minotaur_flee_announced = False
-
-    while running:
-        clock.tick(FPS)
+    play_sound("game_start")
+
+    # All game rules live in simulation.Game; this loop only feeds it input,
+    # plays sounds for what happened and draws the result. Inputs go through
+    # a Recorder so the run can be saved as a replay.
+    if game is None:
+        game = new_game()
+    recorder = Recorder(
+        game,
+        level=LEVEL_SOURCE,
+        minotaurs=MINOTAUR_COUNT,
+        cooperative=COOPERATIVE,
+    )
+    try:
+        return await run(game, recorder)
+    finally:
+        if RECORD_DIR:
+            save_replay(recorder)
 
-        # --- Events ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    return "quit"
-                elif event.key == pygame.K_r:
-                    return "restart"
 
-        # Keep everyone informed about gate status
-        player.gates_open = gates_open
-        for h in humans:
-            h.gates_open = gates_open
-        minotaur.gates_open = gates_open
+def save_replay(recorder):
+    os.makedirs(RECORD_DIR, exist_ok=True)
+    replay = recorder.finish()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    replay.save(os.path.join(RECORD_DIR, f"{stamp}-{replay.seed}.replay"))
 
-        if not dead and not won:
-            keys = pygame.key.get_pressed()
-            player.handle_input(keys)
-            player.update()
-
-            for human in humans:
-                human.update()
-
-            if minotaur_alive:
-                minotaur.flee = minotaur_flee
-                # Update visual state based on flee mode
-                if minotaur_flee:
-                    minotaur.state = "scared"
-                else:
-                    minotaur.state = "normal"
-                minotaur.update(player, humans)
-
-            # Eat pellets
-            eaten = []
-            for pellet in pellets:
-                if player.rect.colliderect(pellet):
-                    eaten.append(pellet)
-                    score += 10
-                    # Play a random pellet sound if available
-                    if pellet_sounds:
-                        random.choice(pellet_sounds).play()
-            for pellet in eaten:
-                pellets.remove(pellet)
-
-            # Once all pellets are gone, minotaur starts fleeing
-            if not pellets and minotaur_alive and not minotaur_flee:
-                minotaur_flee = True
-                if not minotaur_flee_announced and minotaur_growl_sound is not None:
-                    minotaur_growl_sound.play()
-                minotaur_flee_announced = True
-
-            # Check player / minotaur interaction
-            if minotaur_alive and player.rect.colliderect(minotaur.rect):
-                if minotaur_flee:
-                    # Player kills the minotaur -> gates open
-                    minotaur_alive = False
-                    gates_open = True
-                    minotaur.state = "dead"
-                    # Play kill sounds
-                    if minotaur_kill_sword_sound is not None:
-                        minotaur_kill_sword_sound.play()
-                    if minotaur_kill_scream_sound is not None:
-                        minotaur_kill_scream_sound.play()
-                else:
-                    # Normal phase: minotaur kills you
-                    dead = True
-                    if game_over_sound is not None:
-                        game_over_sound.play()
-
-            # Minotaur hunts humans only while alive and not fleeing
-            if minotaur_alive and not minotaur_flee:
-                survivors = []
-                before_count = len(humans)
-                for h in humans:
-                    if not minotaur.rect.colliderect(h.rect):
-                        survivors.append(h)
-                killed = before_count - len(survivors)
-                if killed > 0:
-                    # Play both eat and scream sounds if available
-                    if minotaur_eat_sound is not None:
-                        minotaur_eat_sound.play()
-                    if minotaur_scream_sound is not None:
-                        minotaur_scream_sound.play()
-                humans = survivors
-
-            # Escape through an open gate = win
-            if gates_open:
-                for gate in gates:
-                    if player.rect.colliderect(gate):
-                        won = True
-                        if victory_fanfare_sound is not None:
-                            victory_fanfare_sound.play()
-                        break
 
-        # --- Draw ---
-        # Survivors = remaining humans + Theseus if he is still alive
-        survivors_count = len(humans) + (0 if dead else 1)
-        pellets_left = len(pellets)
-        draw_level(screen, walls, pellets, gates, survivors_count, pellets_left, gates_open)
-        if not dead:
-            player.draw(screen)
-        for human in humans:
-            human.draw(screen)
-        minotaur.draw(screen)
+async def run(game, recorder):
+    renderer = DirtyRectRenderer(screen) if RENDER_MODE == "dirty" else None
 
-        if dead:
-            action = show_game_over()
-            return action
-        elif won:
-            action = show_win_screen()
-            return action
+    # Ticks run on their own clock; frames draw wherever they land between
+    # the last two ticks. prev holds positions from before the latest tick.
+    stepper = FixedStep(SIM_RATE)
+    prev = None
 
-        pygame.display.flip()
+    # Game.step times its own phases into the same profiler
+    game.profiler = profiler
 
-    return "quit"
+    # Follows the player, so frames only draw what is in view
+    camera = make_camera(game)
+
+    while True:
+        if not TURBO:
+            await pacer.frame()
+        elif WEB:
+            # Turbo doesn't wait for frames, but the page still needs a turn
+            await asyncio.sleep(0)
+        frame_start = time.perf_counter()
+
+        # --- Events ---
+        with profiler.phase("events"):
+            for event in pacer.events():
+                if event.type == pygame.QUIT:
+                    return "quit"
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_q:
+                        return "quit"
+                    elif event.key == pygame.K_r:
+                        return "restart"
+                    elif event.key == pygame.K_p:
+                        profiler.enabled = not profiler.enabled
+                        # Repaint the panel under the overlay
+                        if renderer is not None:
+                            renderer.invalidate()
+
+        # --- Simulate ---
+        with profiler.phase("input"):
+            keys = pygame.key.get_pressed()
+            next_dir = read_input(keys)
+        if TURBO:
+            # As many ticks as fit before the next frame (or, with rendering
+            # off, the next event poll) is due
+            budget = 1.0 / TURBO_FPS if TURBO_FPS else 0.05
+            deadline = time.perf_counter() + budget
+            while not game.over and time.perf_counter() < deadline:
+                play_event_sounds(recorder.step(next_dir))
+            alpha = 1.0
+        else:
+            for _ in range(stepper.ticks_due()):
+                if game.over:
+                    break
+                prev = entity_positions(game)
+                play_event_sounds(recorder.step(next_dir))
+            alpha = stepper.alpha
+
+        if TURBO and not TURBO_FPS and not game.over:
+            continue
+
+        # --- Draw ---
+        draw_start = time.perf_counter()
+        with profiler.phase("draw"):
+            positions = blend_positions(prev, entity_positions(game), alpha)
+            camera.follow(*positions[0])
+            if renderer is not None:
+                dirty = renderer.draw(game, camera, positions)
+            else:
+                draw_level(screen, game, camera)
+                blit_sprites(screen, entity_sprites(game, camera, positions))
+                dirty = [screen.get_rect()]
+        if profiler.enabled:
+            dirty.append(profile_overlay.draw(screen))
+
+        if game.dead:
+            return await show_game_over()
+        elif game.won:
+            return await show_win_screen()
+
+        with profiler.phase("flip"):
+            if renderer is not None:
+                pygame.display.update(dirty)
+            else:
+                pygame.display.flip()
+        frame_stats.record(time.perf_counter() - draw_start, dirty)
+
+        # Whole frame, not counting the wait for the next one
+        if profiler.enabled:
+            profiler.record("frame", frame_start, time.perf_counter())
+        profiler.end_frame()
+
+
+async def play():
+    # New game on every restart until the player quits. The Game is built
+    # once; a restart restores its start state and gives it a new seed
+    # (the same one with MINOTAUR_SEED set), which is the game a fresh
+    # Game would be, without setting one up again.
+    game = new_game()
+    start = game.save()
+    while True:
+        action = await main(game)
+        if action == "quit":
+            break
+        game.restore(start)
+        game.reseed(int(SEED) if SEED is not None else None)
 
 
 if __name__ == "__main__":
     # On web (pygbag / emscripten), just run main() once and never sys.exit()
-    if sys.platform == "emscripten":
-        main()
+    if WEB:
+        asyncio.run(main())
     else:
-        while True:
-            action = main()
-            if action == "quit":
-                break
+        asyncio.run(play())
+        frame_stats.report()
+        if IDLE_STATS:
+            pacer.report()
+        if TRACE_PATH:
+            profiler.write_trace(TRACE_PATH)
+        if asset_stats:
+            assets.report()
         pygame.quit()
         sys.exit()
@@ -0,0 +1,145 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+# Procedural mazes in the MAP_LAYOUT character format.
+#
+# Corridors run along odd rows and columns. The left half (up to and
+# including the middle column) is a binary-tree maze: every cell opens to
+# its north or west neighbour, so every cell has a path to the top-left
+# corner. Extra walls are knocked out at random to add loops ("braiding"),
+# then the left half is mirrored onto the right. A ghost house with a door
+# sits in the middle inside a corridor ring, and a pair of gates is cut into
+# the side walls on the same row.
+#
+# Connectivity holds by construction: a cell's path north/west either
+# avoids the house or runs into the ring around it, and the ring itself
+# connects out. Everything is numpy array work, so even 1000x1000 mazes take
+# a fraction of a second.
+#
+#   python mazegen.py 101 51 --seed 7
+
+WALL = ord("#")
+PELLET = ord(".")
+POWER_PELLET = ord("o")
+GATE = ord("G")
+PLAYER = ord("P")
+MINOTAUR = ord("M")
+DOOR = ord("-")
+SPACE = ord(" ")
+
+# Smallest size that fits the ghost house, its ring and the player spawn
+MIN_SIZE = 15
+
+# Tributes per cell of the original 28x31 labyrinth
+TRIBUTE_DENSITY = 9 / (28 * 31)
+
+
+class Maze:
+    def __init__(self, layout, human_start_tiles, seed):
+        self.layout = layout
+        self.human_start_tiles = human_start_tiles
+        self.seed = seed
+        self.width = len(layout[0])
+        self.height = len(layout)
+
+
+def fit_size(size):
+    # Largest n <= size with n % 4 == 3: odd, with an odd middle row/column
+    # so the ghost house and the mirror axis sit on corridors
+    return size - (size - 3) % 4
+
+
+def generate(width, height, seed=None, tributes=None, braid=0.2):
+    # Maze of at most width x height tiles (rounded down to fit the corridor
+    # grid). tributes defaults to the original labyrinth's density.
+    width, height = fit_size(width), fit_size(height)
+    if width < MIN_SIZE or height < MIN_SIZE:
+        raise ValueError(f"mazes must be at least {MIN_SIZE}x{MIN_SIZE}")
+    rng = np.random.default_rng(seed)
+    cx, cy = width // 2, height // 2
+
+    # Left half, columns 0..cx; cells at odd (x, y)
+    grid = np.full((height, cx + 1), WALL, dtype=np.uint8)
+    grid[1::2, 1::2] = PELLET
+    rows, cols = (height - 1) // 2, (cx + 1) // 2
+
+    # Binary tree: open north or west. The top row can only go west, the
+    # left column only north, and the top-left cell is the root.
+    north = rng.random((rows, cols)) < 0.5
+    north[0, :] = False
+    north[:, 0] = True
+    west = ~north
+    north[0, 0] = west[0, 0] = False
+    r, c = np.nonzero(north)
+    grid[2 * r, 2 * c + 1] = PELLET
+    r, c = np.nonzero(west)
+    grid[2 * r + 1, 2 * c] = PELLET
+
+    # Braid: knock out interior walls between neighbouring cells
+    between_cols = grid[1:-1:2, 2::2]
+    between_cols[rng.random(between_cols.shape) < braid] = PELLET
+    between_rows = grid[2:-1:2, 1::2]
+    between_rows[rng.random(between_rows.shape) < braid] = PELLET
+
+    # Mirror onto the right half (the middle column is shared)
+    maze = np.concatenate([grid, grid[:, -2::-1]], axis=1)
+
+    # Ghost house: corridor ring, walls, open interior, door on top
+    maze[cy - 4, cx - 4 : cx + 5] = PELLET
+    maze[cy + 4, cx - 4 : cx + 5] = PELLET
+    maze[cy - 4 : cy + 5, cx - 4] = PELLET
+    maze[cy - 4 : cy + 5, cx + 4] = PELLET
+    maze[cy - 3 : cy + 4, cx - 3 : cx + 4] = WALL
+    maze[cy - 2 : cy + 3, cx - 2 : cx + 3] = SPACE
+    maze[cy - 3, cx] = DOOR
+    maze[cy, cx] = MINOTAUR
+
+    # Gates in both side walls, on a corridor row away from the house
+    gate_rows = [y for y in range(1, height - 1, 2) if abs(y - cy) > 4]
+    gate_y = gate_rows[rng.integers(len(gate_rows))]
+    maze[gate_y, 0] = maze[gate_y, width - 1] = GATE
+
+    # Power pellets in the corners, player below the house
+    for x, y in ((1, 1), (width - 2, 1), (1, height - 2), (width - 2, height - 2)):
+        maze[y, x] = POWER_PELLET
+    maze[cy + 6, cx] = PLAYER
+
+    # Tribute spawns: distinct pellet tiles outside the house ring
+    if tributes is None:
+        tributes = max(1, round(width * height * TRIBUTE_DENSITY))
+    open_tiles = maze == PELLET
+    open_tiles[cy - 4 : cy + 5, cx - 4 : cx + 5] = False
+    ys, xs = np.nonzero(open_tiles)
+    pick = rng.choice(len(xs), size=min(tributes, len(xs)), replace=False)
+    spawns = list(zip(xs[pick].tolist(), ys[pick].tolist()))
+
+    layout = [row.tobytes().decode("ascii") for row in maze]
+    return Maze(layout, spawns, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a generated maze.")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--braid", type=float, default=0.2)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    maze = generate(args.width, args.height, seed=args.seed, braid=args.braid)
+    elapsed = time.perf_counter() - start
+    print("\n".join(maze.layout))
+    # Tribute start tiles, in the line levelfile.py reads back
+    print(" ".join(["tributes"] + [f"{x},{y}" for x, y in maze.human_start_tiles]))
+    print(
+        f"{maze.width}x{maze.height}, {len(maze.human_start_tiles)} tributes, "
+        f"generated in {elapsed * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import time
+
+import pygame
+
+# Frame pacing for the pygame front end.
+#
+# With the window focused and visible the loop runs at the full frame rate.
+# Unfocused or minimized it drops to idle_fps, and screens that only wait
+# for a key (game over, victory) sleep until an event arrives instead of
+# polling. Every wait ends early on any event, so input is handled as soon
+# as it comes in.
+#
+# On desktop a wait blocks in pygame.event.wait, which sleeps inside SDL.
+# In the browser (pygbag, sys.platform == "emscripten") nothing may block,
+# so waits hand control back with asyncio.sleep and check for events in
+# between. Either way the loop awaits them.
+#
+# Wall and CPU time are split into active and idle stretches, so report()
+# can show how much CPU the idle stretches actually used.
+
+WEB = sys.platform == "emscripten"
+
+# How often a web wait checks for events (seconds)
+WEB_POLL = 1 / 30
+
+FOCUS_EVENTS = {
+    pygame.WINDOWFOCUSGAINED: ("focused", True),
+    pygame.WINDOWFOCUSLOST: ("focused", False),
+    pygame.WINDOWSHOWN: ("visible", True),
+    pygame.WINDOWRESTORED: ("visible", True),
+    pygame.WINDOWMAXIMIZED: ("visible", True),
+    pygame.WINDOWHIDDEN: ("visible", False),
+    pygame.WINDOWMINIMIZED: ("visible", False),
+}
+
+
+class Pacer:
+    def __init__(self, fps, idle_fps=5):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.focused = True
+        self.visible = True
+        # Events a wait woke up for, handed out by the next events()
+        self.pending = []
+        self.clock = pygame.time.Clock()
+        self.frame_end = None
+        # [wall, cpu] seconds spent active and idle, and where the current
+        # stretch started
+        self.active = [0.0, 0.0]
+        self.idle_time = [0.0, 0.0]
+        self.mark = None
+
+    @property
+    def idle(self):
+        return not (self.focused and self.visible)
+
+    def events(self):
+        # Everything that happened since the last call; window focus and
+        # visibility changes are tracked on the way through
+        events = self.pending + pygame.event.get()
+        self.pending = []
+        for event in events:
+            change = FOCUS_EVENTS.get(event.type)
+            if change is not None:
+                setattr(self, *change)
+        return events
+
+    async def frame(self):
+        # Wait out the rest of the frame, or of an idle frame while the
+        # window is in the background
+        if self.idle:
+            start = self.frame_end or time.perf_counter()
+            await self.wait(start + 1.0 / self.idle_fps, idle=True)
+        elif WEB:
+            start = self.frame_end or time.perf_counter()
+            await self.wait(start + 1.0 / self.fps, idle=False)
+        else:
+            self.clock.tick(self.fps)
+            self.account(idle=False)
+        self.frame_end = time.perf_counter()
+
+    async def wait(self, deadline=None, idle=True):
+        # Sleep until an event arrives or deadline (perf_counter seconds;
+        # None waits for an event however long it takes)
+        if WEB:
+            # Always yield at least once, or the page never gets a turn
+            await asyncio.sleep(0)
+            while not pygame.event.peek():
+                remaining = WEB_POLL
+                if deadline is not None:
+                    remaining = min(remaining, deadline - time.perf_counter())
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+        elif deadline is None:
+            self.pending.append(pygame.event.wait())
+        else:
+            timeout = int((deadline - time.perf_counter()) * 1000)
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    self.pending.append(event)
+        self.account(idle)
+
+    def account(self, idle):
+        # Close the current stretch, active or idle
+        now = (time.perf_counter(), time.process_time())
+        if self.mark is not None:
+            totals = self.idle_time if idle else self.active
+            totals[0] += now[0] - self.mark[0]
+            totals[1] += now[1] - self.mark[1]
+        self.mark = now
+
+    def report(self):
+        wall, cpu = self.idle_time
+        if wall <= 0:
+            return
+        active_wall, active_cpu = self.active
+        active_load = active_cpu / active_wall * 100 if active_wall > 0 else 0.0
+        print(
+            f"idle {wall:.1f} s (end screens, background): {cpu:.2f} s CPU, "
+            f"{cpu / wall * 100:.1f}% of a core instead of a busy loop's 100%; "
+            f"active {active_wall:.1f} s at {active_load:.1f}%"
+        )
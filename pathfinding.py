@@ -0,0 +1,546 @@
+from array import array
+from collections import Counter, deque
+
+import numpy as np
+
+from level import passable
+
+# Grid pathfinding for the Minotaur.
+#
+# The maze only changes when the G gates open, so instead of running a BFS
+# every time the Minotaur reaches a tile center we solve every walkable cell
+# once per (level, gate state) and keep the answers in a PathTable. Hunting
+# many moving targets uses a DistanceField instead, which is patched as the
+# targets move rather than rebuilt; any number of Minotaurs share one
+# through a HuntPlanner. Levels too big for a table are searched through a
+# cluster hierarchy instead (see clusters.py).
+
+STAY = (0, 0)
+
+# array("H") sentinel for "no path"
+UNREACHABLE = 0xFFFF
+
+# DistanceField rebuilds from scratch instead of patching once the targets
+# removed in an update leave more than this fraction of the walkable cells
+# to re-solve
+REBUILD_FRACTION = 0.25
+
+# A cooperative hunter searches this many steps past the nearest target for
+# one that no other hunter has claimed before settling for the nearest
+CLAIM_SLACK = 16
+
+
+def bfs_next_step(level, gates_open, start, goals):
+    # Reference search: BFS from start to the nearest goal and return the
+    # first step of that path, or STAY if already there / no path exists.
+    # Neighbours are expanded in NEIGHBOURS order (right, left, down, up);
+    # the tables below break ties the same way.
+    width, height = level.width, level.height
+    masks = level.masks[gates_open]
+    mask_steps = level.mask_steps
+    s = start[1] * width + start[0]
+    goal_ids = {
+        y * width + x for x, y in goals if 0 <= x < width and 0 <= y < height
+    }
+
+    queue = deque([s])
+    came_from = {s: None}
+    reached = None
+
+    while queue:
+        c = queue.popleft()
+        if c in goal_ids:
+            reached = c
+            break
+
+        for _, offset in mask_steps[masks[c]]:
+            n = c + offset
+            if n in came_from:
+                continue
+            came_from[n] = c
+            queue.append(n)
+
+    # Reconstruct path: from reached goal back to start
+    if reached is None or reached == s:
+        return STAY
+    current = reached
+    while came_from[current] != s:
+        current = came_from[current]
+    return (current % width - start[0], current // width - start[1])
+
+
+class WalkGraph:
+    # Walkable cells of a level for one gate state. Nodes are the cells' flat
+    # indices (y * width + x) and edges come straight from the level's
+    # neighbour masks, so a graph is two bytes per cell built in one numpy
+    # pass: nothing is made per cell, and a 1000x1000 level costs
+    # milliseconds. Distance arrays over a graph have one entry per cell;
+    # cells that can't be walked just stay UNREACHABLE.
+    def __init__(self, level, gates_open):
+        self.level = level
+        self.gates_open = gates_open
+        self.width = level.width
+        self.size = level.width * level.height
+        flags = np.frombuffer(level.cells, dtype=np.uint8)
+        masks = np.frombuffer(level.masks[gates_open], dtype=np.uint8)
+        walkable = passable(flags, gates_open)
+        # 1 per walkable cell
+        self.walkable = bytearray(walkable.astype(np.uint8).tobytes())
+        self.count = int(np.count_nonzero(walkable))
+        # Neighbour mask per cell, 0 on cells that can't be walked
+        self.masks = bytearray(np.where(walkable, masks, 0).astype(np.uint8))
+        # mask -> ((direction, node offset), ...) in NEIGHBOURS order, and
+        # the offsets on their own for the hot loops
+        self.steps = level.mask_steps
+        self.offsets = tuple(
+            tuple(offset for _, offset in pairs) for pairs in self.steps
+        )
+
+    def __len__(self):
+        return self.size
+
+    def node(self, tile):
+        # Node id of a walkable tile, or None
+        x, y = tile
+        n = y * self.width + x
+        if 0 <= x < self.width and 0 <= n < self.size and self.walkable[n]:
+            return n
+        return None
+
+    def tile(self, node):
+        return (node % self.width, node // self.width)
+
+    def nodes(self):
+        # Every walkable node, row-major
+        walkable = np.frombuffer(self.walkable, dtype=np.uint8)
+        return np.flatnonzero(walkable).tolist()
+
+    def tiles(self):
+        # Every walkable tile, row-major
+        return [self.tile(n) for n in self.nodes()]
+
+    def neighbours(self, node):
+        # ((direction, neighbour node), ...) in NEIGHBOURS order
+        return [(d, node + offset) for d, offset in self.steps[self.masks[node]]]
+
+
+def bfs_distances(graph, sources, dist=None):
+    # Steps from every node to the nearest of sources (node ids), written into
+    # dist if given. Unreached nodes are left at UNREACHABLE.
+    if dist is None:
+        dist = array("H", [UNREACHABLE]) * len(graph)
+    queue = deque()
+    for n in sources:
+        dist[n] = 0
+        queue.append(n)
+    masks, offsets = graph.masks, graph.offsets
+    while queue:
+        node = queue.popleft()
+        step = dist[node] + 1
+        for offset in offsets[masks[node]]:
+            n = node + offset
+            if dist[n] == UNREACHABLE:
+                dist[n] = step
+                queue.append(n)
+    return dist
+
+
+def bfs_within(graph, sources, limit):
+    # {node: steps} for the nodes at most limit steps from the nearest of
+    # sources (node ids). Stops there, so it costs the same on any level.
+    dist = dict.fromkeys(sources, 0)
+    frontier = list(dist)
+    masks, offsets = graph.masks, graph.offsets
+    for step in range(1, limit + 1):
+        reached = []
+        for node in frontier:
+            for offset in offsets[masks[node]]:
+                n = node + offset
+                if n not in dist:
+                    dist[n] = step
+                    reached.append(n)
+        frontier = reached
+    return dist
+
+
+def step_downhill(graph, dist, node):
+    # First direction (in NEIGHBOURS order) that gets one step closer in a
+    # distance array, or STAY at the bottom / when nothing is reachable
+    here = dist[node]
+    if here == 0 or here == UNREACHABLE:
+        return STAY
+    want = here - 1
+    for direction, offset in graph.steps[graph.masks[node]]:
+        if dist[node + offset] == want:
+            return direction
+    return STAY
+
+
+class PathTable:
+    # All-pairs shortest path distances over the walkable cells of a level.
+    def __init__(self, graph):
+        self.graph = graph
+        self.level = graph.level
+        self.gates_open = graph.gates_open
+
+        # dist[a][b] = steps from node a to node b (symmetric), UNREACHABLE
+        # if none
+        self.dist = {n: bfs_distances(graph, [n]) for n in graph.nodes()}
+        # The same rows by tile, for looking goals up
+        self.rows = {graph.tile(n): row for n, row in self.dist.items()}
+
+    def distance(self, a, b):
+        ia = self.graph.node(a)
+        ib = self.graph.node(b)
+        if ia is None or ib is None:
+            return None
+        d = self.dist[ia][ib]
+        return None if d == UNREACHABLE else d
+
+    def next_step(self, start, goals):
+        # First step from start towards the nearest of goals. Gives the same
+        # answer as bfs_next_step, ties included: BFS settles on the first
+        # direction (in NEIGHBOURS order) that lies on a shortest path to
+        # any nearest goal, which is exactly what the loop below checks.
+        graph = self.graph
+        s = graph.node(start)
+        if s is None:
+            # Standing somewhere the table doesn't cover; search instead
+            return bfs_next_step(self.level, self.gates_open, start, goals)
+        if start in goals:
+            return STAY
+
+        rows = self.rows
+        goal_rows = [rows[g] for g in goals if g in rows]
+        best = min((row[s] for row in goal_rows), default=UNREACHABLE)
+        if best == UNREACHABLE:
+            return STAY
+
+        want = best - 1
+        for direction, n in graph.neighbours(s):
+            for row in goal_rows:
+                if row[n] == want:
+                    return direction
+        return STAY
+
+
+class DistanceField:
+    # Multi-source distance field ("flow field"): dist[node] is the number of
+    # steps from node to the nearest target. Targets are kept as a multiset
+    # of tiles and the field is patched when they change, so moving a target
+    # by one tile or dropping one only touches the cells whose nearest
+    # target actually changed. All the targets that changed in one update
+    # are patched together: one wavefront out of the added ones, then one
+    # pass that finds and re-solves every cell the removed ones leave
+    # without a shortest path.
+    def __init__(self, graph):
+        self.graph = graph
+        self.gates_open = graph.gates_open
+        self.dist = array("H", [UNREACHABLE]) * len(graph)
+        # tile -> number of targets standing on it
+        self.targets = Counter()
+        # Patching more cells than this costs more than a rebuild
+        self.limit = int(graph.count * REBUILD_FRACTION)
+
+    def set_targets(self, tiles):
+        new = Counter(tiles)
+        old = self.targets
+        if new == old:
+            return
+        node = self.graph.node
+        added = [n for n in (node(t) for t in new if t not in old) if n is not None]
+        removed = [n for n in (node(t) for t in old if t not in new) if n is not None]
+        self.targets = new
+        self._patch(added, removed, len(old))
+
+    def remove_targets(self, tiles):
+        # Take one target off each of tiles, without passing the whole
+        # multiset again
+        targets = self.targets
+        before = len(targets)
+        node = self.graph.node
+        removed = []
+        for tile in tiles:
+            count = targets.get(tile)
+            if not count:
+                continue
+            if count > 1:
+                targets[tile] = count - 1
+                continue
+            del targets[tile]
+            n = node(tile)
+            if n is not None:
+                removed.append(n)
+        if removed:
+            self._patch([], removed, before)
+
+    def _patch(self, added, removed, before):
+        # Each of the before targets is nearest for about count / before
+        # cells, and those are what moving or dropping it makes the field
+        # patch. Past limit, patching them all costs more than one
+        # multi-source BFS.
+        if len(removed) * self.graph.count > self.limit * before:
+            self._rebuild()
+            return
+        # Seed first so removals find support from the new positions and
+        # stay local (a target stepping one tile touches very few cells)
+        if added:
+            self._add_sources(added)
+        if removed:
+            self._remove_sources(removed)
+
+    def _rebuild(self):
+        dist = self.dist
+        dist[:] = array("H", [UNREACHABLE]) * len(dist)
+        node = self.graph.node
+        sources = [n for n in map(node, self.targets) if n is not None]
+        bfs_distances(self.graph, sources, dist)
+
+    def _add_sources(self, nodes):
+        # One wavefront out of all the new sources at once. It only goes on
+        # through cells it brings closer, and since every source starts at 0
+        # the queue stays in distance order and no cell is lowered twice.
+        dist = self.dist
+        masks, offsets = self.graph.masks, self.graph.offsets
+        for node in nodes:
+            dist[node] = 0
+        queue = deque(nodes)
+        while queue:
+            u = queue.popleft()
+            step = dist[u] + 1
+            for offset in offsets[masks[u]]:
+                v = u + offset
+                if dist[v] > step:
+                    dist[v] = step
+                    queue.append(v)
+
+    def _remove_sources(self, nodes):
+        dist = self.dist
+        masks, offsets = self.graph.masks, self.graph.offsets
+
+        # Collect every cell whose shortest paths all ran through removed
+        # sources. Cells are visited in distance order, so by the time a
+        # cell is checked all invalidated cells one step closer are known.
+        # If that grows past limit after all, starting over is cheaper.
+        affected = set(nodes)
+        queue = deque(nodes)
+        limit = self.limit
+        while queue:
+            u = queue.popleft()
+            step = dist[u] + 1
+            for offset in offsets[masks[u]]:
+                v = u + offset
+                if dist[v] != step or v in affected:
+                    continue
+                supported = False
+                for offset in offsets[masks[v]]:
+                    w = v + offset
+                    if dist[w] == step - 1 and w not in affected:
+                        supported = True
+                        break
+                if not supported:
+                    affected.add(v)
+                    queue.append(v)
+            if len(affected) > limit:
+                self._rebuild()
+                return
+
+        # Re-solve the affected cells from their untouched border. Steps
+        # cost 1, so a BFS that takes border cells from a sorted list
+        # whenever they are no farther than the head of its queue visits
+        # cells in distance order without a heap.
+        for v in affected:
+            dist[v] = UNREACHABLE
+        seeds = []
+        for v in affected:
+            best = UNREACHABLE
+            for offset in offsets[masks[v]]:
+                w = v + offset
+                if w not in affected and dist[w] + 1 < best:
+                    best = dist[w] + 1
+            if best != UNREACHABLE:
+                dist[v] = best
+                seeds.append((best, v))
+        seeds.sort(reverse=True)
+        queue = deque()
+        while seeds or queue:
+            if queue and (not seeds or dist[queue[0]] <= seeds[-1][0]):
+                u = queue.popleft()
+            else:
+                d, u = seeds.pop()
+                if d != dist[u]:
+                    continue
+            step = dist[u] + 1
+            for offset in offsets[masks[u]]:
+                v = u + offset
+                if dist[v] > step:
+                    dist[v] = step
+                    queue.append(v)
+
+    def distance(self, tile):
+        n = self.graph.node(tile)
+        if n is None or self.dist[n] == UNREACHABLE:
+            return None
+        return self.dist[n]
+
+    def next_step(self, start):
+        # Same answer as bfs_next_step(start, targets): first direction (in
+        # NEIGHBOURS order) that is one step closer to the nearest target.
+        if start in self.targets:
+            return STAY
+        graph = self.graph
+        s = graph.node(start)
+        if s is None:
+            return bfs_next_step(
+                graph.level, graph.gates_open, start, set(self.targets)
+            )
+        return step_downhill(graph, self.dist, s)
+
+
+class HuntPlanner:
+    # Hunting for any number of Minotaurs from one shared DistanceField.
+    # Game sets the targets once per tick and every Minotaur walks downhill
+    # on the same field, so the per-tick cost barely depends on the pack
+    # size. With cooperate on, a deciding Minotaur first looks for the
+    # nearest target no other Minotaur has claimed, so a pack spreads over
+    # the crowd instead of all chasing one tribute. That search is a BFS
+    # from the Minotaur that stops at the first free target, and gives up
+    # CLAIM_SLACK steps past the nearest one, falling back to the field.
+    def __init__(self, graph, cooperate=False, slack=CLAIM_SLACK):
+        self.graph = graph
+        self.gates_open = graph.gates_open
+        self.field = DistanceField(graph)
+        self.cooperate = cooperate
+        self.slack = slack
+        # hunter -> tile it is going for
+        self.claims = {}
+
+    def set_targets(self, tiles):
+        self.field.set_targets(tiles)
+
+    def release(self, hunter):
+        self.claims.pop(hunter, None)
+
+    def next_step(self, hunter, start):
+        if self.cooperate:
+            step = self._claim(hunter, start)
+            if step is not None:
+                return step
+            self.release(hunter)
+        return self.field.next_step(start)
+
+    def _claim(self, hunter, start):
+        # First step towards the nearest unclaimed target (claiming it), or
+        # None if there is none within reach
+        graph = self.graph
+        s = graph.node(start)
+        if s is None:
+            return None
+        nearest = self.field.dist[s]
+        if nearest == UNREACHABLE:
+            return None
+        targets = self.field.targets
+        taken = {tile for other, tile in self.claims.items() if other is not hunter}
+        if start in targets and start not in taken:
+            self.claims[hunter] = start
+            return STAY
+
+        # Level by level, so targets are found in BFS order (ties go the
+        # same way as everywhere else); first[n] is the step out of start
+        # on the path to n
+        masks, offsets = graph.masks, graph.offsets
+        first = {s: None}
+        frontier = []
+        for direction, n in graph.neighbours(s):
+            first[n] = direction
+            frontier.append(n)
+        depth = 1
+        limit = nearest + self.slack
+        while frontier and depth <= limit:
+            for node in frontier:
+                tile = graph.tile(node)
+                if tile in targets and tile not in taken:
+                    self.claims[hunter] = tile
+                    return first[node]
+            next_frontier = []
+            for node in frontier:
+                step = first[node]
+                for offset in offsets[masks[node]]:
+                    n = node + offset
+                    if n not in first:
+                        first[n] = step
+                        next_frontier.append(n)
+            frontier = next_frontier
+            depth += 1
+        return None
+
+
+class FleeIndex:
+    # Where the Minotaur should run to while it flees: for each player tile,
+    # the reachable cell farthest from it by walking distance (first in
+    # row-major order on ties). Filled in lazily, one BFS per player tile the
+    # first time it is asked about; after that every decision is a lookup.
+    def __init__(self, graph):
+        self.graph = graph
+        self.gates_open = graph.gates_open
+        # player node -> flee goal node
+        self.goals = {}
+        # flee goal node -> distance array towards it
+        self.fields = {}
+
+    def goal_node(self, player_node):
+        goal = self.goals.get(player_node)
+        if goal is None:
+            dist = bfs_distances(self.graph, [player_node])
+            farthest = max(d for d in dist if d != UNREACHABLE)
+            goal = self.goals[player_node] = dist.index(farthest)
+        return goal
+
+    def target(self, player_tile):
+        p = self.graph.node(player_tile)
+        if p is None:
+            return None
+        return self.graph.tile(self.goal_node(p))
+
+    def next_step(self, start, player_tile):
+        graph = self.graph
+        p = graph.node(player_tile)
+        s = graph.node(start)
+        if p is None or s is None:
+            # Off the graph: fall back to a search (towards the player, as
+            # before, if the player's own tile has no flee goal)
+            goal = self.target(player_tile) or player_tile
+            return bfs_next_step(graph.level, graph.gates_open, start, {goal})
+        goal = self.goal_node(p)
+        dist = self.fields.get(goal)
+        if dist is None:
+            dist = self.fields[goal] = bfs_distances(graph, [goal])
+        return step_downhill(graph, dist, s)
+
+
+# Graphs, tables and flee indexes are built on first use and cached on the
+# Level, one per gate state
+
+
+def _cached(level, kind, gates_open, build):
+    key = (kind, gates_open)
+    value = level.cache.get(key)
+    if value is None:
+        value = level.cache[key] = build()
+    return value
+
+
+def walk_graph(level, gates_open):
+    return _cached(level, "graph", gates_open, lambda: WalkGraph(level, gates_open))
+
+
+def path_table(level, gates_open):
+    return _cached(
+        level, "table", gates_open, lambda: PathTable(walk_graph(level, gates_open))
+    )
+
+
+def flee_index(level, gates_open):
+    return _cached(
+        level, "flee", gates_open, lambda: FleeIndex(walk_graph(level, gates_open))
+    )
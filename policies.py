@@ -0,0 +1,133 @@
+import random
+
+from pathfinding import DistanceField, bfs_within, walk_graph
+from simulation import DOWN, LEFT, RIGHT, TILE_SIZE, UP
+
+# Scripted Theseus players for headless runs.
+#
+# A policy is called once per tick with the game and returns the player's
+# buffered direction for that tick, or None to keep the current one (the
+# same thing main.py gets from the arrow keys). Policies are built per game
+# from its seed, so batch runs and replays stay reproducible.
+#
+# Policies that only ever answer at the player's tile centers set
+# centers_only: the ticks in between make no difference to them, so batch
+# runs can skip those ticks (see Game.skip_idle).
+
+
+class Idle:
+    # Never touches the keys
+    centers_only = True
+
+    def __init__(self, seed=None):
+        pass
+
+    def __call__(self, game):
+        return None
+
+
+class RandomWalk:
+    # Presses a random arrow key every now and then
+    centers_only = False
+
+    def __init__(self, seed=None, turn_chance=0.05):
+        self.rng = random.Random(seed)
+        self.turn_chance = turn_chance
+
+    def __call__(self, game):
+        if self.rng.random() < self.turn_chance:
+            return self.rng.choice((RIGHT, LEFT, DOWN, UP))
+        return None
+
+
+class Greedy:
+    # Plays the game the obvious way: eat the nearest pellet while keeping
+    # out of the Minotaurs' reach, chase them once they flee, then head for the
+    # nearest gate. Each decision scores the neighbouring tiles by distance
+    # to the goals and to the nearest Minotaur, using the shared walk graphs.
+    #
+    # Goal distances come from a DistanceField the policy keeps between
+    # decisions. While it goes for pellets, it takes the ones eaten since
+    # the last decision off the field from the grid's eaten log, so a
+    # decision doesn't look at every pellet left; a restored or copied
+    # grid (a new log) means one full resync. Threats only matter within
+    # danger steps, so they come from a BFS out of the Minotaurs that stops
+    # there.
+    centers_only = True
+
+    def __init__(self, seed=None, danger=4):
+        # Walking distance to a Minotaur that counts as too close
+        self.danger = danger
+        # Distances to the current goals, and what they are: "pellets",
+        # "flee" or "gates"
+        self.field = None
+        self.goal = None
+        # The eaten log the field was last synced with, and how much of it
+        self.eaten = None
+        self.seen = 0
+
+    def goal_field(self, game, graph, hunters):
+        field = self.field
+        if field is None or field.graph is not graph:
+            field = self.field = DistanceField(graph)
+            self.goal = None
+        if game.gates_open:
+            goal = "gates"
+            field.set_targets((g.x // TILE_SIZE, g.y // TILE_SIZE) for g in game.gates)
+        elif game.minotaur_flee:
+            goal = "flee"
+            field.set_targets(hunters)
+        else:
+            goal = "pellets"
+            eaten = game.pellets.eaten
+            if self.goal == goal and eaten is self.eaten and len(eaten) >= self.seen:
+                field.remove_targets(
+                    (p.x // TILE_SIZE, p.y // TILE_SIZE) for p in eaten[self.seen :]
+                )
+            else:
+                field.set_targets(game.pellets.tiles())
+            self.eaten, self.seen = eaten, len(eaten)
+        self.goal = goal
+        return field
+
+    def __call__(self, game):
+        # Decide only at tile centers, where the player turns; in between
+        # the direction buffered at the last center is still the plan
+        player = game.player
+        if not player.at_tile_center():
+            return None
+        half = TILE_SIZE // 2
+        start = ((player.x - half) // TILE_SIZE, (player.y - half) // TILE_SIZE)
+        hunters = [(m.tx, m.ty) for m in game.minotaurs if m.alive]
+        graph = walk_graph(game.level, game.gates_open)
+        s = graph.node(start)
+        if s is None:
+            return None
+        goal_dist = self.goal_field(game, graph, hunters).dist
+
+        # Steps from the nearest Minotaur, while they are a threat
+        threats = {}
+        if not game.minotaur_flee:
+            hunter_nodes = (graph.node(h) for h in hunters)
+            threats = bfs_within(
+                graph, [h for h in hunter_nodes if h is not None], self.danger
+            )
+
+        # Ties go to anything but turning back, which stops the player
+        # dithering between two equally good tiles
+        reverse = (-player.dir[0], -player.dir[1])
+        best = None
+        best_key = None
+        for direction, n in graph.neighbours(s):
+            threat = threats.get(n)
+            if threat is not None:
+                # Too close: among bad options, the one farthest away
+                key = (0, threat, direction != reverse)
+            else:
+                key = (1, -goal_dist[n], direction != reverse)
+            if best_key is None or key > best_key:
+                best, best_key = direction, key
+        return best
+
+
+POLICIES = {"idle": Idle, "random": RandomWalk, "greedy": Greedy}
@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from collections import deque
+
+# Per-frame phase timing.
+#
+# Code marks its phases with `with profiler.phase("name"):`. Time spent in
+# each phase is summed per frame and end_frame() files the sums into a
+# rolling window, from which percentiles are read for the on-screen overlay.
+# Optionally every phase is also kept as a Chrome trace event
+# (chrome://tracing, Perfetto) for offline analysis. A disabled profiler
+# hands out one shared no-op context, so leaving the calls in costs next to
+# nothing.
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled=True, window=300, trace=False, max_events=200000):
+        self.enabled = enabled
+        self.window = window
+        # Phase names in first-seen order (the overlay keeps that order)
+        self.names = []
+        # name -> seconds spent in it this frame
+        self.current = {}
+        # name -> per-frame totals for the last window frames
+        self.history = {}
+        self.frames = 0
+        # Chrome trace events, oldest dropped first
+        self.trace = trace
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        if name not in self.current:
+            if name not in self.history:
+                self.names.append(name)
+                self.history[name] = deque(maxlen=self.window)
+            self.current[name] = 0.0
+        self.current[name] += end - start
+        if self.trace:
+            self.events.append((name, start, end))
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        # Phases that didn't run this frame count as zero
+        for name in self.names:
+            self.history[name].append(self.current.get(name, 0.0))
+        self.current = {}
+        self.frames += 1
+
+    def percentiles(self, name, quantiles=(0.5, 0.95, 0.99)):
+        samples = sorted(self.history.get(name, ()))
+        if not samples:
+            return tuple(0.0 for _ in quantiles)
+        last = len(samples) - 1
+        return tuple(samples[min(last, int(q * len(samples)))] for q in quantiles)
+
+    def stats(self):
+        # [(name, p50, p95, p99), ...] in seconds
+        return [(name, *self.percentiles(name)) for name in self.names]
+
+    def write_trace(self, path):
+        # Chrome trace-event JSON; complete ("X") events in microseconds
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": 0,
+            }
+            for name, start, end in self.events
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# Shared disabled profiler, the default wherever one is optional
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,304 @@
+import hashlib
+import struct
+import sys
+
+from level import compile_level
+from levelfile import load_level
+from mazegen import generate
+from simulation import (
+    DOWN,
+    HUMAN_START_TILES,
+    LEFT,
+    LEVEL,
+    RIGHT,
+    STOP,
+    UP,
+    Game,
+    minotaur_start_tiles,
+)
+
+# Recording and replaying games.
+#
+# A game is fully determined by its setup, its seed and the player's
+# inputs, so a replay is just those: the seed, the level and Minotaur pack
+# when they aren't the defaults, then one line per tick on which the
+# buffered direction changed. State hashes at regular checkpoints (and at
+# the end) let playback prove it reproduced the same game.
+#
+#   MLREPLAY 2
+#   seed 1234567890
+#   level maze 201x201 7
+#   minotaurs 3
+#   cooperative 1
+#   1 R
+#   45 U
+#   # 600 9f2c61d0a3b4e5f6
+#   end 732 0c1d2e3f40516273
+#
+# Playback is headless and runs as fast as Game.step allows:
+#
+#   python replay.py game.replay
+
+FORMAT = "MLREPLAY 2"
+# Older headers playback still reads (version 1 had no setup lines)
+FORMATS = ("MLREPLAY 1", FORMAT)
+
+# Where a game's level comes from: the built-in labyrinth, a level file
+# ("file PATH", see levelfile.py) or a generated maze ("maze WxH SEED", see
+# mazegen.py)
+BUILTIN = "builtin"
+
+# Ticks between state-hash checkpoints while recording
+CHECKPOINT_EVERY = 600
+
+DIRECTION_CODES = {RIGHT: "R", LEFT: "L", UP: "U", DOWN: "D", STOP: "S"}
+CODE_DIRECTIONS = {code: d for d, code in DIRECTION_CODES.items()}
+
+
+class ReplayMismatch(Exception):
+    # Playback diverged from the recording
+    def __init__(self, tick, expected, actual):
+        super().__init__(
+            f"state hash mismatch at tick {tick}: expected {expected}, got {actual}"
+        )
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+def state_hash(game):
+    # Short digest of everything that decides how the game continues
+    h = hashlib.blake2b(digest_size=8)
+    player = game.player
+    minotaur = game.minotaur
+    h.update(
+        struct.pack(
+            "<4d4i",
+            player.x,
+            player.y,
+            minotaur.x,
+            minotaur.y,
+            *player.dir,
+            *minotaur.dir,
+        )
+    )
+    h.update(
+        struct.pack(
+            "<4i5?",
+            *player.next_dir,
+            game.ticks,
+            game.score,
+            game.dead,
+            game.won,
+            game.minotaur_alive,
+            game.minotaur_flee,
+            game.gates_open,
+        )
+    )
+    # Any further Minotaurs (a standard game has one, hashed above)
+    for other in game.minotaurs[1:]:
+        h.update(struct.pack("<2d2i?", other.x, other.y, *other.dir, other.alive))
+    tributes = game.tributes
+    for array in (tributes.x, tributes.y, tributes.tx, tributes.ty, tributes.dir):
+        h.update(array.tobytes())
+    h.update(repr(sorted(game.pellets.tiles())).encode())
+    return h.hexdigest()
+
+
+def load_source(source):
+    # (Level, tribute start tiles) for a level source
+    kind, _, rest = source.partition(" ")
+    if kind == BUILTIN:
+        return LEVEL, HUMAN_START_TILES
+    if kind == "file":
+        level = load_level(rest)
+        return level, level.human_start_tiles
+    if kind == "maze":
+        size, seed = rest.split()
+        width, height = (int(v) for v in size.lower().split("x"))
+        maze = generate(width, height, seed=int(seed))
+        return compile_level(maze.layout), maze.human_start_tiles
+    raise ValueError(f"unknown level source {source!r}")
+
+
+def new_game(seed, level=BUILTIN, minotaurs=1, cooperative=False):
+    # The game a replay header describes (and the one main.py sets up)
+    level, human_start_tiles = load_source(level)
+    return Game(
+        human_start_tiles=human_start_tiles,
+        level=level,
+        seed=seed,
+        minotaur_tiles=(
+            minotaur_start_tiles(level, minotaurs) if minotaurs > 1 else None
+        ),
+        cooperative=cooperative,
+    )
+
+
+class Replay:
+    def __init__(
+        self,
+        seed,
+        inputs=None,
+        checkpoints=None,
+        end=None,
+        level=BUILTIN,
+        minotaurs=1,
+        cooperative=False,
+    ):
+        self.seed = seed
+        # Game setup, as new_game takes it
+        self.level = level
+        self.minotaurs = minotaurs
+        self.cooperative = cooperative
+        # [(tick, direction), ...] in tick order; direction applies from
+        # that tick on
+        self.inputs = inputs if inputs is not None else []
+        # [(tick, state hash), ...] taken after that tick
+        self.checkpoints = checkpoints if checkpoints is not None else []
+        # (last tick, state hash) once the recording is finished
+        self.end = end
+
+    def dumps(self):
+        lines = [FORMAT, f"seed {self.seed}"]
+        if self.level != BUILTIN:
+            lines.append(f"level {self.level}")
+        if self.minotaurs != 1:
+            lines.append(f"minotaurs {self.minotaurs}")
+        if self.cooperative:
+            lines.append("cooperative 1")
+        # Inputs and checkpoints interleaved in tick order (inputs first)
+        events = [(t, 0, f"{t} {DIRECTION_CODES[d]}") for t, d in self.inputs]
+        events += [(t, 1, f"# {t} {digest}") for t, digest in self.checkpoints]
+        lines.extend(text for _, _, text in sorted(events))
+        if self.end is not None:
+            lines.append(f"end {self.end[0]} {self.end[1]}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def loads(cls, text):
+        lines = text.splitlines()
+        if not lines or lines[0] not in FORMATS:
+            raise ValueError(f"not a replay (expected {FORMAT!r} header)")
+        replay = cls(int(lines[1].split()[1]))
+        for line in lines[2:]:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "level":
+                # The rest of the line, so file paths can hold spaces
+                replay.level = line.split(None, 1)[1]
+            elif parts[0] == "minotaurs":
+                replay.minotaurs = int(parts[1])
+            elif parts[0] == "cooperative":
+                replay.cooperative = parts[1] == "1"
+            elif parts[0] == "#":
+                replay.checkpoints.append((int(parts[1]), parts[2]))
+            elif parts[0] == "end":
+                replay.end = (int(parts[1]), parts[2])
+            else:
+                replay.inputs.append((int(parts[0]), CODE_DIRECTIONS[parts[1]]))
+        return replay
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.loads(f.read())
+
+
+class Recorder:
+    # Steps a game and records its inputs and checkpoints as it goes. Use
+    # recorder.step(next_dir) in place of game.step(next_dir). A game that
+    # wasn't set up with the defaults needs its setup (as new_game takes
+    # it) passed in too, or playback rebuilds the wrong one.
+    def __init__(
+        self,
+        game,
+        checkpoint_every=CHECKPOINT_EVERY,
+        level=BUILTIN,
+        minotaurs=1,
+        cooperative=False,
+    ):
+        self.game = game
+        self.checkpoint_every = checkpoint_every
+        self.replay = Replay(
+            game.seed, level=level, minotaurs=minotaurs, cooperative=cooperative
+        )
+        self.last_dir = None
+
+    def step(self, next_dir=None):
+        game = self.game
+        if game.over:
+            return []
+        # None keeps the buffered direction, so only changes are logged
+        if next_dir is not None and next_dir != self.last_dir:
+            self.replay.inputs.append((game.ticks + 1, next_dir))
+            self.last_dir = next_dir
+        events = game.step(next_dir)
+        if game.ticks % self.checkpoint_every == 0:
+            self.replay.checkpoints.append((game.ticks, state_hash(game)))
+        return events
+
+    def finish(self):
+        self.replay.end = (self.game.ticks, state_hash(self.game))
+        return self.replay
+
+
+def play(replay, verify=True, game_factory=None):
+    # Re-simulate a replay headlessly and return the final game. With
+    # verify, every checkpoint hash is compared as it is reached. The game
+    # is set up from the replay's header unless game_factory(seed=...) is
+    # given.
+    if game_factory is None:
+        game = new_game(
+            replay.seed, replay.level, replay.minotaurs, replay.cooperative
+        )
+    else:
+        game = game_factory(seed=replay.seed)
+    inputs = dict(replay.inputs)
+    checkpoints = dict(replay.checkpoints)
+    if replay.end is not None:
+        last_tick = replay.end[0]
+    else:
+        last_tick = max([*inputs, *checkpoints], default=0)
+
+    # Ticks with an input or a checkpoint are stepped; the stretches in
+    # between are plain movement that Game.skip_idle can cover at once
+    stops = sorted({*inputs, *checkpoints, last_tick})
+    next_stop = 0
+    while game.ticks < last_tick and not game.over:
+        game.step(inputs.get(game.ticks + 1))
+        expected = checkpoints.get(game.ticks)
+        if verify and expected is not None:
+            actual = state_hash(game)
+            if actual != expected:
+                raise ReplayMismatch(game.ticks, expected, actual)
+        while next_stop < len(stops) - 1 and stops[next_stop] <= game.ticks:
+            next_stop += 1
+        game.skip_idle(stops[next_stop] - 1 - game.ticks)
+
+    if verify and replay.end is not None:
+        actual = state_hash(game)
+        if game.ticks != replay.end[0] or actual != replay.end[1]:
+            raise ReplayMismatch(game.ticks, replay.end[1], actual)
+    return game
+
+
+def main():
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        try:
+            game = play(replay)
+        except ReplayMismatch as e:
+            print(f"{path}: FAILED, {e}")
+            sys.exit(1)
+        outcome = "won" if game.won else "dead" if game.dead else "unfinished"
+        print(f"{path}: ok, {game.ticks} ticks, {outcome}, score {game.score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,890 @@
+import heapq
+import random
+
+from level import (
+    DIRECTION_BITS,
+    GATE,
+    MASK_DIRECTIONS,
+    MINOTAUR_SPAWN,
+    PELLET,
+    PLAYER_SPAWN,
+    WALL,
+    compile_level,
+)
+from clusters import ClusterPlanner, cluster_map
+from pathfinding import (
+    HuntPlanner,
+    bfs_within,
+    flee_index,
+    path_table,
+    walk_graph,
+)
+from profiler import NULL_PROFILER
+from spatial import PelletGrid
+from tributes import TributeSwarm
+
+# Pure game logic for Minotaur's Labyrinth.
+#
+# Nothing in here touches pygame: no display, no mixer, no asset loading.
+# main.py is a thin renderer on top of Game, and headless tools (batch
+# runs, benchmarks, replays) can import this module on their own.
+
+# Game constants
+TILE_SIZE = 24
+
+# Game.step advances one tick; every speed below is in pixels per tick
+TICK_RATE = 60
+MAP_LAYOUT = [
+    "############################",
+    "#............##............#",
+    "#.####.#####.##.#####.####.#",
+    "#o####.#####.##.#####.####o#",
+    "#.####.#####.##.#####.####.#",
+    "#..........................#",
+    "#.####.##.########.##.####.#",
+    "#.####.##.########.##.####.#",
+    "#......##....##....##......#",
+    "######.#####.##.#####.######",
+    "     #.#####.##.#####.#     ",
+    "     #.##..........##.#     ",
+    "     #.##.###--###.##.#     ",
+    "######.##.#      #.##.######",
+    "G P   .   #   M  #   .     G",
+    "######.##.#      #.##.######",
+    "     #.##.########.##.#     ",
+    "     #.##..........##.#     ",
+    "     #.##.########.##.#     ",
+    "######.##.########.##.######",
+    "#............##............#",
+    "#.####.#####.##.#####.####.#",
+    "#.####.#####.##.#####.####.#",
+    "#o..##................##..o#",
+    "###.##.##.########.##.##.###",
+    "###.##.##.########.##.##.###",
+    "#......##....##....##......#",
+    "#.##########.##.##########.#",
+    "#.##########.##.##########.#",
+    "#..........................#",
+    "############################",
+]
+
+ROWS = len(MAP_LAYOUT)
+COLS = len(MAP_LAYOUT[0])
+
+# MAP_LAYOUT compiled to flag / neighbour-mask grids (see level.py)
+LEVEL = compile_level(MAP_LAYOUT)
+
+# Sprite sizes (also used for collision boxes)
+PLAYER_SIZE = TILE_SIZE * 2        # Theseus (player) bigger than one tile
+HUMAN_SIZE = TILE_SIZE * 2         # tributes same size as player
+MINOTAUR_SIZE = TILE_SIZE * 3      # Minotaur is a big boy
+
+# Pellets are boxes this size in the middle of their tile
+PELLET_SIZE = TILE_SIZE * 3 // 8
+
+# Largest level (in cells) a Minotaur looks paths up in an all-pairs
+# PathTable and hunts and flees on whole-level fields; bigger ones use a
+# ClusterMap for all of that
+PATH_TABLE_CELLS = 64 * 64
+
+# Nine additional human tributes wandering the labyrinth
+HUMAN_START_TILES = [
+    (1, 1),
+    (26, 1),
+    (1, 20),
+    (26, 20),
+    (1, 23),
+    (26, 23),
+    (13, 5),
+    (14, 5),
+    (13, 26),
+]
+
+# Directions are plain (dx, dy) int tuples
+STOP = (0, 0)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+UP = (0, -1)
+DOWN = (0, 1)
+
+
+def ticks_to_center(direction, speed):
+    # Ticks from a tile center to the next one: a whole tile at speed
+    # (speeds divide TILE_SIZE), or the very next tick when standing still
+    if direction == STOP:
+        return 1
+    return round(TILE_SIZE / speed)
+
+
+# Things that happened during a tick; the front end maps them to sounds
+EVENT_PELLET_EATEN = "pellet_eaten"
+EVENT_MINOTAUR_FLEE = "minotaur_flee"
+EVENT_MINOTAUR_SLAIN = "minotaur_slain"
+EVENT_PLAYER_KILLED = "player_killed"
+EVENT_HUMANS_EATEN = "humans_eaten"
+EVENT_ESCAPED = "escaped"
+
+
+class Box:
+    # Minimal stand-in for pygame.Rect: same center rounding and the same
+    # strict-overlap rule as Rect.colliderect, without importing pygame.
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    @property
+    def center(self):
+        return (self.centerx, self.centery)
+
+    @center.setter
+    def center(self, pos):
+        self.x = pos[0] - self.width // 2
+        self.y = pos[1] - self.height // 2
+
+    def colliderect(self, other):
+        return (
+            self.x < other.x + other.width
+            and other.x < self.x + self.width
+            and self.y < other.y + other.height
+            and other.y < self.y + self.height
+        )
+
+
+class Player:
+    def __init__(self, tile_x, tile_y, level=LEVEL):
+        self.level = level
+
+        # Tile coordinates (force ints)
+        self.tx = int(tile_x)
+        self.ty = int(tile_y)
+
+        # Pixel position (center of tile)
+        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
+        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
+
+        # Current direction and buffered next direction
+        self.dir = STOP
+        self.next_dir = STOP
+
+        # Speed should divide TILE_SIZE nicely (24 % 4 == 0)
+        self.speed = 4
+
+        # Box used for pellet collision
+        self.rect = Box(0, 0, TILE_SIZE, TILE_SIZE)
+        self.rect.center = (self.x, self.y)
+
+        # Whether gates are open for movement
+        self.gates_open = False
+
+    def at_tile_center(self):
+        return (
+            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
+            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
+        )
+
+    def can_move(self, direction):
+        moves = self.level.moves(self.tx, self.ty, self.gates_open)
+        return bool(moves & DIRECTION_BITS[direction])
+
+    def turn(self):
+        # At tile center = allowed to turn/change direction. Returns the
+        # ticks until the next tile center.
+        # Sync tile coords from pixel coords (cast to int)
+        self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
+        self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
+
+        # Try buffered turn first
+        if self.can_move(self.next_dir):
+            self.dir = self.next_dir
+
+        # If current direction blocked, stop
+        if not self.can_move(self.dir):
+            self.dir = STOP
+        return ticks_to_center(self.dir, self.speed)
+
+    def move(self, ticks=1):
+        # Move along current direction
+        self.x += self.dir[0] * self.speed * ticks
+        self.y += self.dir[1] * self.speed * ticks
+
+        # Update rect position
+        self.rect.center = (int(self.x), int(self.y))
+
+    def update(self):
+        if self.at_tile_center():
+            self.turn()
+        self.move()
+
+    def save(self):
+        return (self.x, self.y, self.tx, self.ty, self.dir, self.next_dir)
+
+    def restore(self, saved):
+        self.x, self.y, self.tx, self.ty, self.dir, self.next_dir = saved
+        self.rect.center = (int(self.x), int(self.y))
+
+
+class Human:
+    # One tribute on its own. Game moves all of its tributes at once with a
+    # TributeSwarm, which follows the same rules.
+    def __init__(self, tile_x, tile_y, level=LEVEL, rng=random):
+        self.level = level
+        # Source of random turns: the random module or a random.Random
+        self.rng = rng
+
+        # Tile coordinates
+        self.tx = int(tile_x)
+        self.ty = int(tile_y)
+
+        # Pixel position (center of tile)
+        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
+        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
+
+        # Current movement direction
+        self.dir = STOP
+        # Slower than player
+        self.speed = 1.5
+
+        # Box used for collisions with Minotaur
+        self.rect = Box(0, 0, TILE_SIZE, TILE_SIZE)
+        self.rect.center = (self.x, self.y)
+
+        # Assign a random color (not yellow or red) – color unused now but kept
+        self.color = self.random_color(rng)
+
+        # Gates open flag for movement
+        self.gates_open = False
+
+    @staticmethod
+    def random_color(rng=random):
+        # Player yellow and minotaur red are reserved
+        forbidden = {(255, 255, 0), (200, 40, 40)}
+        while True:
+            r = rng.randint(50, 255)
+            g = rng.randint(50, 255)
+            b = rng.randint(50, 255)
+            if (r, g, b) not in forbidden:
+                return (r, g, b)
+
+    def at_tile_center(self):
+        return (
+            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
+            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
+        )
+
+    def can_move(self, direction):
+        moves = self.level.moves(self.tx, self.ty, self.gates_open)
+        return bool(moves & DIRECTION_BITS[direction])
+
+    def turn(self):
+        # Choose a direction (only at tile centers). Returns the ticks until
+        # the next tile center.
+        # Sync tile coords
+        self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
+        self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
+
+        # Candidate directions (right, left, down, up order)
+        moves = self.level.moves(self.tx, self.ty, self.gates_open)
+        possible = MASK_DIRECTIONS[moves]
+
+        if possible:
+            # Avoid immediately reversing direction if there is another option
+            if self.dir != STOP:
+                opposite = (-self.dir[0], -self.dir[1])
+                non_reverse = MASK_DIRECTIONS[moves & ~DIRECTION_BITS[opposite]]
+                if non_reverse:
+                    possible = non_reverse
+            self.dir = self.rng.choice(possible)
+        else:
+            self.dir = STOP
+        return ticks_to_center(self.dir, self.speed)
+
+    def move(self, ticks=1):
+        # Move in current direction
+        self.x += self.dir[0] * self.speed * ticks
+        self.y += self.dir[1] * self.speed * ticks
+        self.rect.center = (int(self.x), int(self.y))
+
+    def update(self):
+        if self.at_tile_center():
+            self.turn()
+        self.move()
+
+
+class Minotaur:
+    def __init__(self, tile_x, tile_y, level=LEVEL):
+        self.level = level
+
+        self.tx = int(tile_x)
+        self.ty = int(tile_y)
+
+        self.x = self.tx * TILE_SIZE + TILE_SIZE // 2
+        self.y = self.ty * TILE_SIZE + TILE_SIZE // 2
+
+        self.dir = STOP
+        self.speed = 3  # base movement speed
+
+        # Current visual state: "normal", "scared", or "dead"
+        self.state = "normal"
+        self.alive = True
+
+        # Use a bigger box matching the sprite size, centered on the same x/y
+        self.rect = Box(0, 0, MINOTAUR_SIZE, MINOTAUR_SIZE)
+        self.rect.center = (self.x, self.y)
+
+        # Flee mode (after pellets cleared)
+        self.flee = False
+
+        # Gates open flag for movement
+        self.gates_open = False
+
+        # Shared HuntPlanner, set by Game, which keeps its targets current.
+        # Without one (a Minotaur on its own), every decision is a lookup.
+        self.planner = None
+
+    def at_tile_center(self):
+        return (
+            (self.x - TILE_SIZE // 2) % TILE_SIZE == 0
+            and (self.y - TILE_SIZE // 2) % TILE_SIZE == 0
+        )
+
+    def can_move_to(self, nx, ny):
+        return self.level.walkable(nx, ny, self.gates_open)
+
+    def next_step(self, start, goals):
+        # Table lookup instead of a fresh BFS (see pathfinding.PathTable). A
+        # level too big for a table is searched cluster by cluster instead
+        # (see clusters.py).
+        level = self.level
+        if level.width * level.height > PATH_TABLE_CELLS:
+            return cluster_map(level, self.gates_open).next_step(start, goals)
+        return path_table(level, self.gates_open).next_step(start, goals)
+
+    def flee_step(self, start, player_tile):
+        # Run away: head for the reachable tile farthest (by walking
+        # distance) from the player, looked up per player tile. On a level
+        # too big for that, run for the landmark farthest from the player
+        # instead (see ClusterMap.flee_step).
+        level = self.level
+        if level.width * level.height > PATH_TABLE_CELLS:
+            return cluster_map(level, self.gates_open).flee_step(start, player_tile)
+        return flee_index(level, self.gates_open).next_step(start, player_tile)
+
+    def turn(self, player, human_tiles):
+        # Choose a new direction (only at tile centers). Returns the ticks
+        # until the next tile center.
+        # sync tile coords
+        self.tx = int((self.x - TILE_SIZE // 2) // TILE_SIZE)
+        self.ty = int((self.y - TILE_SIZE // 2) // TILE_SIZE)
+
+        start = (self.tx, self.ty)
+
+        # Pick a direction: flee, or hunt the nearest target
+        if self.flee:
+            self.dir = self.flee_step(start, (player.tx, player.ty))
+        elif self.planner is not None:
+            # Hunt for the pack: Game already gave the planner this
+            # tick's targets
+            self.dir = self.planner.next_step(self, start)
+        else:
+            # Hunt nearest of player or humans
+            goals = {(player.tx, player.ty)}
+            goals.update(human_tiles)
+            self.dir = self.next_step(start, goals)
+        return ticks_to_center(self.dir, self.speed)
+
+    def move(self, ticks=1):
+        # move along chosen direction
+        self.x += self.dir[0] * self.speed * ticks
+        self.y += self.dir[1] * self.speed * ticks
+
+        self.rect.center = (int(self.x), int(self.y))
+
+    def update(self, player, human_tiles):
+        if self.at_tile_center():
+            self.turn(player, human_tiles)
+        self.move()
+
+    def save(self):
+        return (
+            self.x,
+            self.y,
+            self.tx,
+            self.ty,
+            self.dir,
+            self.state,
+            self.alive,
+            self.flee,
+        )
+
+    def restore(self, saved):
+        (
+            self.x,
+            self.y,
+            self.tx,
+            self.ty,
+            self.dir,
+            self.state,
+            self.alive,
+            self.flee,
+        ) = saved
+        self.rect.center = (int(self.x), int(self.y))
+
+
+def build_level(level=LEVEL):
+    # Every wall, pellet and gate as a box. Game itself works off the level
+    # grid and never builds these lists; this is for tools that want them.
+    walls = []
+    pellets = []
+    gates = []
+    player_start = (0, 0)  # tile coords
+    minotaur_start = (0, 0)
+
+    # pellet is a box in the middle of the tile
+    pellet_size = PELLET_SIZE
+    offset = (TILE_SIZE - pellet_size) // 2
+
+    width = level.width
+    for i, flags in enumerate(level.cells):
+        if not flags:
+            continue
+        col_idx, row_idx = i % width, i // width
+        x = col_idx * TILE_SIZE
+        y = row_idx * TILE_SIZE
+
+        if flags & WALL:
+            walls.append(Box(x, y, TILE_SIZE, TILE_SIZE))
+        elif flags & PELLET:
+            pellets.append(Box(x + offset, y + offset, pellet_size, pellet_size))
+        elif flags & GATE:
+            gates.append(Box(x, y, TILE_SIZE, TILE_SIZE))
+        elif flags & PLAYER_SPAWN:
+            # store tile coordinates, not pixels
+            player_start = (col_idx, row_idx)
+        elif flags & MINOTAUR_SPAWN:
+            minotaur_start = (col_idx, row_idx)
+
+    return walls, pellets, gates, player_start, minotaur_start
+
+
+def swept_box(entity, ticks):
+    # Box covering entity's rect on each of its next ticks moves, which all
+    # go the same way
+    dx, dy = entity.dir
+    step = entity.speed
+    x0, x1 = sorted((int(entity.x + dx * step), int(entity.x + dx * step * ticks)))
+    y0, y1 = sorted((int(entity.y + dy * step), int(entity.y + dy * step * ticks)))
+    rect = entity.rect
+    return Box(
+        x0 - rect.width // 2,
+        y0 - rect.height // 2,
+        x1 - x0 + rect.width,
+        y1 - y0 + rect.height,
+    )
+
+
+def tile_box(tx, ty):
+    return Box(tx * TILE_SIZE, ty * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+
+def spawn_tile(level, flag):
+    # Tile of a spawn marker (the last one if there are several, (0, 0) if
+    # there is none, as build_level does)
+    tiles = level.find(flag)
+    return tiles[-1] if tiles else (0, 0)
+
+
+def hunt_planner(level, gates_open, cooperative):
+    # One flow field over the whole level where that is cheap to keep up,
+    # searches out from each Minotaur on levels too big for it
+    if level.width * level.height > PATH_TABLE_CELLS:
+        return ClusterPlanner(cluster_map(level, gates_open), cooperative)
+    return HuntPlanner(walk_graph(level, gates_open), cooperative)
+
+
+def minotaur_start_tiles(level, count):
+    # count distinct tiles for a pack of Minotaurs: the level's spawn and
+    # the walkable tiles nearest to it. The search widens until it holds
+    # count tiles (or stops growing), so it only looks around the spawn
+    graph = walk_graph(level, False)
+    spawn = graph.node(spawn_tile(level, MINOTAUR_SPAWN))
+    radius = count
+    found = bfs_within(graph, [spawn], radius)
+    while len(found) < count:
+        radius *= 2
+        wider = bfs_within(graph, [spawn], radius)
+        if len(wider) == len(found):
+            break
+        found = wider
+    nearest = sorted((d, n) for n, d in found.items())
+    return [graph.tile(n) for _, n in nearest[:count]]
+
+
+class GameState:
+    # A moment of a Game, from Game.save, for Game.restore to go back to.
+    # Entities are packed into tuples and the tributes' arrays and the
+    # pellet bitset are shared with the game until it changes them (see
+    # TributeSwarm and PelletGrid), so saving costs microseconds on any
+    # level. A state can be restored any number of times.
+    __slots__ = (
+        "seed",
+        "ticks",
+        "score",
+        "dead",
+        "won",
+        "minotaur_flee",
+        "minotaur_flee_announced",
+        "gates_open",
+        "player_turn",
+        "turns",
+        "player",
+        "minotaurs",
+        "tributes",
+        "pellets",
+        "claims",
+    )
+
+
+class Game:
+    # One run of the game rules, stepped one tick at a time.
+    #
+    # There can be any number of Minotaurs (minotaur_tiles, default one on
+    # the level's M). They all flee once the pellets are gone, and the gates
+    # open when the last one is slain. cooperative makes them split up the
+    # targets instead of all chasing the nearest (see HuntPlanner and
+    # ClusterPlanner).
+    def __init__(
+        self,
+        human_start_tiles=HUMAN_START_TILES,
+        level=LEVEL,
+        seed=None,
+        minotaur_tiles=None,
+        cooperative=False,
+    ):
+        self.level = level
+
+        # Every random choice in a run derives from this seed, so the seed
+        # plus the player's inputs reproduce the whole game (see replay.py)
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+
+        # Spawns and gates come from the level grid; nothing is built per
+        # wall or pellet, so huge (file-backed) levels stay on disk
+        self.gates = [tile_box(x, y) for x, y in level.find(GATE)]
+        self.player = Player(*spawn_tile(level, PLAYER_SPAWN), level=level)
+        if minotaur_tiles is None:
+            minotaur_tiles = [spawn_tile(level, MINOTAUR_SPAWN)]
+        self.minotaurs = [Minotaur(*tile, level=level) for tile in minotaur_tiles]
+        # All tributes, moved together in one batch per tick
+        self.tributes = TributeSwarm(level, human_start_tiles, TILE_SIZE, seed=seed)
+
+        # Pellets by tile, so pellet checks only look at the few tiles under
+        # the player
+        self.pellets = PelletGrid(level, TILE_SIZE, PELLET_SIZE, Box)
+
+        self.score = 0
+        self.dead = False
+        self.won = False
+        self.ticks = 0
+
+        self.minotaur_flee = False
+        self.gates_open = False
+        self.minotaur_flee_announced = False
+
+        # Phase timing for Game.step; disabled unless the front end attaches
+        # its own
+        self.profiler = NULL_PROFILER
+
+        # One hunt planner for every Minotaur, kept across ticks
+        self.planner = hunt_planner(level, False, cooperative)
+
+        # Entities only decide at tile centers, so rather than every entity
+        # checking its position every tick, Game keeps the tick each one
+        # next reaches a center: the player's, and a heap of (tick, index)
+        # for the Minotaurs. Tributes keep their own (see TributeSwarm).
+        # Everyone starts on a center, so everyone turns on the first tick.
+        self.player_turn = 1
+        self.turns = [(1, i) for i in range(len(self.minotaurs))]
+
+    @property
+    def walls(self):
+        # Wall boxes, made on demand
+        return [tile_box(x, y) for x, y in self.level.find(WALL)]
+
+    @property
+    def minotaur(self):
+        # The first Minotaur (the only one in a standard game)
+        return self.minotaurs[0]
+
+    @minotaur.setter
+    def minotaur(self, minotaur):
+        self.minotaurs[0] = minotaur
+
+    @property
+    def minotaur_alive(self):
+        return any(m.alive for m in self.minotaurs)
+
+    @property
+    def over(self):
+        return self.dead or self.won
+
+    @property
+    def humans(self):
+        # Snapshot of the remaining tributes (x, y, tx, ty, dir)
+        return self.tributes.snapshot()
+
+    @property
+    def survivors_count(self):
+        # Remaining humans + Theseus if he is still alive
+        return len(self.tributes) + (0 if self.dead else 1)
+
+    def sync_gates(self):
+        # Keep everyone informed about gate status
+        self.player.gates_open = self.gates_open
+        if self.planner.gates_open != self.gates_open:
+            self.planner = hunt_planner(
+                self.level, self.gates_open, self.planner.cooperate
+            )
+        for minotaur in self.minotaurs:
+            minotaur.gates_open = self.gates_open
+            minotaur.planner = self.planner
+
+    def save(self):
+        # The game as it is now, for restore(): a lookahead search saves
+        # once and restores before every rollout
+        state = GameState()
+        state.seed = self.seed
+        state.ticks = self.ticks
+        state.score = self.score
+        state.dead = self.dead
+        state.won = self.won
+        state.minotaur_flee = self.minotaur_flee
+        state.minotaur_flee_announced = self.minotaur_flee_announced
+        state.gates_open = self.gates_open
+        state.player_turn = self.player_turn
+        state.turns = tuple(self.turns)
+        state.player = self.player.save()
+        state.minotaurs = tuple(m.save() for m in self.minotaurs)
+        state.tributes = self.tributes.save()
+        state.pellets = self.pellets.save()
+        # Cooperative claims by Minotaur index (the planner's distance field
+        # only depends on the targets, which are set again every tick)
+        claims = self.planner.claims
+        if claims:
+            slot = {minotaur: i for i, minotaur in enumerate(self.minotaurs)}
+            state.claims = tuple((slot[m], tile) for m, tile in claims.items())
+        else:
+            state.claims = ()
+        return state
+
+    def restore(self, state):
+        # Put the game back to a saved state (of this game, or of another
+        # with the same level and Minotaur count). The game then plays on
+        # exactly as it did from there.
+        self.seed = state.seed
+        self.ticks = state.ticks
+        self.score = state.score
+        self.dead = state.dead
+        self.won = state.won
+        self.minotaur_flee = state.minotaur_flee
+        self.minotaur_flee_announced = state.minotaur_flee_announced
+        self.gates_open = state.gates_open
+        self.player_turn = state.player_turn
+        self.turns = list(state.turns)
+        self.player.restore(state.player)
+        for minotaur, saved in zip(self.minotaurs, state.minotaurs):
+            minotaur.restore(saved)
+        self.tributes.restore(state.tributes)
+        self.pellets.restore(state.pellets)
+        self.sync_gates()
+        self.planner.claims = {self.minotaurs[i]: tile for i, tile in state.claims}
+
+    def reseed(self, seed=None):
+        # Give the rest of the game a new seed, as if it had been started
+        # with it (restore a start state, then reseed, for a fresh game)
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.tributes.reseed(seed)
+
+    def step(self, next_dir=None):
+        # Advance the game by one tick. next_dir, if given, is the player's
+        # buffered turn. Returns the list of events that happened.
+        events = []
+
+        self.sync_gates()
+        player = self.player
+
+        if self.over:
+            return events
+        self.ticks += 1
+
+        # Phases are timed when a profiler is attached (see profiler.py)
+        phase = self.profiler.phase
+
+        with phase("update"):
+            if next_dir is not None:
+                player.next_dir = next_dir
+            if self.player_turn == self.ticks:
+                self.player_turn += player.turn()
+            player.move()
+            self.tributes.step(self.gates_open)
+
+        if self.minotaur_alive:
+            with phase("minotaur"):
+                # Minotaurs at a tile center this tick (slain ones drop out)
+                turns = self.turns
+                due = set()
+                while turns and turns[0][0] == self.ticks:
+                    due.add(heapq.heappop(turns)[1])
+                human_tiles = ()
+                deciding = [i for i in due if self.minotaurs[i].alive]
+                if not self.minotaur_flee and deciding:
+                    # One target update per tick, shared by every Minotaur
+                    # that decides now
+                    human_tiles = self.tributes.tiles()
+                    self.planner.set_targets([(player.tx, player.ty)] + human_tiles)
+                for i, minotaur in enumerate(self.minotaurs):
+                    if not minotaur.alive:
+                        continue
+                    minotaur.flee = self.minotaur_flee
+                    # Update visual state based on flee mode
+                    minotaur.state = "scared" if self.minotaur_flee else "normal"
+                    if i in due:
+                        wait = minotaur.turn(player, human_tiles)
+                        heapq.heappush(turns, (self.ticks + wait, i))
+                    minotaur.move()
+
+        with phase("collision"):
+            self.resolve_collisions(events)
+        return events
+
+    def skip_idle(self, limit):
+        # Advance up to limit ticks at once, as long as they are ticks on
+        # which nobody reaches a tile center and nothing can collide:
+        # everyone keeps walking straight and only pellets under the player
+        # get eaten. Stops short of the next tick where anything else can
+        # happen, for step() to play out. The outcome is the same as calling
+        # step() with no input that many times, which is all a player that
+        # only turns at tile centers sends in between (see policies.py).
+        # Returns the events, like step.
+        events = []
+        if self.over:
+            return events
+        hunters = [m for m in self.minotaurs if m.alive]
+        player = self.player
+        ticks = min(limit, self.tributes.idle_ticks())
+        # A player standing still turns every tick, but with no new input
+        # and the gates as they are it stays put
+        if player.dir != STOP:
+            ticks = min(ticks, self.player_turn - self.ticks - 1)
+        if hunters:
+            ticks = min(ticks, self.turns[0][0] - self.ticks - 1)
+        if ticks <= 0:
+            return events
+
+        # Collisions are ruled out with the boxes the rects sweep over the
+        # window; when something could meet, try a shorter one
+        while ticks > 0 and not self.quiet(ticks, hunters):
+            ticks //= 2
+        if ticks <= 0:
+            return events
+
+        for _ in self.pellets.eat_overlapping(swept_box(player, ticks)):
+            self.score += 10
+            events.append(EVENT_PELLET_EATEN)
+        player.move(ticks)
+        if player.dir == STOP:
+            self.player_turn = self.ticks + ticks + 1
+        self.tributes.advance(ticks)
+        for minotaur in hunters:
+            minotaur.flee = self.minotaur_flee
+            minotaur.state = "scared" if self.minotaur_flee else "normal"
+            minotaur.move(ticks)
+        self.ticks += ticks
+        return events
+
+    def quiet(self, ticks, hunters):
+        # Whether the next ticks moves can pass without a collision that
+        # matters: Minotaur and player or tribute, player and open gate, or
+        # the player eating the last pellet
+        player_box = swept_box(self.player, ticks)
+        if self.gates_open and any(player_box.colliderect(g) for g in self.gates):
+            return False
+        if self.minotaur_alive and not self.minotaur_flee:
+            pellets = self.pellets.overlapping(player_box)
+            if pellets and len(pellets) == len(self.pellets):
+                return False
+        for minotaur in hunters:
+            box = swept_box(minotaur, ticks)
+            if box.colliderect(player_box):
+                return False
+            if not self.minotaur_flee and self.tributes.sweeps_into(box, ticks):
+                return False
+        return True
+
+    def resolve_collisions(self, events):
+        player = self.player
+
+        # Eat pellets
+        for _ in self.pellets.eat_overlapping(player.rect):
+            self.score += 10
+            events.append(EVENT_PELLET_EATEN)
+
+        # Once all pellets are gone, minotaur starts fleeing
+        if not self.pellets and self.minotaur_alive and not self.minotaur_flee:
+            self.minotaur_flee = True
+            if not self.minotaur_flee_announced:
+                events.append(EVENT_MINOTAUR_FLEE)
+            self.minotaur_flee_announced = True
+
+        # Check player / minotaur interaction
+        for minotaur in self.minotaurs:
+            if not minotaur.alive or not player.rect.colliderect(minotaur.rect):
+                continue
+            if self.minotaur_flee:
+                # Player kills the minotaur; the last one opens the gates
+                minotaur.alive = False
+                minotaur.state = "dead"
+                self.planner.release(minotaur)
+                self.gates_open = not self.minotaur_alive
+                events.append(EVENT_MINOTAUR_SLAIN)
+            else:
+                # Normal phase: minotaur kills you
+                self.dead = True
+                events.append(EVENT_PLAYER_KILLED)
+                break
+
+        # Minotaurs hunt humans only while alive and not fleeing (one event
+        # per tick however many of them feed)
+        if not self.minotaur_flee:
+            fed = False
+            for minotaur in self.minotaurs:
+                if not minotaur.alive:
+                    continue
+                victims = self.tributes.colliding(minotaur.rect)
+                if len(victims):
+                    self.tributes.remove(victims)
+                    fed = True
+            if fed:
+                events.append(EVENT_HUMANS_EATEN)
+
+        # Escape through an open gate = win
+        if self.gates_open:
+            for gate in self.gates:
+                if player.rect.colliderect(gate):
+                    self.won = True
+                    events.append(EVENT_ESCAPED)
+                    break
@@ -75,6 +75,8 @@ let minotaurScaredImg;
 let minotaurDeadImg;
 let gameoverImg;
 let victoryImg;
+let atlasImg;
+let atlasIndex;
 
 // Sounds
 let minotaurEatSound = null;
@@ -107,16 +109,10 @@ let fontSize = 20;
 
 // p5.js preload: load assets
 function preload() {
-  // Images
-  wallImg = loadImage("sprites/wall.png");
-  gateLockedImg = loadImage("sprites/gate_locked.png");
-  gateOpenImg = loadImage("sprites/gate_open.png");
-  floorImg = loadImage("sprites/floor.png");
-  theseusImg = loadImage("sprites/theseus.png");
-  tributeImg = loadImage("sprites/tribute.png");
-  minotaurNormalImg = loadImage("sprites/minotaur_normal.png");
-  minotaurScaredImg = loadImage("sprites/minotaur_scared.png");
-  minotaurDeadImg = loadImage("sprites/minotaur_dead.png");
+  // Images: in-game sprites come pre-scaled from one packed atlas
+  // (built by tools/build_atlas.py), cut out in setup()
+  atlasImg = loadImage("sprites/atlas.png");
+  atlasIndex = loadJSON("sprites/atlas.json");
   gameoverImg = loadImage("sprites/gameover.png");
   victoryImg = loadImage("sprites/victory.png");
 
@@ -171,16 +167,16 @@ function setup() {
   textSize(fontSize);
   rectMode(CORNER);
 
-  // Scale images appropriately
-  wallImg.resize(TILE_SIZE, TILE_SIZE);
-  gateLockedImg.resize(TILE_SIZE, TILE_SIZE);
-  gateOpenImg.resize(TILE_SIZE, TILE_SIZE);
-  floorImg.resize(TILE_SIZE, TILE_SIZE);
-  theseusImg.resize(PLAYER_SIZE, PLAYER_SIZE);
-  tributeImg.resize(HUMAN_SIZE, HUMAN_SIZE);
-  minotaurNormalImg.resize(MINOTAUR_SIZE, MINOTAUR_SIZE);
-  minotaurScaredImg.resize(MINOTAUR_SIZE, MINOTAUR_SIZE);
-  minotaurDeadImg.resize(MINOTAUR_SIZE, MINOTAUR_SIZE);
+  // Cut sprites out of the atlas (already at their drawn sizes)
+  wallImg = atlasSprite("sprites/wall.png");
+  gateLockedImg = atlasSprite("sprites/gate_locked.png");
+  gateOpenImg = atlasSprite("sprites/gate_open.png");
+  floorImg = atlasSprite("sprites/floor.png");
+  theseusImg = atlasSprite("sprites/theseus.png");
+  tributeImg = atlasSprite("sprites/tribute.png");
+  minotaurNormalImg = atlasSprite("sprites/minotaur_normal.png");
+  minotaurScaredImg = atlasSprite("sprites/minotaur_scared.png");
+  minotaurDeadImg = atlasSprite("sprites/minotaur_dead.png");
 
   // Scale gameover / victory to fit
   scaleToFit(gameoverImg, WIDTH, HEIGHT, (scaled) => (gameoverImg = scaled));
@@ -189,6 +185,17 @@ function setup() {
   startGame();
 }
 
+// Sub-image of the sprite atlas for one source sprite
+function atlasSprite(path) {
+  for (let entry of atlasIndex.sprites) {
+    if (entry.path === path) {
+      let [x, y, w, h] = entry.rect;
+      return atlasImg.get(x, y, w, h);
+    }
+  }
+  return null;
+}
+
 // Helper to scale images to fit within maxW x maxH
 function scaleToFit(img, maxW, maxH, applyFn) {
   if (!img) return;
@@ -0,0 +1,131 @@
+import numpy as np
+
+from level import PELLET
+
+# Tile-indexed pellet lookups for collision checks.
+#
+# Everything here works on Box/Rect-like objects (x, y, width, height and
+# colliderect) and pixel coordinates, so it doesn't depend on pygame or on
+# the rest of the simulation. Cost per query depends only on how much of the
+# grid the query rect covers, not on how many pellets exist.
+
+
+def tile_range(lo, hi, tile_size):
+    # Tiles touched by the half-open pixel span [lo, hi)
+    return range(lo // tile_size, (hi - 1) // tile_size + 1)
+
+
+class PelletGrid:
+    # Pellets on the tiles of a level that have the PELLET flag, at most one
+    # per tile. Nothing is stored per pellet: a tile holds one until it is
+    # eaten, which sets its bit in a bitset over the cells, and its box is
+    # made when asked for. Iterates in row-major order, and keeps a log of
+    # eaten pellets so renderers can catch up without diffing.
+    #
+    # save() hands out the bitset and log as they are and restore() puts
+    # them back. Both are shared, not copied: the grid copies them the next
+    # time it eats a pellet, so saved states never change under it.
+    def __init__(self, level, tile_size, pellet_size, box):
+        self.level = level
+        self.tile_size = tile_size
+        self.pellet_size = pellet_size
+        # Pellets sit in the middle of their tile
+        self.offset = (tile_size - pellet_size) // 2
+        # box(x, y, width, height) -> Box/Rect-like object
+        self.box = box
+        # Cells that start with a pellet, row-major
+        self.cells = level.flagged(PELLET)
+        self.total = len(self.cells)
+        # Bit y * width + x is set once the pellet on (x, y) is eaten
+        self.eaten_bits = bytearray((level.width * level.height + 7) // 8)
+        self.eaten_count = 0
+        # Every pellet eaten so far, oldest first
+        self.eaten = []
+        # Whether eaten_bits and eaten belong to a saved state too
+        self.shared = False
+
+    def __len__(self):
+        return self.total - self.eaten_count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return (self.pellet_box(tile) for tile in self.tiles())
+
+    def __contains__(self, tile):
+        x, y = tile
+        level = self.level
+        return (
+            0 <= x < level.width
+            and 0 <= y < level.height
+            and bool(level.flags(x, y) & PELLET)
+            and not self.is_eaten(y * level.width + x)
+        )
+
+    def is_eaten(self, cell):
+        return bool(self.eaten_bits[cell >> 3] & (1 << (cell & 7)))
+
+    def pellet_box(self, tile):
+        size = self.tile_size
+        return self.box(
+            tile[0] * size + self.offset,
+            tile[1] * size + self.offset,
+            self.pellet_size,
+            self.pellet_size,
+        )
+
+    def get(self, tile):
+        # The pellet on tile, or None
+        return self.pellet_box(tile) if tile in self else None
+
+    def tiles(self):
+        # Tiles that still hold a pellet, row-major
+        cells = self.cells
+        if self.eaten_count:
+            bits = np.frombuffer(self.eaten_bits, dtype=np.uint8)
+            eaten = np.unpackbits(bits, bitorder="little")
+            cells = cells[eaten[cells] == 0]
+        ys, xs = np.divmod(cells, self.level.width)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def overlapping(self, rect):
+        # (tile, pellet) for the pellets rect overlaps; only the tiles under
+        # rect can hold one
+        size = self.tile_size
+        hits = []
+        for ty in tile_range(rect.y, rect.y + rect.height, size):
+            for tx in tile_range(rect.x, rect.x + rect.width, size):
+                pellet = self.get((tx, ty))
+                if pellet is not None and rect.colliderect(pellet):
+                    hits.append(((tx, ty), pellet))
+        return hits
+
+    def eat_overlapping(self, rect):
+        # Remove and return the pellets rect overlaps
+        hits = self.overlapping(rect)
+        if not hits:
+            return []
+        if self.shared:
+            self.eaten_bits = bytearray(self.eaten_bits)
+            self.eaten = list(self.eaten)
+            self.shared = False
+        bits = self.eaten_bits
+        width = self.level.width
+        eaten = []
+        for (x, y), pellet in hits:
+            cell = y * width + x
+            bits[cell >> 3] |= 1 << (cell & 7)
+            eaten.append(pellet)
+        self.eaten_count += len(eaten)
+        self.eaten.extend(eaten)
+        return eaten
+
+    def save(self):
+        # What has been eaten so far, for restore()
+        self.shared = True
+        return (self.eaten_bits, self.eaten_count, self.eaten)
+
+    def restore(self, saved):
+        self.eaten_bits, self.eaten_count, self.eaten = saved
+        self.shared = True
@@ -0,0 +1,46 @@
+import time
+
+# Fixed-timestep clock.
+#
+# Game.step always advances by one tick of fixed size (speeds are pixels per
+# tick), so the front end must not tie ticks to rendered frames. FixedStep
+# collects elapsed wall-clock time and pays it out in whole ticks; what's
+# left over tells the renderer how far it is between the last two ticks.
+
+
+class FixedStep:
+    def __init__(self, tick_rate, max_lag=0.25, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        # After a stall longer than this (window drag, breakpoint, slow
+        # browser frame) the backlog is dropped instead of replayed
+        self.max_ticks = max(1, int(max_lag * tick_rate))
+        self.clock = clock
+        self.last = None
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.last = None
+        self.accumulator = 0.0
+
+    def ticks_due(self):
+        # Whole ticks owed since the previous call
+        now = self.clock()
+        if self.last is None:
+            self.last = now
+        self.accumulator += now - self.last
+        self.last = now
+
+        # (the epsilon keeps float error from splitting exact multiples)
+        ticks = int(self.accumulator / self.dt + 1e-9)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator = ticks * self.dt
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        # Fraction of a tick elapsed since the last one, in [0, 1)
+        return min(max(self.accumulator / self.dt, 0.0), 1.0)
+
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+# Pack the in-game sprites, pre-scaled to the sizes they are drawn at, into
+# one atlas image plus a JSON index. main.py (through Assets.load_atlas) and
+# sketch.js load the atlas instead of one file per sprite and never scale.
+# Rerun after changing a sprite or a size constant:
+#
+#   python tools/build_atlas.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame  # noqa: E402
+
+from simulation import HUMAN_SIZE, MINOTAUR_SIZE, PLAYER_SIZE, TILE_SIZE  # noqa: E402
+
+ATLAS_IMAGE = "sprites/atlas.png"
+ATLAS_INDEX = "sprites/atlas.json"
+
+# Atlas width in pixels (the three Minotaur states side by side); rows are
+# added until everything fits
+ATLAS_WIDTH = 3 * MINOTAUR_SIZE
+
+# (path, drawn size) for every sprite the game blits
+SPRITES = [
+    ("sprites/wall.png", TILE_SIZE),
+    ("sprites/floor.png", TILE_SIZE),
+    ("sprites/gate_locked.png", TILE_SIZE),
+    ("sprites/gate_open.png", TILE_SIZE),
+    ("sprites/theseus.png", PLAYER_SIZE),
+    ("sprites/tribute.png", HUMAN_SIZE),
+    ("sprites/minotaur_normal.png", MINOTAUR_SIZE),
+    ("sprites/minotaur_scared.png", MINOTAUR_SIZE),
+    ("sprites/minotaur_dead.png", MINOTAUR_SIZE),
+]
+
+
+def pack(sizes, width):
+    # Shelf packing: tallest first, left to right, a new shelf when a row is
+    # full. Returns (x, y) per size, in input order, and the total height.
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], i))
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x, y = 0, y + shelf
+            shelf = 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def main():
+    images = []
+    for path, size in SPRITES:
+        image = pygame.image.load(os.path.join(ROOT, path))
+        images.append(pygame.transform.smoothscale(image, (size, size)))
+
+    sizes = [image.get_size() for image in images]
+    positions, height = pack(sizes, ATLAS_WIDTH)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, height), pygame.SRCALPHA)
+    entries = []
+    for (path, _), image, (x, y) in zip(SPRITES, images, positions):
+        atlas.blit(image, (x, y))
+        w, h = image.get_size()
+        entries.append({"path": path, "size": [w, h], "rect": [x, y, w, h]})
+
+    pygame.image.save(atlas, os.path.join(ROOT, ATLAS_IMAGE))
+    with open(os.path.join(ROOT, ATLAS_INDEX), "w") as f:
+        # One sprite per line keeps diffs readable
+        lines = ",\n".join("    " + json.dumps(entry) for entry in entries)
+        f.write(f'{{\n  "image": "{ATLAS_IMAGE}",\n  "sprites": [\n{lines}\n  ]\n}}\n')
+    print(f"{ATLAS_IMAGE}: {ATLAS_WIDTH}x{height}, {len(entries)} sprites")
+
+
+if __name__ == "__main__":
+    main()
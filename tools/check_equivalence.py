@@ -0,0 +1,356 @@
+import os
+import sys
+
+# Check that the shortcuts the simulation takes still play the same game as
+# the plain path they stand in for. Each check runs a handful of seeded
+# games both ways and compares state hashes (see replay.state_hash); any
+# mismatch is printed and the script exits non-zero. Run all checks, or
+# just the named ones:
+#
+#   python tools/check_equivalence.py [check ...]
+#
+#   replay - a recorded game plays back to the same hashes, on every setup
+#            a replay header can describe
+#   skip   - Game.skip_idle between decisions ends up where stepping every
+#            tick does, with the same events
+#   vecenv - a one-game VectorEnv plays the same game as Game, tick for tick
+#   state  - a game restored from Game.save after wandering off carries on
+#            as if it never had, and a restored start state reseeded plays
+#            the game a fresh one with that seed does
+#   clusters - on a level too big for flat tables, Minotaurs hunt through
+#            ClusterPlanner and flee through ClusterMap, and hunt exactly as
+#            the flat HuntPlanner would
+#   flee   - a fleeing Minotaur keeps moving until it is far out from a
+#            player who stands still, whether the player starts near or
+#            far, on a level too big for flat tables and with them alike
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simulation  # noqa: E402
+from clusters import ClusterMap, ClusterPlanner  # noqa: E402
+from level import NEIGHBOURS, compile_level  # noqa: E402
+from mazegen import generate  # noqa: E402
+from pathfinding import bfs_distances, walk_graph  # noqa: E402
+from policies import Greedy, Idle, RandomWalk  # noqa: E402
+from replay import Recorder, Replay, ReplayMismatch, load_source, new_game  # noqa: E402
+from replay import play, state_hash  # noqa: E402
+from simulation import Game  # noqa: E402
+from vecenv import NOOP, VectorEnv  # noqa: E402
+
+SEEDS = range(4)
+
+# Longest game each check plays, in ticks
+MAX_TICKS = 3000
+
+# Game setups, as replay.new_game takes them: the built-in labyrinth, a
+# generated maze, a Minotaur pack and a cooperative one
+SETUPS = [
+    {},
+    {"level": "maze 41x41 7"},
+    {"minotaurs": 3},
+    {"level": "maze 61x41 3", "minotaurs": 3, "cooperative": True},
+]
+
+
+def policies(seed):
+    # One aimed and one aimless player per seed
+    return [Greedy(seed), RandomWalk(seed)]
+
+
+def check_replay():
+    failures = []
+    for setup in SETUPS:
+        for seed in SEEDS:
+            for policy in policies(seed):
+                game = new_game(seed, **setup)
+                recorder = Recorder(game, checkpoint_every=100, **setup)
+                while not game.over and game.ticks < MAX_TICKS:
+                    recorder.step(policy(game))
+                replay = Replay.loads(recorder.finish().dumps())
+                try:
+                    played = play(replay)
+                except ReplayMismatch as e:
+                    failures.append(f"{setup} seed {seed}: {e}")
+                    continue
+                if state_hash(played) != state_hash(game):
+                    failures.append(f"{setup} seed {seed}: final state differs")
+    return failures
+
+
+def check_skip():
+    # Only players that answer at tile centers alone (centers_only) may
+    # skip the ticks in between
+    failures = []
+    for setup in SETUPS:
+        for seed in SEEDS:
+            for kind in (Greedy, Idle):
+                stepped_policy = kind(seed)
+                skipping_policy = kind(seed)
+                stepped = new_game(seed, **setup)
+                skipping = new_game(seed, **setup)
+                stepped_events = []
+                skipping_events = []
+                while not skipping.over and skipping.ticks < MAX_TICKS:
+                    skipping_events += skipping.step(skipping_policy(skipping))
+                    skipping_events += skipping.skip_idle(
+                        MAX_TICKS - skipping.ticks
+                    )
+                    while stepped.ticks < skipping.ticks:
+                        stepped_events += stepped.step(stepped_policy(stepped))
+                    if state_hash(stepped) != state_hash(skipping):
+                        failures.append(
+                            f"{setup} seed {seed} {kind.__name__}: "
+                            f"differs at tick {stepped.ticks}"
+                        )
+                        break
+                else:
+                    # Events within a tick may come out in another order
+                    if sorted(stepped_events) != sorted(skipping_events):
+                        failures.append(
+                            f"{setup} seed {seed} {kind.__name__}: events differ"
+                        )
+    return failures
+
+
+def check_vecenv():
+    # VectorEnv has one Minotaur and needs an all-pairs table, so only the
+    # single-Minotaur setups on small levels apply
+    failures = []
+    for source in ("builtin", "maze 21x21 5"):
+        level, human_start_tiles = load_source(source)
+        for seed in SEEDS:
+            for policy in policies(seed):
+                game = new_game(seed, source)
+                env = VectorEnv(1, level=level, human_start_tiles=human_start_tiles)
+                env.reset(seed)
+                while not game.over and game.ticks < MAX_TICKS:
+                    turn = policy(game)
+                    game.step(turn)
+                    action = NOOP if turn is None else NEIGHBOURS.index(turn)
+                    _, _, dones, info = env.step([action])
+                    ended = (game.score, game.dead, game.won, game.ticks)
+                    env_ended = (
+                        info["score"][0],
+                        info["dead"][0],
+                        info["won"][0],
+                        info["ticks"][0],
+                    )
+                    # A finished env game is already reset, so only how it
+                    # ended is left to compare
+                    same = ended == env_ended
+                    if same and not dones[0]:
+                        player, minotaur = game.player, game.minotaur
+                        same = (
+                            player.x,
+                            player.y,
+                            minotaur.x,
+                            minotaur.y,
+                            len(game.tributes),
+                            game.minotaur_flee,
+                            game.gates_open,
+                        ) == (
+                            env.px[0],
+                            env.py[0],
+                            env.mx[0],
+                            env.my[0],
+                            info["tributes_left"][0],
+                            env.flee[0],
+                            env.gates_open[0],
+                        )
+                    if not same:
+                        failures.append(
+                            f"{source} seed {seed} {type(policy).__name__}: "
+                            f"differs at tick {game.ticks}"
+                        )
+                        break
+    return failures
+
+
+def trace(game, policy, ticks):
+    # State hashes and events of up to ticks more ticks of game
+    hashes = []
+    events = []
+    for _ in range(ticks):
+        if game.over:
+            break
+        events.append(tuple(game.step(policy(game))))
+        hashes.append(state_hash(game))
+    return hashes, events
+
+
+def check_state():
+    failures = []
+    for setup in SETUPS:
+        for seed in SEEDS:
+            reference = trace(new_game(seed, **setup), Greedy(seed), MAX_TICKS)
+            game = new_game(seed, **setup)
+            policy = Greedy(seed)
+            start = game.save()
+            before = trace(game, policy, len(reference[0]) // 3)
+            middle = game.save()
+            # Wander off twice, restoring a save taken along the way once
+            for branch in range(2):
+                trace(game, RandomWalk(seed + 100 + branch), 200)
+                aside = game.save()
+                trace(game, RandomWalk(seed + 200 + branch), 50)
+                game.restore(aside)
+                trace(game, RandomWalk(seed + 300 + branch), 50)
+                game.restore(middle)
+            after = trace(game, policy, MAX_TICKS)
+            resumed = (before[0] + after[0], before[1] + after[1])
+            if resumed != reference:
+                failures.append(f"{setup} seed {seed}: restored game differs")
+            # A restart, as main.py does one, into the next seed's game
+            game.restore(start)
+            game.reseed(seed + 1)
+            restarted = trace(game, Greedy(seed + 1), MAX_TICKS)
+            fresh = trace(new_game(seed + 1, **setup), Greedy(seed + 1), MAX_TICKS)
+            if restarted != fresh:
+                failures.append(f"{setup} seed {seed}: restarted game differs")
+    return failures
+
+
+# Generated maze past simulation.PATH_TABLE_CELLS, for the clusters check
+BIG_MAZE = "maze 101x101 3"
+
+
+def counted(cls, name, calls):
+    # Wrap cls.name to count its calls in calls[name]; returns the original
+    original = getattr(cls, name)
+
+    def wrapper(*args):
+        calls[name] += 1
+        return original(*args)
+
+    setattr(cls, name, wrapper)
+    return original
+
+
+def hunt_hashes(seed, minotaurs, policy):
+    # Hashes every 25 ticks of a game on BIG_MAZE until the Minotaurs flee
+    # (fleeing on big levels is a different search, with its own results)
+    game = new_game(seed, BIG_MAZE, minotaurs)
+    hashes = []
+    while not game.over and game.ticks < MAX_TICKS and not game.minotaur_flee:
+        game.step(policy(game))
+        if game.ticks % 25 == 0:
+            hashes.append(state_hash(game))
+    return hashes, type(game.planner)
+
+
+def check_clusters():
+    failures = []
+    calls = {"next_step": 0, "flee_step": 0}
+    next_step = counted(ClusterPlanner, "next_step", calls)
+    flee_step = counted(ClusterMap, "flee_step", calls)
+    cells = simulation.PATH_TABLE_CELLS
+    try:
+        for seed in SEEDS:
+            for minotaurs in (1, 3):
+                for kind in (Greedy, RandomWalk):
+                    simulation.PATH_TABLE_CELLS = cells
+                    big, planner = hunt_hashes(seed, minotaurs, kind(seed))
+                    # Everything fits the flat tables now
+                    simulation.PATH_TABLE_CELLS = 1 << 62
+                    flat, _ = hunt_hashes(seed, minotaurs, kind(seed))
+                    label = f"seed {seed} {minotaurs} {kind.__name__}"
+                    if planner is not ClusterPlanner:
+                        failures.append(f"{label}: hunted with {planner.__name__}")
+                    elif big != flat:
+                        failures.append(f"{label}: differs from the flat planner")
+        simulation.PATH_TABLE_CELLS = cells
+
+        # The same maze with only the player's row of pellets left, so the
+        # Minotaur soon flees
+        maze = generate(101, 101, seed=3)
+        layout = [
+            row if "P" in row else row.replace(".", " ").replace("o", " ")
+            for row in maze.layout
+        ]
+        level = compile_level(layout)
+        for seed in SEEDS:
+            game = Game(
+                human_start_tiles=maze.human_start_tiles, level=level, seed=seed
+            )
+            policy = Greedy(seed)
+            while not game.over and game.ticks < MAX_TICKS:
+                game.step(policy(game))
+    finally:
+        ClusterPlanner.next_step = next_step
+        ClusterMap.flee_step = flee_step
+        simulation.PATH_TABLE_CELLS = cells
+    for name, count in calls.items():
+        if not count:
+            failures.append(f"{name} was never called")
+    return failures
+
+
+# Flee decisions per run: by then the Minotaur must have got FLEE_FAR of
+# the way to the tile farthest from the player, without standing still
+FLEE_STEPS = 400
+FLEE_FAR = 0.75
+
+
+def check_flee():
+    failures = []
+    cells = simulation.PATH_TABLE_CELLS
+    level, _ = load_source(BIG_MAZE)
+    graph = walk_graph(level, False)
+    tiles = graph.tiles()
+    try:
+        for flat in (False, True):
+            simulation.PATH_TABLE_CELLS = 1 << 62 if flat else cells
+            for seed in SEEDS:
+                minotaur = new_game(seed, BIG_MAZE).minotaur
+                player = tiles[seed * len(tiles) // len(SEEDS)]
+                dist = bfs_distances(graph, [graph.node(player)])
+                farthest = max(dist[graph.node(t)] for t in tiles)
+                # One start near the player and one past ClusterMap's
+                # FLEE_RANGE
+                for low, high in ((8, 32), (100, 200)):
+                    starts = [t for t in tiles if low <= dist[graph.node(t)] <= high]
+                    tile = starts[seed % len(starts)]
+                    before = dist[graph.node(tile)]
+                    label = (
+                        f"{'flat' if flat else 'clusters'} seed {seed}, "
+                        f"{before} steps away"
+                    )
+                    for _ in range(FLEE_STEPS):
+                        if dist[graph.node(tile)] >= FLEE_FAR * farthest:
+                            break
+                        dx, dy = minotaur.flee_step(tile, player)
+                        if (dx, dy) == (0, 0):
+                            failures.append(f"{label}: stood still")
+                            break
+                        tile = (tile[0] + dx, tile[1] + dy)
+                    else:
+                        failures.append(f"{label}: never got far out")
+    finally:
+        simulation.PATH_TABLE_CELLS = cells
+    return failures
+
+
+CHECKS = {
+    "replay": check_replay,
+    "skip": check_skip,
+    "vecenv": check_vecenv,
+    "state": check_state,
+    "clusters": check_clusters,
+    "flee": check_flee,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(CHECKS)
+    failed = False
+    for name in names:
+        failures = CHECKS[name]()
+        for failure in failures:
+            print(f"{name}: {failure}")
+        print(f"{name}: {'FAILED' if failures else 'ok'}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
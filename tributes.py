@@ -0,0 +1,289 @@
+import random
+import sys
+
+import numpy as np
+
+from level import DIRECTION_BITS, MASK_DIRECTIONS, NEIGHBOURS
+
+# Batched tribute movement.
+#
+# Human.update walks one tribute at a time; TributeSwarm keeps every
+# tribute's position, tile, direction and speed in NumPy arrays and moves
+# them all with a handful of array operations per tick. Legal moves come
+# from the level's neighbour masks and the random turns are drawn in one
+# batch, so the cost per tick hardly grows with the number of tributes.
+#
+# Collision queries don't test every tribute either: the swarm sorts the
+# tributes by the tile under their box center (once per tick, when they
+# have moved) and a query binary-searches the rows of tiles around its
+# rect, then tests only the tributes found there.
+
+# Direction codes index these tables: 0..3 follow NEIGHBOURS order (right,
+# left, down, up) and STOP is the last code
+STOP = len(NEIGHBOURS)
+DX = np.array([dx for dx, _ in NEIGHBOURS] + [0], dtype=np.int8)
+DY = np.array([dy for _, dy in NEIGHBOURS] + [0], dtype=np.int8)
+DIRECTIONS = NEIGHBOURS + ((0, 0),)
+
+# Neighbour bit of the reverse of each direction code (0 for STOP)
+REVERSE_BIT = np.array(
+    [DIRECTION_BITS[(-dx, -dy)] for dx, dy in NEIGHBOURS] + [0], dtype=np.uint8
+)
+
+# mask -> number of allowed directions, and mask -> k-th allowed direction
+# code; a random pick is CHOICES[mask, int(u * COUNTS[mask])]
+COUNTS = np.array([len(ds) for ds in MASK_DIRECTIONS], dtype=np.int64)
+CHOICES = np.full((16, len(NEIGHBOURS)), STOP, dtype=np.int8)
+for _mask, _directions in enumerate(MASK_DIRECTIONS):
+    for _k, _direction in enumerate(_directions):
+        CHOICES[_mask, _k] = NEIGHBOURS.index(_direction)
+
+# Per-tribute arrays of a TributeSwarm
+FIELDS = ("x", "y", "tx", "ty", "dir", "speed", "wait")
+
+# Below this many tributes, testing all of them is cheaper than sorting
+# them by tile
+INDEX_MIN = 512
+
+
+class Tribute:
+    # Read-only snapshot of one tribute, for renderers and anything else
+    # that wants Human-like attributes
+    __slots__ = ("x", "y", "tx", "ty", "dir")
+
+    def __init__(self, x, y, tx, ty, direction):
+        self.x = x
+        self.y = y
+        self.tx = tx
+        self.ty = ty
+        self.dir = direction
+
+
+class TributeSwarm:
+    # Structure-of-arrays version of a list of Human objects. Stepping it
+    # follows Human.update exactly: pick a direction at tile centers (no
+    # reversing unless it is the only way out), then move by speed pixels.
+    # Rather than testing every position for a center each tick, each
+    # tribute counts down the moves to its next one.
+    #
+    # save() returns the arrays and the random state without copying the
+    # arrays; the swarm copies them before it next moves, so saving and
+    # restoring cost next to nothing and saved states stay as they were.
+    def __init__(self, level, tiles, tile_size, speed=1.5, seed=None):
+        self.level = level
+        self.tile_size = tile_size
+        # Box size used for collisions (one tile, like Human.rect)
+        self.size = tile_size
+        # Seeded from the random module by default, so random.seed() still
+        # makes a whole game reproducible
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.rng = np.random.default_rng(seed)
+
+        tiles = np.array(tiles, dtype=np.int64).reshape(-1, 2)
+        half = tile_size // 2
+        self.tx = tiles[:, 0].copy()
+        self.ty = tiles[:, 1].copy()
+        self.x = (self.tx * tile_size + half).astype(np.float64)
+        self.y = (self.ty * tile_size + half).astype(np.float64)
+        self.dir = np.full(len(tiles), STOP, dtype=np.int8)
+        self.speed = np.full(len(tiles), speed, dtype=np.float64)
+        # Moves left until each tribute is on a tile center, where it turns
+        # (everyone starts on one)
+        self.wait = np.zeros(len(tiles), dtype=np.int64)
+
+        # Neighbour masks as arrays, indexed by gates_open
+        self.masks = tuple(np.frombuffer(m, dtype=np.uint8) for m in level.masks)
+
+        # Whether the arrays belong to a saved state too
+        self.shared = False
+        # (tile keys, sorted; tribute indices in that order), made when a
+        # query needs it and dropped whenever tributes move. The order it
+        # was last made in is kept to sort from next time; any permutation
+        # of the tributes is a valid start, just a slower one.
+        self.by_tile = None
+        self.tile_order = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def step(self, gates_open):
+        if self.shared:
+            self.own()
+        size = self.tile_size
+        half = size // 2
+
+        # Choose a direction only at tile centers
+        idx = np.flatnonzero(self.wait == 0)
+        if len(idx):
+            tx = ((self.x[idx] - half) // size).astype(np.int64)
+            ty = ((self.y[idx] - half) // size).astype(np.int64)
+            self.tx[idx] = tx
+            self.ty[idx] = ty
+
+            moves = self.masks[gates_open][ty * self.level.width + tx]
+            # Avoid immediately reversing direction if there is another option
+            forward = moves & ~REVERSE_BIT[self.dir[idx]]
+            moves = np.where(forward != 0, forward, moves)
+
+            # Uniform pick among the allowed directions. With no way out
+            # k is 0 and CHOICES[0, 0] is STOP.
+            k = (self.rng.random(len(idx)) * COUNTS[moves]).astype(np.int64)
+            d = CHOICES[moves, k]
+            self.dir[idx] = d
+            # A whole tile to the next center, or the next tick if stopped
+            # (speeds divide the tile size)
+            self.wait[idx] = np.where(
+                d == STOP, 1, np.rint(size / self.speed[idx]).astype(np.int64)
+            )
+
+        self.advance(1)
+
+    def idle_ticks(self):
+        # Ticks that can pass before any tribute has to turn
+        return int(self.wait.min()) if len(self) else sys.maxsize
+
+    def advance(self, ticks):
+        # Move in current direction; tributes only turn in step, so ticks
+        # must be at most idle_ticks() (1 right after turning)
+        if self.shared:
+            self.own()
+        d = self.dir
+        self.x += DX[d] * self.speed * ticks
+        self.y += DY[d] * self.speed * ticks
+        self.wait -= ticks
+        self.by_tile = None
+
+    def tiles(self):
+        # (tx, ty) of every tribute, as of its last tile center
+        return list(zip(self.tx.tolist(), self.ty.tolist()))
+
+    def nearby(self, rect, reach):
+        # Indices (ascending) of the tributes whose box center is within
+        # reach pixels of rect, a superset of the ones that can overlap it
+        # that far out
+        if len(self) < INDEX_MIN:
+            return np.arange(len(self))
+        size = self.tile_size
+        width, height = self.level.width, self.level.height
+        if self.by_tile is None:
+            # Box centers are at the truncated positions (see colliding).
+            # Only the few tributes that crossed into another tile since the
+            # last sort are out of place in the previous order, and a
+            # stable sort (timsort) of nearly sorted keys is about linear.
+            order = self.tile_order
+            if order is None or len(order) != len(self):
+                order = np.arange(len(self))
+            tx = self.x[order].astype(np.int64) // size
+            ty = self.y[order].astype(np.int64) // size
+            keys = ty * width + tx
+            moved = np.argsort(keys, kind="stable")
+            order = self.tile_order = order[moved]
+            self.by_tile = (keys[moved], order)
+        keys, order = self.by_tile
+
+        x0 = max((rect.x - reach) // size, 0)
+        x1 = min((rect.x + rect.width + reach) // size, width - 1)
+        y0 = max((rect.y - reach) // size, 0)
+        y1 = min((rect.y + rect.height + reach) // size, height - 1)
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.arange(y0, y1 + 1) * width
+        starts = np.searchsorted(keys, rows + x0)
+        ends = np.searchsorted(keys, rows + x1, side="right")
+        found = [order[i:j] for i, j in zip(starts.tolist(), ends.tolist()) if j > i]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+    def colliding(self, rect):
+        # Indices of tributes whose box overlaps rect (same rounding and
+        # strict overlap rule as Box / pygame.Rect)
+        size = self.size
+        near = self.nearby(rect, size)
+        left = self.x[near].astype(np.int64) - size // 2
+        top = self.y[near].astype(np.int64) - size // 2
+        hits = (
+            (left < rect.x + rect.width)
+            & (rect.x < left + size)
+            & (top < rect.y + rect.height)
+            & (rect.y < top + size)
+        )
+        return near[hits]
+
+    def sweeps_into(self, rect, ticks):
+        # Whether any tribute's box overlaps rect on one of its next ticks
+        # moves (tested against the box swept over all of them)
+        size = self.size
+        if not len(self):
+            return False
+        reach = size + int(self.speed.max() * ticks) + 1
+        near = self.nearby(rect, reach)
+        x, y, speed = self.x[near], self.y[near], self.speed[near]
+        step_x = DX[self.dir[near]] * speed
+        step_y = DY[self.dir[near]] * speed
+        x0 = (x + step_x).astype(np.int64)
+        x1 = (x + step_x * ticks).astype(np.int64)
+        y0 = (y + step_y).astype(np.int64)
+        y1 = (y + step_y * ticks).astype(np.int64)
+        left = np.minimum(x0, x1) - size // 2
+        top = np.minimum(y0, y1) - size // 2
+        right = np.maximum(x0, x1) - size // 2 + size
+        bottom = np.maximum(y0, y1) - size // 2 + size
+        hits = (
+            (left < rect.x + rect.width)
+            & (rect.x < right)
+            & (top < rect.y + rect.height)
+            & (rect.y < bottom)
+        )
+        return bool(hits.any())
+
+    def remove(self, indices):
+        keep = np.ones(len(self), dtype=bool)
+        keep[indices] = False
+        for name in FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+        self.shared = False
+        self.by_tile = None
+        # Drop the removed ones from the sort order and renumber the rest
+        order = self.tile_order
+        if order is not None and len(order) == len(keep):
+            self.tile_order = (np.cumsum(keep) - 1)[order[keep[order]]]
+
+    def own(self):
+        # Copy the arrays shared with a saved state before changing them
+        for name in FIELDS:
+            setattr(self, name, getattr(self, name).copy())
+        self.shared = False
+
+    def save(self):
+        # The arrays and random state as they are now, for restore()
+        self.shared = True
+        return (
+            tuple(getattr(self, name) for name in FIELDS),
+            self.rng.bit_generator.state,
+        )
+
+    def restore(self, saved):
+        arrays, rng_state = saved
+        for name, array in zip(FIELDS, arrays):
+            setattr(self, name, array)
+        self.rng.bit_generator.state = rng_state
+        self.shared = True
+        self.by_tile = None
+
+    def reseed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def snapshot(self):
+        # Tribute objects for every tribute, in order
+        return [
+            Tribute(x, y, tx, ty, DIRECTIONS[d])
+            for x, y, tx, ty, d in zip(
+                self.x.tolist(),
+                self.y.tolist(),
+                self.tx.tolist(),
+                self.ty.tolist(),
+                self.dir.tolist(),
+            )
+        ]